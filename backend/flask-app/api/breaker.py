@@ -0,0 +1,199 @@
+"""
+Circuit breaker for slow or failing upstream sources.
+
+closed    : calls pass; `failure_threshold` consecutive failures trip it open
+open      : calls are rejected until `reset_timeout` seconds have passed
+half-open : one probe call is let through; success closes, failure re-opens
+
+call() runs a function through the breaker and records its outcome exactly
+once, including a timeout failure as soon as its deadline passes while the
+function is still running (a hanging upstream opens the breaker without ever
+returning). Deadlines are watched by one shared checker thread, not a
+timer per call.
+"""
+
+import os
+import heapq
+import itertools
+import time
+import threading
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class BreakerOpen(Exception):
+    """
+    Raised by CircuitBreaker.call() when the call is not allowed.
+    """
+
+
+class _Deadlines:
+    """
+    One daemon thread running callbacks at their deadlines. add() returns an
+    entry; cancel(entry) before the deadline and the callback never runs.
+    The thread is started lazily (and again in a forked child).
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._heap = []  # [when, seq, callback]; callback None when cancelled
+        self._seq = itertools.count()
+        self._thread = None
+        self._pid = None
+
+    def add(self, delay, callback):
+        entry = [time.monotonic() + delay, next(self._seq), callback]
+        with self._cond:
+            heapq.heappush(self._heap, entry)
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="breaker-deadlines", daemon=True)
+                self._thread.start()
+            elif self._heap[0] is entry:
+                self._cond.notify()
+        return entry
+
+    def cancel(self, entry):
+        # dropped from the heap when it comes up; no re-heapify here
+        entry[2] = None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._heap and self._heap[0][2] is None:
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                wait = self._heap[0][0] - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                callback = heapq.heappop(self._heap)[2]
+            try:
+                callback()
+            except Exception:
+                pass
+
+
+_DEADLINES = _Deadlines()
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = float(reset_timeout)
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe = False
+        self._consecutive = 0
+        self.trips = 0
+        self.successes = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.rejected = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            self._maybe_half_open(time.time())
+            return self._state
+
+    def _maybe_half_open(self, now):
+        if self._state == OPEN and now - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probe = False
+
+    def allow(self, reserve=True):
+        """
+        True if a call may go upstream now (reserves the probe when half-open).
+        With reserve=False it only checks: used to turn work away early when
+        the actual call goes through allow() or call() later.
+        """
+        with self._lock:
+            self._maybe_half_open(time.time())
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._probe:
+                if reserve:
+                    self._probe = True
+                return True
+            self.rejected += 1
+            return False
+
+    def call(self, fn, deadline=None, ok=()):
+        """
+        fn() guarded by the breaker; raises BreakerOpen when not allowed.
+        The outcome is recorded once: a timeout failure when `deadline`
+        seconds pass before fn returns (counted from when fn starts, not from
+        when the work was queued), else success, or failure if fn raises.
+        Exceptions in `ok` are definite answers and count as success.
+        """
+        if not self.allow():
+            raise BreakerOpen(self.name)
+        claim = threading.Lock()  # whoever acquires it records the outcome
+        timer = None
+        if deadline is not None:
+            def expire():
+                if claim.acquire(blocking=False):
+                    self.record_failure(timeout=True)
+            timer = _DEADLINES.add(deadline, expire)
+        try:
+            result = fn()
+        except ok:
+            if timer is not None:
+                _DEADLINES.cancel(timer)
+            if claim.acquire(blocking=False):
+                self.record_success()
+            raise
+        except Exception:
+            if timer is not None:
+                _DEADLINES.cancel(timer)
+            if claim.acquire(blocking=False):
+                self.record_failure()
+            raise
+        if timer is not None:
+            _DEADLINES.cancel(timer)
+        if claim.acquire(blocking=False):
+            self.record_success()
+        return result
+
+    def record_success(self):
+        with self._lock:
+            self.successes += 1
+            self._consecutive = 0
+            self._state = CLOSED
+            self._probe = False
+
+    def record_failure(self, timeout=False):
+        with self._lock:
+            self.failures += 1
+            if timeout:
+                self.timeouts += 1
+            self._consecutive += 1
+            if self._state == HALF_OPEN or self._consecutive >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.trips += 1
+                self._state = OPEN
+                self._opened_at = time.time()
+                self._probe = False
+
+    def stats(self):
+        with self._lock:
+            self._maybe_half_open(time.time())
+            return {
+                "name": self.name,
+                "state": self._state,
+                "trips": self.trips,
+                "consecutive_failures": self._consecutive,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout": self.reset_timeout,
+                "successes": self.successes,
+                "failures": self.failures,
+                "timeouts": self.timeouts,
+                "rejected": self.rejected,
+            }
@@ -0,0 +1,437 @@
+"""
+In-process response cache with size bounds, plus request coalescing.
+
+TTLCache is an LRU map with a per-entry TTL, bounded by entry count and an
+approximate byte budget. Expired entries are dropped on read and by a daemon
+sweeper thread (started lazily, so forked workers get their own), and
+hit/miss/eviction/expiration counters are kept for the stats endpoints.
+
+SingleFlight deduplicates concurrent calls for the same key: one caller runs
+the function, the others wait for its result (or its exception).
+
+PersistentCache is an optional second tier in a SQLite file (WAL mode) that
+survives restarts and is shared by all worker processes.
+
+PreparedJSON is the value type for response caches: the payload serialized
+once to UTF-8 bytes with an ETag, so a hit is sent without re-encoding.
+"""
+
+import os
+import gzip
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class PreparedJSON:
+    """
+    Immutable, ready-to-send JSON body.
+      body  : compact UTF-8 JSON bytes
+      etag  : strong validator derived from the body
+      payload (decoded lazily when built from bytes), gzipped() (compressed
+      once on first use and kept)
+    """
+
+    __slots__ = ("_payload", "body", "etag", "_gzip")
+
+    def __init__(self, payload=None, body=None):
+        if body is None:
+            body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self._payload = payload
+        self.body = body
+        self.etag = hashlib.blake2b(body, digest_size=12).hexdigest()
+        self._gzip = None
+
+    @property
+    def payload(self):
+        if self._payload is None:
+            self._payload = json.loads(self.body.decode("utf-8"))
+        return self._payload
+
+    def gzipped(self):
+        if self._gzip is None:
+            self._gzip = gzip.compress(self.body, compresslevel=6)
+        return self._gzip
+
+    def size(self):
+        return len(self.body) + (len(self._gzip) if self._gzip is not None else 0)
+
+
+def json_size(value) -> int:
+    """
+    Approximate memory cost of a cached value: its compact JSON length.
+    """
+    if isinstance(value, PreparedJSON):
+        return value.size()
+    try:
+        return len(json.dumps(value, ensure_ascii=False, separators=(",", ":")))
+    except Exception:
+        return 0
+
+
+class TTLCache:
+    """
+    Thread-safe LRU + TTL cache.
+      get(key) -> value or None, set(key, value), delete(key), clear(), stats()
+    """
+
+    def __init__(self, max_entries=10000, max_bytes=64 * 1024 * 1024, ttl=6 * 3600,
+                 sweep_interval=60, sizer=json_size):
+        self.max_entries = int(max_entries)
+        self.max_bytes = int(max_bytes)
+        self.ttl = float(ttl)
+        self.sweep_interval = float(sweep_interval)
+        self.sizer = sizer
+        self._data = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._sweeper = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            if item[0] <= now:
+                self._drop(key, item)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[2]
+
+    def set(self, key, value, ttl=None):
+        size = self.sizer(value) if self.sizer else 0
+        if self.max_bytes and size > self.max_bytes:
+            return
+        expires = time.time() + (self.ttl if ttl is None else float(ttl))
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (expires, size, value)
+            self._bytes += size
+            while self._data and (
+                len(self._data) > self.max_entries
+                or (self.max_bytes and self._bytes > self.max_bytes)
+            ):
+                _, it = self._data.popitem(last=False)
+                self._bytes -= it[1]
+                self.evictions += 1
+        self._ensure_sweeper()
+
+    def delete(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                self._drop(key, item)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _drop(self, key, item):
+        del self._data[key]
+        self._bytes -= item[1]
+
+    def sweep(self):
+        """
+        Remove all expired entries; returns how many were dropped.
+        """
+        now = time.time()
+        with self._lock:
+            dead = [k for k, it in self._data.items() if it[0] <= now]
+            for k in dead:
+                self._drop(k, self._data[k])
+            self.expirations += len(dead)
+        return len(dead)
+
+    def _ensure_sweeper(self):
+        if self.sweep_interval <= 0:
+            return
+        t = self._sweeper
+        if t is not None and t.is_alive():
+            return
+        with self._lock:
+            if self._sweeper is not None and self._sweeper.is_alive():
+                return
+            self._sweeper = threading.Thread(target=self._sweep_loop, name="ttlcache-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def _sweep_loop(self):
+        while True:
+            time.sleep(self.sweep_interval)
+            try:
+                self.sweep()
+            except Exception:
+                pass
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "sweep_interval": self.sweep_interval,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls per key: do(key, fn) runs fn once while any
+    number of callers wait on the same future and get the same result.
+    A failure is shared with the waiting callers and, for `failure_backoff`
+    seconds, returned to new callers without calling fn again.
+    """
+
+    _MAX_FAILURES = 1024
+
+    def __init__(self, failure_backoff=2.0):
+        self.failure_backoff = float(failure_backoff)
+        self._lock = threading.Lock()
+        self._calls = {}     # key -> Future of the in-flight call
+        self._failures = {}  # key -> (retry_at, exception)
+        self.calls = 0
+        self.coalesced = 0
+        self.backoff_hits = 0
+
+    def do(self, key, fn):
+        now = time.time()
+        with self._lock:
+            failed = self._failures.get(key)
+            if failed is not None:
+                if failed[0] > now:
+                    self.backoff_hits += 1
+                    raise failed[1]
+                del self._failures[key]
+            fut = self._calls.get(key)
+            leader = fut is None
+            if leader:
+                fut = Future()
+                self._calls[key] = fut
+                self.calls += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            return fut.result()
+
+        try:
+            result = fn()
+        except Exception as e:
+            with self._lock:
+                self._calls.pop(key, None)
+                if self.failure_backoff > 0:
+                    if len(self._failures) >= self._MAX_FAILURES:
+                        self._failures = {k: v for k, v in self._failures.items() if v[0] > now}
+                    self._failures[key] = (time.time() + self.failure_backoff, e)
+            fut.set_exception(e)
+            raise
+        with self._lock:
+            self._calls.pop(key, None)
+        fut.set_result(result)
+        return result
+
+    def forget(self, key=None):
+        """
+        Drop remembered failures (all, or for one key).
+        """
+        with self._lock:
+            if key is None:
+                self._failures.clear()
+            else:
+                self._failures.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "backoff_hits": self.backoff_hits,
+                "failure_backoff": self.failure_backoff,
+            }
+
+
+class PersistentCache:
+    """
+    SQLite-backed JSON cache: key -> (ts, sumber, payload).
+    Readers in several processes can work concurrently (WAL); entries older
+    than `ttl` are ignored on read and removed by a background compaction
+    that also returns free pages to the filesystem.
+    """
+
+    def __init__(self, path, ttl=6 * 3600, compact_interval=600):
+        self.path = path
+        self.ttl = float(ttl)
+        self.compact_interval = float(compact_interval)
+        self._local = threading.local()
+        self._compactor = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+        self.compactions = 0
+        self.last_compaction = None
+        self._count = (0.0, 0)  # (measured_at, rows) for stats()
+
+    def _conn(self):
+        c = getattr(self._local, "conn", None)
+        if c is not None and getattr(self._local, "pid", None) == os.getpid():
+            return c
+        c = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        c.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        c.execute("PRAGMA journal_mode=WAL")
+        c.execute("PRAGMA synchronous=NORMAL")
+        c.execute("CREATE TABLE IF NOT EXISTS cache (k TEXT PRIMARY KEY, ts REAL, sumber TEXT, payload TEXT)")
+        c.execute("CREATE INDEX IF NOT EXISTS cache_ts ON cache (ts)")
+        self._local.conn = c
+        self._local.pid = os.getpid()
+        return c
+
+    def get(self, key, raw=False, with_ts=False):
+        """
+        Payload dict for key if present and fresh, else None.
+        With raw=True the stored JSON text is returned undecoded; with
+        with_ts=True the result is (payload, ts written), so a caller copying
+        it into a faster tier can keep its remaining lifetime.
+        """
+        try:
+            row = self._conn().execute(
+                "SELECT payload, ts FROM cache WHERE k = ? AND ts >= ?", (key, time.time() - self.ttl)
+            ).fetchone()
+        except Exception:
+            self.errors += 1
+            return None
+        self._ensure_compactor()
+        if row is None:
+            self.misses += 1
+            return None
+        if raw:
+            value = row[0]
+        else:
+            try:
+                value = json.loads(row[0])
+            except Exception:
+                self.misses += 1
+                return None
+        self.hits += 1
+        return (value, row[1]) if with_ts else value
+
+    def set(self, key, payload, sumber=""):
+        """
+        Store a payload dict, or a PreparedJSON (its body is stored as is).
+        """
+        if isinstance(payload, PreparedJSON):
+            text = payload.body.decode("utf-8")
+        else:
+            text = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO cache (k, ts, sumber, payload) VALUES (?, ?, ?, ?)",
+                (key, time.time(), sumber or "", text),
+            )
+            self.writes += 1
+        except Exception:
+            self.errors += 1
+        self._ensure_compactor()
+
+    def delete(self, key):
+        try:
+            self._conn().execute("DELETE FROM cache WHERE k = ?", (key,))
+        except Exception:
+            self.errors += 1
+
+    def clear(self):
+        try:
+            self._conn().execute("DELETE FROM cache")
+        except Exception:
+            self.errors += 1
+
+    def compact(self):
+        """
+        Drop expired rows, release free pages and truncate the WAL.
+        Returns the number of rows removed.
+        """
+        c = self._conn()
+        removed = c.execute("DELETE FROM cache WHERE ts < ?", (time.time() - self.ttl,)).rowcount
+        c.execute("PRAGMA incremental_vacuum")
+        c.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.compactions += 1
+        self.last_compaction = time.time()
+        return removed
+
+    def _ensure_compactor(self):
+        if self.compact_interval <= 0:
+            return
+        t = self._compactor
+        if t is not None and t.is_alive():
+            return
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            self._compactor = threading.Thread(target=self._compact_loop, name="persistent-cache-compactor", daemon=True)
+            self._compactor.start()
+
+    def _compact_loop(self):
+        while True:
+            time.sleep(self.compact_interval)
+            try:
+                self.compact()
+            except Exception:
+                self.errors += 1
+
+    def __len__(self):
+        try:
+            return self._conn().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        except Exception:
+            return 0
+
+    def stats(self, count_ttl=30.0):
+        """
+        Counters plus file size; the row count (a table scan) is refreshed at
+        most every `count_ttl` seconds.
+        """
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        now = time.time()
+        if now - self._count[0] >= count_ttl:
+            self._count = (now, len(self))
+        return {
+            "path": self.path,
+            "entries": self._count[1],
+            "file_bytes": size,
+            "ttl": self.ttl,
+            "compact_interval": self.compact_interval,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "errors": self.errors,
+            "compactions": self.compactions,
+            "last_compaction": self.last_compaction,
+        }
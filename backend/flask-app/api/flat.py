@@ -0,0 +1,100 @@
+"""
+Flat, fork-friendly string tables for the KBBI indices.
+
+A FlatStrings holds n strings as one UTF-8 bytes blob plus an array of n + 1
+offsets: two objects instead of n str objects (and a list). Built once in
+the parent process before workers fork, the pages stay shared: lookups never
+write reference counts into them, and the cyclic GC has nothing to scan.
+
+It is a read-only sequence (indexing decodes one string), so bisect works on
+a sorted FlatStrings directly; UTF-8 byte order equals str ordering.
+"""
+
+from array import array
+from bisect import bisect_left
+
+
+class FlatStrings:
+    __slots__ = ("blob", "offsets")
+
+    def __init__(self, strings=()):
+        parts = []
+        offsets = array("Q", [0])
+        end = 0
+        for s in strings:
+            b = s.encode("utf-8")
+            parts.append(b)
+            end += len(b)
+            offsets.append(end)
+        self.blob = b"".join(parts)
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        n = len(self.offsets) - 1
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("FlatStrings index out of range")
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].decode("utf-8")
+
+    def __iter__(self):
+        blob, offs = self.blob, self.offsets
+        for i in range(len(offs) - 1):
+            yield blob[offs[i]:offs[i + 1]].decode("utf-8")
+
+    def __eq__(self, other):
+        if not isinstance(other, FlatStrings):
+            return NotImplemented
+        return self.offsets == other.offsets and self.blob == other.blob
+
+    def __hash__(self):
+        return hash(self.blob)
+
+    def find(self, s):
+        """
+        Position of `s` in a sorted FlatStrings, or -1.
+        """
+        i = bisect_left(self, s)
+        if i < len(self) and self[i] == s:
+            return i
+        return -1
+
+    def nbytes(self):
+        return len(self.blob) + self.offsets.itemsize * len(self.offsets)
+
+
+class FlatMap:
+    """
+    Sorted str -> unsigned int table: FlatStrings keys + an array of values.
+    Build from any iterable of (key, value); the last value of a repeated key
+    wins, as with a dict.
+    """
+
+    __slots__ = ("keys", "values")
+
+    def __init__(self, items=(), typecode="Q"):
+        merged = dict(items)
+        order = sorted(merged)
+        self.keys = FlatStrings(order)
+        self.values = array(typecode, (merged[k] for k in order))
+
+    def __len__(self):
+        return len(self.values)
+
+    def get(self, key, default=None):
+        i = self.keys.find(key)
+        return self.values[i] if i >= 0 else default
+
+    def __contains__(self, key):
+        return self.keys.find(key) >= 0
+
+    def items(self):
+        return zip(self.keys, self.values)
+
+    def nbytes(self):
+        return self.keys.nbytes() + self.values.itemsize * len(self.values)
@@ -1,8 +1,18 @@
 from datetime import datetime
 from flask import Blueprint, jsonify
 
+from .kbbi import kbbi_readiness
+
 health_bp = Blueprint("health", __name__)
 
 @health_bp.get("/api/health")
 def health():
-    return jsonify({"status": "ok", "time": datetime.utcnow().isoformat()})
+    """
+    Liveness plus readiness of the KBBI indices.
+    Returns 200 { status: "ok", time, ready: true, kbbi: {...} } once the
+    indices are warm, 503 with status "starting" while the warm-up runs.
+    """
+    kbbi = kbbi_readiness()
+    ready = kbbi["ready"]
+    body = {"status": "ok" if ready else "starting", "time": datetime.utcnow().isoformat(), "ready": ready, "kbbi": kbbi}
+    return jsonify(body), 200 if ready else 503
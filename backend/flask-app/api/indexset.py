@@ -0,0 +1,125 @@
+"""
+One generation of lazily built, named indices that can be replaced as a whole.
+
+An IndexSet maps a name to a maker function; get(name) builds the part on
+first use (once, under the set's own lock) and records how long it took.
+Makers receive the set, so a derived part (e.g. a suggestion index) is always
+built from parts of the same generation.
+
+Hot swap: build a fresh IndexSet off to the side (build_all), then publish it
+with a single reference assignment. Readers that grabbed the old set keep
+using it consistently until they are done.
+
+Sets sharing one `lock` never build parts concurrently, which makers that
+update module-level state (shard caches, reindex reports) rely on when a
+reload builds a new generation while the live one is still building lazily.
+
+Build metadata (timings, sizes, a memory estimate and whatever the makers put
+in `info`) is recorded once per part, so reporting it never touches the data.
+It is published as a fresh snapshot when a part finishes: stats() reads that
+snapshot without the build lock, so it never waits for a build in progress.
+"""
+
+import sys
+import copy
+import random
+import time
+import threading
+
+
+def _deep_sizeof(obj, depth=6):
+    size = sys.getsizeof(obj)
+    if depth <= 0:
+        return size
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            size += _deep_sizeof(k, depth - 1) + _deep_sizeof(v, depth - 1)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for v in obj:
+            size += _deep_sizeof(v, depth - 1)
+    return size
+
+
+def estimate_bytes(obj, sample=256):
+    """
+    Rough memory footprint of an index part. Objects that know their size
+    expose nbytes(); large dicts/lists are estimated from a random sample of
+    their items, so the cost is bounded regardless of the part's size.
+    """
+    nbytes = getattr(obj, "nbytes", None)
+    if callable(nbytes):
+        return int(nbytes())
+    if isinstance(obj, dict) and len(obj) > sample:
+        keys = random.sample(list(obj.keys()), sample)
+        per = sum(_deep_sizeof(k) + _deep_sizeof(obj[k]) for k in keys) / float(sample)
+        return int(sys.getsizeof(obj) + per * len(obj))
+    if isinstance(obj, (list, tuple)) and len(obj) > sample:
+        items = random.sample(obj, sample)
+        per = sum(_deep_sizeof(v) for v in items) / float(sample)
+        return int(sys.getsizeof(obj) + per * len(obj))
+    return _deep_sizeof(obj)
+
+
+class IndexSet:
+    def __init__(self, makers, generation=0, sizer=len, estimator=estimate_bytes, on_built=None, lock=None):
+        self.makers = makers
+        self.sizer = sizer
+        self.estimator = estimator
+        self.generation = generation
+        self.on_built = on_built
+        self.created_at = time.time()
+        self._parts = {}
+        self._lock = lock if lock is not None else threading.RLock()
+        self.build_times = {}  # name -> {seconds, size, bytes, built_at}
+        self.info = {}  # name -> build metadata filled in by the maker
+        self._snapshot = {"loaded": [], "builds": {}, "info": {}}  # replaced, never mutated
+
+    def get(self, name):
+        part = self._parts.get(name)
+        if part is not None:
+            return part
+        with self._lock:
+            part = self._parts.get(name)
+            if part is None:
+                started = time.time()
+                part = self.makers[name](self)
+                self._parts[name] = part
+                seconds = round(time.time() - started, 3)
+                try:
+                    size = self.sizer(part)
+                except Exception:
+                    size = None
+                try:
+                    nbytes = self.estimator(part) if self.estimator else None
+                except Exception:
+                    nbytes = None
+                self.build_times[name] = {"seconds": seconds, "size": size, "bytes": nbytes, "built_at": time.time()}
+                self._snapshot = {
+                    "loaded": sorted(self._parts),
+                    "builds": copy.deepcopy(self.build_times),
+                    "info": copy.deepcopy(self.info),
+                }
+                if self.on_built is not None:
+                    self.on_built(name, self.build_times[name])
+        return part
+
+    def peek(self, name):
+        """
+        The part if it is already built, else None (never builds).
+        """
+        return self._parts.get(name)
+
+    def loaded(self, name):
+        return name in self._parts
+
+    def build_all(self, names=None):
+        for name in (names or self.makers):
+            self.get(name)
+        return self
+
+    def stats(self):
+        """
+        Build metadata as of the last finished part. Lock-free; callers must
+        treat the nested dicts as read-only.
+        """
+        return dict(self._snapshot, generation=self.generation, created_at=self.created_at)
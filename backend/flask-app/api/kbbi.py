@@ -1,15 +1,35 @@
 import os
 import re
+import gc
+import codecs
+import copy
 import glob
 import json
+import hashlib
+import sys
 import time
-from flask import Blueprint, request, jsonify, current_app
+import uuid
+import tempfile
+import threading
+import multiprocessing
+from functools import partial
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, TimeoutError as FutureTimeout, wait as futures_wait
+from concurrent.futures.process import BrokenProcessPool
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 
-# Prefer ujson if available
-try:
-    import ujson as _ujson
-except Exception:
-    _ujson = None
+from .breaker import CircuitBreaker, BreakerOpen
+from .cache import TTLCache, SingleFlight, PersistentCache, PreparedJSON
+from .ratelimit import RateLimiter, rate_limit
+from .kbbi_index import compile_index, open_index, update_meta
+from .kbbi_stream import iter_json_values
+from .kbbi_suggest import PrefixIndex, FuzzyIndex
+from .kbbi_morph import MorphIndex
+from .kbbi_search import SearchIndex
+from .kbbi_graph import RelationGraph, SINONIM, ANTONIM, KIND_NAMES
+from .kbbi_worddb import WordShard, WordStore
+from .indexset import IndexSet
+from .resolver import ResolverChain, Miss, Unavailable, HIT, MISS, ERROR, TIMEOUT, SKIPPED
 
 kbbi_bp = Blueprint("kbbi", __name__)
 
@@ -21,6 +41,12 @@ KBBI_FILE_GLOB = os.path.join(LIB_DATA_DIR, "kbbi_v_part*.json")
 KBBI_WORD_DB_GLOB = os.path.join(LIB_DATA_DIR, "kbbi_word_data*.json")
 # Backward-compatible default constant name
 WORD_DB_JSON = os.path.join(LIB_DATA_DIR, "kbbi_word_data.json")
+# Compiled (mmap) offline index built from the part files; see api/kbbi_index.py
+KBBI_INDEX_FILE = os.path.join(LIB_DATA_DIR, "kbbi_index.bin")
+# One compiled index per part file; only changed parts are reparsed on rebuild
+KBBI_SHARD_INDEX_DIR = os.path.join(LIB_DATA_DIR, "kbbi_index.d")
+# Read size for streaming the part files (bounds peak memory while loading)
+KBBI_LOAD_CHUNK_SIZE = 1 << 16
 
 os.makedirs(LIB_DATA_DIR, exist_ok=True)
 
@@ -54,15 +80,140 @@ except Exception as _kbbi_online_err:
         pass
 
 # Online cache and rate limiting
-_KBBI_CACHE = {}  # key_norm -> {ts: epoch, payload: dict}
-_KBBI_CACHE_TTL = 6 * 3600  # 6 jam
-_RATE_BUCKET = {}  # ip -> [timestamps]
+_KBBI_CACHE_TTL = int(os.environ.get("KBBI_CACHE_TTL", 6 * 3600))  # 6 jam
+_KBBI_CACHE_MAX_ENTRIES = int(os.environ.get("KBBI_CACHE_MAX_ENTRIES", 10000))
+_KBBI_CACHE_MAX_BYTES = int(os.environ.get("KBBI_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+_KBBI_CACHE = TTLCache(  # key_norm -> PreparedJSON (LRU, bounded)
+    max_entries=_KBBI_CACHE_MAX_ENTRIES,
+    max_bytes=_KBBI_CACHE_MAX_BYTES,
+    ttl=_KBBI_CACHE_TTL,
+)
+# Misses (with their computed saran) are cached separately: shorter TTL and a
+# smaller bound, so retried typos skip the online call and the suggestion work.
+_KBBI_MISS_CACHE_TTL = int(os.environ.get("KBBI_MISS_CACHE_TTL", 600))  # 10 menit
+_KBBI_MISS_CACHE = TTLCache(  # key_norm -> PreparedJSON of the 404 body
+    max_entries=int(os.environ.get("KBBI_MISS_CACHE_MAX_ENTRIES", 20000)),
+    max_bytes=int(os.environ.get("KBBI_MISS_CACHE_MAX_BYTES", 8 * 1024 * 1024)),
+    ttl=_KBBI_MISS_CACHE_TTL,
+)
+# Optional on-disk tier behind _KBBI_CACHE for online results, so restarts and
+# worker recycling do not send the top words to KBBI online again.
+KBBI_PERSISTENT_CACHE_FILE = os.path.join(LIB_DATA_DIR, "kbbi_cache.sqlite3")
+_KBBI_PERSISTENT = (
+    PersistentCache(KBBI_PERSISTENT_CACHE_FILE, ttl=_KBBI_CACHE_TTL)
+    if os.environ.get("KBBI_PERSISTENT_CACHE", "1") not in ("0", "false", "no", "")
+    else None
+)
+# Concurrent online lookups of the same word share one upstream call;
+# a failure is reused for a short back-off instead of retried by every caller.
+_KBBI_ONLINE_FLIGHT = SingleFlight(failure_backoff=float(os.environ.get("KBBI_ONLINE_FAILURE_BACKOFF", 2.0)))
+# Online calls run on a small pool; callers wait at most the latency budget and
+# otherwise answer from local sources while the result is backfilled into the cache.
+_KBBI_ONLINE_BUDGET = float(os.environ.get("KBBI_ONLINE_BUDGET", 1.5))  # detik
+_KBBI_ONLINE_WORKERS = 8
+_KBBI_ONLINE_POOL = ThreadPoolExecutor(max_workers=_KBBI_ONLINE_WORKERS, thread_name_prefix="kbbi-online")
+# At most this many online calls are queued behind the running ones; further
+# work is rejected (answered locally) instead of piling up behind a slow upstream.
+_KBBI_ONLINE_QUEUE_MAX = int(os.environ.get("KBBI_ONLINE_QUEUE", 32))
+_KBBI_ONLINE_QUEUE = {"in_flight": 0, "rejected": 0}
+_KBBI_ONLINE_QUEUE_LOCK = threading.Lock()
+_KBBI_ONLINE_BREAKER = CircuitBreaker(
+    "kbbi-online",
+    failure_threshold=int(os.environ.get("KBBI_BREAKER_FAILURES", 5)),
+    reset_timeout=float(os.environ.get("KBBI_BREAKER_RESET", 30)),
+)
+# Lookup order of /api/kbbi/cek (KBBI_RESOLVER_MODE):
+#   offline-first: word DB -> kbbi_simple -> offline index -> root of a derived
+#                  form -> KBBI online as the last resort (default)
+#   online-first:  KBBI online within the latency budget, then the local sources
+#   local-only:    the local sources only; KBBI online is never called
+# KBBI_RESOLVER_DISABLE takes a comma-separated list of source names to skip.
+_KBBI_RESOLVER_MODES = ("offline-first", "online-first", "local-only")
+_KBBI_RESOLVER_MODE = os.environ.get("KBBI_RESOLVER_MODE", "offline-first").strip().lower()
+_KBBI_RESOLVER_DISABLED = frozenset(
+    n.strip() for n in os.environ.get("KBBI_RESOLVER_DISABLE", "").split(",") if n.strip()
+)
+# Local lookups slower than this are counted as slow in the resolver stats
+_KBBI_LOCAL_TIMEOUT = float(os.environ.get("KBBI_LOCAL_TIMEOUT", 0.05))  # detik
+# Which source answered each lookup (cache, miss-cache, kbbi-*, miss), for stats
+_KBBI_SOURCE_COUNTS = Counter()
+_KBBI_SOURCE_LOCK = threading.Lock()
+# Lookup hits per key_norm not yet applied to the suggestion ranking counts;
+# lookups only bump this counter, _kbbi_fold_hits applies it when ranking.
+_KBBI_PENDING_HITS = Counter()
+_KBBI_HITS_LOCK = threading.Lock()
+_KBBI_FOLD_LOCK = threading.Lock()
+_KBBI_HITS_FOLD_AT = 4096  # distinct pending keys that trigger a fold anyway
+# Cached bodies at least this large are sent gzip-compressed (compressed once,
+# kept with the entry) to clients that accept it.
+_KBBI_GZIP_MIN_BYTES = int(os.environ.get("KBBI_GZIP_MIN_BYTES", 1024))
 _RATE_LIMIT_MAX = 60
 _RATE_LIMIT_WINDOW = 60  # 60 dtk
+_KBBI_LIMITER = RateLimiter("kbbi", max_requests=_RATE_LIMIT_MAX, window=_RATE_LIMIT_WINDOW)
+
+# Batch lookups (/api/kbbi/cek-batch)
+_KBBI_BATCH_MAX = 500
 
-# Offline indices
-_kbbi_index = None
-_KBBI_WORD_INDEX = None  # {"by_key":{}, "by_lema":{}, "orig_key":{}, "raw":{}}
+# Whole-text checks (/api/kbbi/periksa-teks)
+_KBBI_TEXT_MAX_BYTES = 16 * 1024 * 1024
+_KBBI_TEXT_CHUNK = 64 * 1024
+# Bodies without Content-Length (chunked) are read into a spool first so the
+# size limit can be enforced before the response starts; kept in memory up to
+# this size, on disk beyond it.
+_KBBI_TEXT_SPOOL = 1024 * 1024
+# A token is a run of letters/digits joined only by single inner "-" or "'"
+# (anak-anak, ma'af); any other punctuation splits (dan/atau, pijar.rumah).
+# Longer runs than _KBBI_TOKEN_MAX are not words: they are skipped, never echoed.
+_KBBI_TOKEN_RE = re.compile(r"[^\W_]+(?:['\u2019-][^\W_]+)*", re.UNICODE)
+_KBBI_TOKEN_JOINERS = "'\u2019-"
+# rest of a token from inside it: letters/digits and joiners that link to more
+_KBBI_TOKEN_REST = re.compile(r"(?:[^\W_]|['\u2019-](?=[^\W_]))*")
+_KBBI_TOKEN_MAX = 64
+
+# Offline indices. All index kinds live in one IndexSet generation:
+#   offline_index: normalized lemma -> {lema, definisi} (compiled file or dict)
+#   word_db:       WordStore (records as raw JSON bytes, decoded on a hit)
+#   suggest:       PrefixIndex over word DB + offline keys
+#   fuzzy:         FuzzyIndex (typo-tolerant) over the same vocabulary
+#   morph:         MorphIndex (derived form -> base lemma)
+#   search:        SearchIndex (BM25 over definitions)
+#   relasi:        RelationGraph (sinonim/antonim)
+# Each part is built once per generation: lazily on the first request that
+# needs it, or up front via kbbi_warm_up(). Reload builds a new generation off
+# to the side and publishes it by reassigning _KBBI_INDICES.
+_KBBI_INDICES = None  # IndexSet, created below _kbbi_new_index_set
+# Every part build of every generation (lazy, warm-up, reload, compile step)
+# runs under this lock: the builders share _KBBI_WORD_SHARDS and _KBBI_REINDEX.
+# Readers of build reports (stats, health) never take it; see _kbbi_publish_reindex.
+_KBBI_BUILD_LOCK = threading.RLock()
+# Typo suggestions: one edit by default, two only for words of at least
+# _KBBI_FUZZY_LONG_WORD characters (a 2-edit lookup costs ~20x a 1-edit one,
+# and on short words mostly adds noise); /api/kbbi/saran?jarak= overrides it.
+# The index is built for _KBBI_FUZZY_MAX_DISTANCE; set it to 1 to skip the
+# larger 2-edit build altogether.
+_KBBI_FUZZY_MAX_DISTANCE = max(1, min(int(os.environ.get("KBBI_FUZZY_MAX_DISTANCE", 2)), 2))
+_KBBI_FUZZY_LONG_WORD = int(os.environ.get("KBBI_FUZZY_LONG_WORD", 8))
+_KBBI_SEARCH_PAGE_MAX = 100
+_KBBI_RELASI_MAX_DEPTH = 3
+_KBBI_RELASI_MAX_LIMIT = 500
+_KBBI_WARMUP = {"started_at": None, "finished_at": None, "error": None}
+# Reload jobs: job_id -> {id, status, ...}; the newest _KBBI_RELOAD_KEEP are kept.
+_KBBI_RELOAD_JOBS = OrderedDict()
+_KBBI_RELOAD_KEEP = 20
+_KBBI_RELOAD_LOCK = threading.Lock()
+# Shard change detection: parsed word DB shards by file name, the outcome of
+# the latest per-shard rebuild for each source, and the optional file watcher.
+_KBBI_WORD_SHARDS = {}  # basename -> (signature, WordShard)
+# "offline_index"|"word_db" -> {rebuilt, reused, removed, failed, shards, phases, at};
+# replaced as a whole when a report is published, never mutated
+_KBBI_REINDEX = {}
+# Changed shards are parsed in up to this many worker processes (1 = in-process).
+_KBBI_LOAD_WORKERS = max(1, int(os.environ.get("KBBI_LOAD_WORKERS", os.cpu_count() or 1)))
+# The server is multi-threaded, so workers are not forked from it (a fork copies
+# locks held by other threads); "spawn" is used where forkserver is unavailable.
+_KBBI_LOAD_START_METHOD = os.environ.get("KBBI_LOAD_START_METHOD", "forkserver")
+_KBBI_WATCH_INTERVAL = float(os.environ.get("KBBI_WATCH_INTERVAL", 0))  # detik; 0 = mati
+_KBBI_WATCHER = {"pid": None, "thread": None}
 
 
 def _kbbi_normalize(s: str) -> str:
@@ -81,10 +232,52 @@ def _kbbi_normalize(s: str) -> str:
     return s
 
 
-def _kbbi_load_all_parts():
+def _kbbi_is_entry(obj) -> bool:
+    if not isinstance(obj, dict):
+        return False
+    if "makna" in obj and any(k in obj for k in ("nama", "lema", "kata")):
+        return True
+    return False
+
+
+def _kbbi_extract_entries(obj, out_list, appended_ids):
+    """
+    Collect entry dicts found anywhere inside one decoded JSON value.
+    `appended_ids` guards against appending the same dict twice; it must be
+    scoped to a single value because ids are reused once objects are freed.
+    """
+    if isinstance(obj, dict):
+        # Direct known container keys
+        for key in ("entri", "entries"):
+            v = obj.get(key)
+            if isinstance(v, list):
+                for it in v:
+                    if isinstance(it, dict):
+                        if id(it) not in appended_ids:
+                            out_list.append(it)
+                            appended_ids.add(id(it))
+        # Other container keys that may contain nested objects with "entri"
+        for key in ("data", "daftar", "list", "result", "results"):
+            v = obj.get(key)
+            if isinstance(v, list):
+                for it in v:
+                    _kbbi_extract_entries(it, out_list, appended_ids)
+        # Recurse remaining dict values
+        for k, v in obj.items():
+            if k not in ("entri", "entries", "data", "daftar", "list", "result", "results"):
+                _kbbi_extract_entries(v, out_list, appended_ids)
+        # As a last resort, treat this dict as an entry if it looks like one
+        if _kbbi_is_entry(obj) and id(obj) not in appended_ids:
+            out_list.append(obj)
+            appended_ids.add(id(obj))
+    elif isinstance(obj, list):
+        for it in obj:
+            _kbbi_extract_entries(it, out_list, appended_ids)
+
+
+def _kbbi_iter_part_entries(path, stats=None):
     """
-    Load and concatenate all KBBI part files.
-    Prefer ujson for speed if available, fallback to stdlib json.
+    Stream entries from one part file without reading it into memory.
     Supports file shapes:
       - [ { group_with_entri: [...] } , ... ]
       - [ {entry}, ... ]
@@ -92,172 +285,486 @@ def _kbbi_load_all_parts():
       - { "data": [ {entry}, ... ], ... }
       - { "daftar": [ { entri: [...] } , ... ] }
       - { single_entry_fields... }
-    Also supports "concatenated JSON" (multiple JSON objects back-to-back).
-    """
-
-    def _multi_json_objects(text: str):
-        objs = []
-        dec = json.JSONDecoder()
-        idx = 0
-        n = len(text)
-        while idx < n:
-            # skip whitespace
-            while idx < n and text[idx].isspace():
-                idx += 1
-            if idx >= n:
-                break
-            try:
-                obj, end = dec.raw_decode(text, idx)
-                objs.append(obj)
-                idx = end
-            except Exception:
-                # advance one char to avoid infinite loop on malformed spots
-                idx += 1
-        return objs
+    Also supports "concatenated JSON" (multiple JSON objects back-to-back);
+    malformed spots are skipped and reported in `stats` (optional dict), which
+    receives values / skipped_bytes / resyncs / entries.
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault("entries", 0)
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for value in iter_json_values(f, KBBI_LOAD_CHUNK_SIZE, stats):
+            found = []
+            _kbbi_extract_entries(value, found, set())
+            stats["entries"] += len(found)
+            yield from found
 
-    appended_ids = set()
 
-    def _is_entry(obj) -> bool:
-        if not isinstance(obj, dict):
-            return False
-        if "makna" in obj and any(k in obj for k in ("nama", "lema", "kata")):
-            return True
-        return False
+def _kbbi_warn_skipped(path, stats):
+    if stats.get("skipped_bytes"):
+        try:
+            current_app.logger.warning(
+                "KBBI part %s: skipped %d malformed bytes (%d resyncs)",
+                path, stats["skipped_bytes"], stats.get("resyncs", 0),
+            )
+        except Exception:
+            pass
 
-    def _extract_entries(obj, out_list):
-        if isinstance(obj, dict):
-            # Direct known container keys
-            for key in ("entri", "entries"):
-                v = obj.get(key)
-                if isinstance(v, list):
-                    for it in v:
-                        if isinstance(it, dict):
-                            if id(it) not in appended_ids:
-                                out_list.append(it)
-                                appended_ids.add(id(it))
-            # Other container keys that may contain nested objects with "entri"
-            for key in ("data", "daftar", "list", "result", "results"):
-                v = obj.get(key)
-                if isinstance(v, list):
-                    for it in v:
-                        _extract_entries(it, out_list)
-            # Recurse remaining dict values
-            for k, v in obj.items():
-                if k not in ("entri", "entries", "data", "daftar", "list", "result", "results"):
-                    _extract_entries(v, out_list)
-            # As a last resort, treat this dict as an entry if it looks like one
-            if _is_entry(obj) and id(obj) not in appended_ids:
-                out_list.append(obj)
-                appended_ids.add(id(obj))
-        elif isinstance(obj, list):
-            for it in obj:
-                _extract_entries(it, out_list)
-
-    entries = []
-    paths = sorted(glob.glob(KBBI_FILE_GLOB))
+
+def _kbbi_sources_signature(paths):
+    """
+    Identify a set of source files by (name, size, mtime) so a compiled index
+    can tell whether it is still up to date.
+    """
+    sig = []
     for p in paths:
         try:
-            with open(p, "r", encoding="utf-8") as f:
-                raw = f.read()
+            st = os.stat(p)
+            sig.append([os.path.basename(p), st.st_size, st.st_mtime_ns])
+        except OSError:
+            continue
+    return sig
 
-            objs = _multi_json_objects(raw)
-            if not objs:
-                try:
-                    objs = [(_ujson.loads(raw) if _ujson else json.loads(raw))]
-                except Exception:
-                    objs = []
 
-            for data in objs:
-                _extract_entries(data, entries)
+def _kbbi_file_signature(path, known=None):
+    """
+    {name, size, mtime_ns, sha1} of one shard. The content hash is reused from
+    `known` (an earlier signature) when size and mtime are unchanged, so an
+    unchanged shard costs one stat(); a touched but identical file is still
+    recognized as unchanged by its hash.
+    """
+    st = os.stat(path)
+    sig = {"name": os.path.basename(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if known and known.get("size") == st.st_size and known.get("mtime_ns") == st.st_mtime_ns and known.get("sha1"):
+        sig["sha1"] = known["sha1"]
+        return sig
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    sig["sha1"] = h.hexdigest()
+    return sig
+
+
+def _kbbi_shard_unchanged(sig, known):
+    return bool(known) and known.get("size") == sig["size"] and known.get("sha1") == sig["sha1"]
+
+
+def _kbbi_new_reindex_report():
+    return {"rebuilt": [], "reused": [], "removed": [], "failed": [], "shards": {}, "phases": {}, "at": time.time()}
+
+
+def _kbbi_phase(phases, name, seconds, **counts):
+    """
+    Accumulate wall time and counters for one build phase into `phases`.
+    """
+    if phases is None:
+        return
+    ph = phases.setdefault(name, {"seconds": 0.0})
+    ph["seconds"] = round(ph["seconds"] + seconds, 6)
+    for k, v in counts.items():
+        ph[k] = ph.get(k, 0) + v
+
+
+def _kbbi_label_prefix(label, labels):
+    """
+    "[n] "-style prefix for a class label. Labels repeat across the whole
+    dictionary, so each distinct label and prefix is built and interned once.
+    """
+    prefix = labels.get(label)
+    if prefix is None:
+        prefix = sys.intern(f"[{sys.intern(label)}] ") if label else ""
+        labels[label] = prefix
+    return prefix
+
+
+def _kbbi_index_entry(entry, labels=None):
+    """
+    (normalized key, lemma, [definitions]) for one part-file entry, or None.
+    `labels` is the class label -> prefix cache shared by one build.
+    """
+    if labels is None:
+        labels = {}
+    # Robustly extract lemma/name; some entries may have non-string "nama"
+    raw_nama = entry.get("nama")
+    nama = None
+    if isinstance(raw_nama, str):
+        nama = raw_nama.strip()
+    else:
+        for k in ("lema", "kata"):
+            v = entry.get(k)
+            if isinstance(v, str):
+                nama = v.strip()
+                break
+    if not nama and isinstance(raw_nama, dict):
+        # Last resort: try nested fields inside "nama" object if present
+        for kk in ("text", "value", "nama"):
+            vv = raw_nama.get(kk) if hasattr(raw_nama, "get") else None
+            if isinstance(vv, str) and vv.strip():
+                nama = vv.strip()
+                break
+    if not nama:
+        return None
+    key = _kbbi_normalize(nama)
+    if not key:
+        return None
+
+    # Collect definitions
+    defs = []
+    makna = entry.get("makna") or []
+    if isinstance(makna, list):
+        for m in makna:
+            if not isinstance(m, dict):
+                # Sometimes it might be plain string
+                txt = str(m).strip()
+                if txt:
+                    defs.append(txt)
+                continue
+            # kelas: list of dicts with kode/nama
+            label = ""
+            klist = m.get("kelas") or []
+            if isinstance(klist, list) and klist:
+                k0 = klist[0]
+                if isinstance(k0, dict):
+                    label = (k0.get("kode") or k0.get("nama") or "").strip()
+            prefix = _kbbi_label_prefix(label, labels)
+            # submakna could be list of strings
+            sub = m.get("submakna") or m.get("arti") or m.get("definisi") or []
+            if isinstance(sub, list):
+                for s in sub:
+                    st = str(s).strip()
+                    if not st:
+                        continue
+                    defs.append(prefix + st)
+            elif isinstance(sub, str):
+                st = sub.strip()
+                if st:
+                    defs.append(prefix + st)
+
+    return key, nama, defs
+
+
+def _kbbi_index_merge(idx, key, lema, defs):
+    """
+    Add lemma variants and definitions to idx[key]. While building, a bucket's
+    definisi is a dict used as an insertion-ordered set, so deduplication is
+    O(1) per definition. Returns how many new definitions were kept.
+    """
+    bucket = idx.get(key)
+    if not bucket:
+        bucket = {"lema": set(), "definisi": {}}
+        idx[key] = bucket
+    bucket["lema"].update(lema)
+    seen = bucket["definisi"]
+    before = len(seen)
+    seen.update(dict.fromkeys(defs))
+    seen.pop("", None)
+    return len(seen) - before
+
+
+def _kbbi_index_finalize(idx, phases=None):
+    # finalize sets/ordered sets to lists
+    started = time.perf_counter()
+    for k, v in idx.items():
+        v["lema"] = sorted(v["lema"])
+        v["definisi"] = list(v["definisi"])
+    _kbbi_phase(phases, "finalize", time.perf_counter() - started, keys=len(idx))
+    return idx
+
+
+def _kbbi_index_from_entries(entries, phases=None):
+    """
+    Build { normalized_lemma: {lema, definisi} } from an entry stream, timing
+    parsing (reading + extraction) and merging separately.
+    """
+    idx = {}
+    labels = {}
+    started = time.perf_counter()
+    merge_s = 0.0
+    n_entries = n_defs = n_kept = 0
+    for entry in entries:
+        it = _kbbi_index_entry(entry, labels)
+        if it is None:
+            continue
+        n_entries += 1
+        n_defs += len(it[2])
+        t = time.perf_counter()
+        n_kept += _kbbi_index_merge(idx, it[0], (it[1],), it[2])
+        merge_s += time.perf_counter() - t
+    total = time.perf_counter() - started
+    _kbbi_phase(phases, "parse", total - merge_s, entries=n_entries)
+    _kbbi_phase(phases, "merge", merge_s, definitions=n_defs, duplicates=n_defs - n_kept)
+    return _kbbi_index_finalize(idx, phases)
+
+
+def _kbbi_parse_shard(path, stats=None, phases=None):
+    """
+    Parse one part file into { normalized_lemma: {lema, definisi} }.
+    """
+    return _kbbi_index_from_entries(_kbbi_iter_part_entries(path, stats), phases)
+
+
+def _kbbi_run_shard_jobs(fn, jobs):
+    """
+    Run fn(*args) for every args tuple in `jobs`: in a process pool of up to
+    _KBBI_LOAD_WORKERS processes (started with _KBBI_LOAD_START_METHOD) when
+    there are at least two jobs, else (or if the pool cannot be used) in this
+    process.
+    Returns [(result, exception)] in job order, so callers merge deterministically.
+    """
+    workers = min(_KBBI_LOAD_WORKERS, len(jobs))
+    if workers > 1:
+        method = _KBBI_LOAD_START_METHOD
+        if method not in multiprocessing.get_all_start_methods():
+            method = "spawn"
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method)) as pool:
+                futs = [pool.submit(fn, *args) for args in jobs]
+                out = []
+                for fut in futs:
+                    try:
+                        out.append((fut.result(), None))
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        out.append((None, e))
+                return out
         except Exception as e:
             try:
-                current_app.logger.warning("KBBI load failed for %s: %s", p, e)
+                current_app.logger.warning("KBBI shard pool unavailable, loading serially: %r", e)
             except Exception:
                 pass
-    return entries
+    out = []
+    for args in jobs:
+        try:
+            out.append((fn(*args), None))
+        except Exception as e:
+            out.append((None, e))
+    return out
 
 
-def _kbbi_build_index():
+def _kbbi_shard_job(path, spath, sig):
     """
-    Build an index: normalized_lemma -> { lema: [original lemma variants], definisi: [strings] }
+    Parse one part file and compile it into its shard index `spath`. Runs in
+    a worker process, so only small metadata is returned; the parsed dict
+    comes back only when the shard index could not be written. When parsing
+    fails nothing is written, so the next build tries the part again.
     """
-    global _kbbi_index
-    if _kbbi_index is not None:
-        return _kbbi_index
+    started = time.perf_counter()
+    stats, phases = {}, {}
+    out = {"stats": stats, "phases": phases, "idx": None, "error": None, "write_error": None}
+    try:
+        idx = _kbbi_parse_shard(path, stats, phases)
+    except Exception as e:
+        out.update(error=str(e), idx={}, keys=0, seconds=round(time.perf_counter() - started, 6))
+        return out
+    try:
+        t = time.perf_counter()
+        os.makedirs(os.path.dirname(spath), exist_ok=True)
+        compile_index(idx, spath, meta={"shard": sig, "stats": stats})
+        _kbbi_phase(phases, "shard_compile", time.perf_counter() - t, files=1)
+    except Exception as e:
+        out["write_error"] = str(e)
+        out["idx"] = idx
+    out["keys"] = len(idx)
+    out["seconds"] = round(time.perf_counter() - started, 6)
+    return out
 
-    idx = {}
-    for entry in _kbbi_load_all_parts():
-        # Robustly extract lemma/name; some entries may have non-string "nama"
-        raw_nama = entry.get("nama")
-        nama = None
-        if isinstance(raw_nama, str):
-            nama = raw_nama.strip()
-        else:
-            for k in ("lema", "kata"):
-                v = entry.get(k)
-                if isinstance(v, str):
-                    nama = v.strip()
-                    break
-        if not nama and isinstance(raw_nama, dict):
-            # Last resort: try nested fields inside "nama" object if present
-            for kk in ("text", "value", "nama"):
-                vv = raw_nama.get(kk) if hasattr(raw_nama, "get") else None
-                if isinstance(vv, str) and vv.strip():
-                    nama = vv.strip()
-                    break
-        if not nama:
-            continue
-        key = _kbbi_normalize(nama)
-        if not key:
+
+def _kbbi_shard_indices(paths, report):
+    """
+    Offline index of every part file, in part order: the compiled copy in
+    KBBI_SHARD_INDEX_DIR when the part is unchanged (size + content hash),
+    else a fresh parse (see _kbbi_shard_job; parts run in parallel) that is
+    written back there. Records per-shard outcome and timing in `report`.
+    """
+    parts = [None] * len(paths)
+    jobs = []
+    for i, path in enumerate(paths):
+        name = os.path.basename(path)
+        spath = os.path.join(KBBI_SHARD_INDEX_DIR, name + ".bin")
+        started = time.perf_counter()
+        ci = open_index(spath)
+        known = ci.meta.get("shard") if ci is not None else None
+        sig = _kbbi_file_signature(path, known)
+        if ci is not None and _kbbi_shard_unchanged(sig, known):
+            if sig["mtime_ns"] != known.get("mtime_ns"):
+                # touched but identical: keep the new mtime so it is not hashed again
+                try:
+                    update_meta(spath, dict(ci.meta, shard=sig))
+                except Exception as e:
+                    try:
+                        current_app.logger.warning("KBBI shard index %s not updated: %s", spath, e)
+                    except Exception:
+                        pass
+            report["reused"].append(name)
+            report.setdefault("parts", {})[name] = ci.meta.get("stats") or {}
+            report["shards"][name] = {"seconds": round(time.perf_counter() - started, 6), "keys": len(ci), "reused": True}
+            parts[i] = ci
             continue
+        if ci is not None:
+            ci.close()
+        jobs.append((i, (path, spath, sig)))
 
-        # Collect definitions
-        defs = []
-        makna = entry.get("makna") or []
-        if isinstance(makna, list):
-            for m in makna:
-                if not isinstance(m, dict):
-                    # Sometimes it might be plain string
-                    txt = str(m).strip()
-                    if txt:
-                        defs.append(txt)
-                    continue
-                # kelas: list of dicts with kode/nama
-                label = ""
-                klist = m.get("kelas") or []
-                if isinstance(klist, list) and klist:
-                    k0 = klist[0]
-                    if isinstance(k0, dict):
-                        label = (k0.get("kode") or k0.get("nama") or "").strip()
-                # submakna could be list of strings
-                sub = m.get("submakna") or m.get("arti") or m.get("definisi") or []
-                if isinstance(sub, list):
-                    for s in sub:
-                        st = str(s).strip()
-                        if not st:
-                            continue
-                        defs.append(f"[{label}] {st}" if label else st)
-                elif isinstance(sub, str):
-                    st = sub.strip()
-                    if st:
-                        defs.append(f"[{label}] {st}" if label else st)
-
-        bucket = idx.get(key)
-        if not bucket:
-            bucket = {"lema": set(), "definisi": []}
-            idx[key] = bucket
-        bucket["lema"].add(nama)
-        # Deduplicate while preserving order
-        for d in defs:
-            if d and d not in bucket["definisi"]:
-                bucket["definisi"].append(d)
-
-    # finalize sets to lists
-    for k, v in idx.items():
-        v["lema"] = sorted(v["lema"])
+    results = _kbbi_run_shard_jobs(_kbbi_shard_job, [args for _, args in jobs])
+    for (i, (path, spath, sig)), (out, exc) in zip(jobs, results):
+        name = os.path.basename(path)
+        if out is None:
+            out = {"stats": {}, "phases": {}, "idx": {}, "error": str(exc), "write_error": None, "keys": 0, "seconds": 0.0}
+        if out["error"]:
+            try:
+                current_app.logger.warning("KBBI load failed for %s: %s", path, out["error"])
+            except Exception:
+                pass
+            report["failed"].append(name)
+        if out["write_error"]:
+            try:
+                current_app.logger.warning("KBBI shard index %s not written: %s", spath, out["write_error"])
+            except Exception:
+                pass
+        _kbbi_warn_skipped(path, out["stats"])
+        for phase, ph in out["phases"].items():
+            _kbbi_phase(report["phases"], phase, ph["seconds"], **{k: v for k, v in ph.items() if k != "seconds"})
+        if not out["error"]:
+            report["rebuilt"].append(name)
+        report.setdefault("parts", {})[name] = out["stats"]
+        report["shards"][name] = {"seconds": out["seconds"], "keys": out["keys"], "reused": False}
+        part = out["idx"]
+        if part is None:
+            part = open_index(spath)
+            if part is None:
+                # written by the worker but unreadable here: parse in-process
+                part = _kbbi_parse_shard(path)
+        parts[i] = part
+    return parts
+
+
+def _kbbi_build_index_incremental(paths, report):
+    """
+    Parse the part files into { normalized_lemma: {lema, definisi} },
+    reparsing only the parts that changed since their shard index was written
+    and merging the rest from KBBI_SHARD_INDEX_DIR (in part order, so merge
+    order does not depend on which parts were reparsed). Parts that failed to
+    parse are listed in report["failed"] and contribute nothing.
+    """
+    idx = {}
+    for part in _kbbi_shard_indices(paths, report):
+        started = time.perf_counter()
+        n_keys = 0
+        for key, val in part.items():
+            _kbbi_index_merge(idx, key, val.get("lema") or (), val.get("definisi") or ())
+            n_keys += 1
+        _kbbi_phase(report["phases"], "merge_shards", time.perf_counter() - started, keys=n_keys)
+        if hasattr(part, "close"):
+            part.close()
+    # drop shard indices of part files that no longer exist
+    names = {os.path.basename(p) + ".bin" for p in paths}
+    for sp in glob.glob(os.path.join(KBBI_SHARD_INDEX_DIR, "*.bin")):
+        if os.path.basename(sp) not in names:
+            try:
+                os.remove(sp)
+                report["removed"].append(os.path.basename(sp)[:-4])
+            except OSError:
+                pass
+    return _kbbi_index_finalize(idx, report["phases"])
+
+
+def _kbbi_publish_reindex(kind, report):
+    """
+    Publish a finished reindex report. _KBBI_REINDEX is swapped for a new dict
+    holding a copy, so readers take it without _KBBI_BUILD_LOCK.
+    """
+    global _KBBI_REINDEX
+    _KBBI_REINDEX = dict(_KBBI_REINDEX, **{kind: copy.deepcopy(report)})
+
+
+def _kbbi_write_index(idx, sources, report):
+    """
+    Compile the merged index into KBBI_INDEX_FILE, log the per-phase build
+    report and publish it in _KBBI_REINDEX. Parts that failed to parse are
+    left out of the stamped source signature, so the next open sees the file
+    as stale and retries them.
+    """
+    parts = report.pop("parts", {})
+    if report["failed"]:
+        sources = [s for s in sources if s[0] not in report["failed"]]
+    started = time.perf_counter()
+    try:
+        compile_index(idx, KBBI_INDEX_FILE, meta={
+            "sources": sources, "parts": parts, "reindex": report, "built_at": time.time(),
+        })
+    finally:
+        _kbbi_phase(report["phases"], "compile", time.perf_counter() - started, keys=len(idx))
+        _kbbi_publish_reindex("offline_index", report)
+        try:
+            current_app.logger.info(
+                "KBBI offline index: %d keys; rebuilt=%s; phases=%s",
+                len(idx), report["rebuilt"], report["phases"],
+            )
+        except Exception:
+            pass
+
+
+def _kbbi_compile_index():
+    """
+    Compile step: parse the part files and write KBBI_INDEX_FILE.
+    Returns { path, files, entries, rebuilt, phases, shards }.
+    """
+    with _KBBI_BUILD_LOCK:
+        paths = sorted(glob.glob(KBBI_FILE_GLOB))
+        sources = _kbbi_sources_signature(paths)
+        report = _kbbi_new_reindex_report()
+        idx = _kbbi_build_index_incremental(paths, report)
+        _kbbi_write_index(idx, sources, report)
+    return {
+        "path": KBBI_INDEX_FILE, "files": len(paths), "entries": len(idx),
+        "rebuilt": report["rebuilt"], "phases": report["phases"], "shards": report["shards"],
+    }
+
+
+def _kbbi_build_index():
+    """
+    Return the offline index: normalized_lemma -> { lema: [...], definisi: [...] }.
+    Built once per index generation (see _kbbi_open_or_compile_index).
+    """
+    return _KBBI_INDICES.get("offline_index")
 
-    _kbbi_index = idx
-    return _kbbi_index
+
+def _kbbi_open_or_compile_index(info=None):
+    """
+    Open the compiled, memory-mapped KBBI_INDEX_FILE when it matches the current
+    part files; otherwise recompile it first. Falls back to an in-memory dict
+    if the compiled file cannot be written (e.g. read-only data dir).
+    `info` (optional dict) receives the build metadata served by /api/kbbi/stats.
+    """
+    paths = sorted(glob.glob(KBBI_FILE_GLOB))
+    sources = _kbbi_sources_signature(paths)
+    ci = open_index(KBBI_INDEX_FILE, sources)
+    parts = None
+    if ci is None:
+        report = _kbbi_new_reindex_report()
+        idx = _kbbi_build_index_incremental(paths, report)
+        parts = report.get("parts", {})
+        try:
+            _kbbi_write_index(idx, sources, report)
+            ci = open_index(KBBI_INDEX_FILE, sources)
+        except Exception as e:
+            try:
+                current_app.logger.warning("KBBI index compile failed, using in-memory index: %s", e)
+            except Exception:
+                pass
+    if ci is not None:
+        parts = ci.meta.get("parts") or {}
+    if info is not None:
+        info.update({
+            "files": [{"name": n, "bytes": size} for n, size, _ in sources],
+            "source_bytes": sum(size for _, size, _ in sources),
+            "entries_loaded": sum(int(p.get("entries", 0)) for p in parts.values()),
+            "skipped_bytes": sum(int(p.get("skipped_bytes", 0)) for p in parts.values()),
+            "compiled": ci is not None,
+            "compiled_built_at": ci.meta.get("built_at") if ci is not None else None,
+        })
+    return ci if ci is not None else idx
 
 
 def _first_kelas(m):
@@ -349,67 +856,104 @@ def _kbbi_transform_word_record(rec):
     }
 
 
-def _kbbi_load_word_db_raw():
+def _kbbi_parse_word_shard(path):
     """
-    Load raw word database JSON shards as a combined dict.
-    Supports multiple files matching KBBI_WORD_DB_GLOB.
-    Returns empty dict on error.
+    Parse one word DB shard into a WordShard (records kept as raw JSON
+    bytes). Runs in a worker process; a WordShard pickles compactly.
     """
-    combined = {}
+    with open(path, "rb") as f:
+        return WordShard.parse(os.path.basename(path), f.read(), _kbbi_normalize)
+
+
+def _kbbi_load_word_shards():
+    """
+    Load the word database shards matching KBBI_WORD_DB_GLOB, in file order.
+    Unchanged shards (size + content hash) are served from _KBBI_WORD_SHARDS;
+    the others are parsed again, in parallel (see _kbbi_run_shard_jobs). A
+    shard that fails to parse is skipped. Returns a list of WordShard.
+    """
+    report = _kbbi_new_reindex_report()
+    shards = []
     try:
         paths = sorted(glob.glob(KBBI_WORD_DB_GLOB))
-        for p in paths:
+        shards = [None] * len(paths)
+        jobs = []
+        for i, path in enumerate(paths):
+            name = os.path.basename(path)
+            started = time.perf_counter()
+            cached = _KBBI_WORD_SHARDS.get(name)
             try:
-                with open(p, "r", encoding="utf-8") as f:
-                    obj = json.load(f)
-                if isinstance(obj, dict):
-                    for k, v in obj.items():
-                        # keep first occurrence to avoid accidental overwrite
-                        if k not in combined:
-                            combined[k] = v
-            except Exception as e:
+                sig = _kbbi_file_signature(path, cached[0] if cached else None)
+            except OSError as e:
                 try:
-                    current_app.logger.warning("Failed loading word DB shard %s: %s", p, e)
+                    current_app.logger.warning("Failed loading word DB shard %s: %s", path, e)
                 except Exception:
                     pass
-    except Exception:
-        pass
-    return combined
+                continue
+            if cached and _kbbi_shard_unchanged(sig, cached[0]):
+                if sig["mtime_ns"] != cached[0]["mtime_ns"]:
+                    _KBBI_WORD_SHARDS[name] = (sig, cached[1])
+                report["reused"].append(name)
+                report["shards"][name] = {
+                    "seconds": round(time.perf_counter() - started, 6), "records": len(cached[1]), "reused": True,
+                }
+                shards[i] = cached[1]
+            else:
+                jobs.append((i, path, sig))
+        started = time.perf_counter()
+        results = _kbbi_run_shard_jobs(_kbbi_parse_word_shard, [(path,) for _, path, _ in jobs])
+        _kbbi_phase(report["phases"], "parse_shards", time.perf_counter() - started, files=len(jobs))
+        for (i, path, sig), (shard, exc) in zip(jobs, results):
+            name = os.path.basename(path)
+            if shard is None:
+                try:
+                    current_app.logger.warning("Failed loading word DB shard %s: %s", path, exc)
+                except Exception:
+                    pass
+                report["failed"].append(name)
+                continue
+            _KBBI_WORD_SHARDS[name] = (sig, shard)
+            report["rebuilt"].append(name)
+            report["shards"][name] = {"seconds": shard.seconds, "records": len(shard), "reused": False}
+            shards[i] = shard
+        names = {os.path.basename(p) for p in paths}
+        for name in [n for n in _KBBI_WORD_SHARDS if n not in names]:
+            _KBBI_WORD_SHARDS.pop(name, None)
+            report["removed"].append(name)
+    except Exception as e:
+        # never publish a store built from part of the shards
+        try:
+            current_app.logger.exception("KBBI word DB load failed: %r", e)
+        except Exception:
+            pass
+        raise
+    _kbbi_publish_reindex("word_db", report)
+    return [sh for sh in shards if sh is not None]
 
 
 def _kbbi_build_word_index():
     """
-    Build indices for fast lookup:
-      - by_key: normalized top-level key -> record
-      - by_lema: normalized entri.nama/lema -> record
-      - orig_key: normalized top-level key -> original key string
-      - raw: the raw dict
-    """
-    global _KBBI_WORD_INDEX
-    if _KBBI_WORD_INDEX is not None:
-        return _KBBI_WORD_INDEX
-
-    raw = _kbbi_load_word_db_raw()
-    by_key = {}
-    by_lema = {}
-    orig_key = {}
-    for k, rec in (raw.items() if isinstance(raw, dict) else []):
-        nk = _kbbi_normalize(k)
-        if nk:
-            by_key[nk] = rec
-            orig_key[nk] = k
-        data = (rec or {}).get("data") or {}
-        entri = data.get("entri") or []
-        if isinstance(entri, list):
-            for ent in entri:
-                if isinstance(ent, dict):
-                    nama = ent.get("nama") or ent.get("lema")
-                    if isinstance(nama, str):
-                        ln = _kbbi_normalize(nama)
-                        if ln and ln not in by_lema:
-                            by_lema[ln] = rec
-    _KBBI_WORD_INDEX = {"by_key": by_key, "by_lema": by_lema, "orig_key": orig_key, "raw": raw}
-    return _KBBI_WORD_INDEX
+    Return the word DB store, built once per index generation (see _kbbi_make_word_index).
+    """
+    return _KBBI_INDICES.get("word_db")
+
+
+def _kbbi_make_word_index(info=None):
+    """
+    Build the WordStore over all word DB shards: lookups by normalized key or
+    entri.nama/lema, records decoded from their raw JSON bytes on demand
+    (first shard defining a key wins).
+    `info` (optional dict) receives the shard list and record count.
+    """
+    store = WordStore(_kbbi_load_word_shards(), _kbbi_normalize)
+    if info is not None:
+        sources = _kbbi_sources_signature(sorted(glob.glob(KBBI_WORD_DB_GLOB)))
+        info.update({
+            "files": [{"name": n, "bytes": size} for n, size, _ in sources],
+            "source_bytes": sum(size for _, size, _ in sources),
+            "records": len(store),
+        })
+    return store
 
 
 def _kbbi_lookup_word_db(kata):
@@ -417,311 +961,1415 @@ def _kbbi_lookup_word_db(kata):
     Lookup kata in kbbi_word_data.json (by top-level key or by entri.nama/lema).
     Returns transformed dict or None.
     """
-    idx = _kbbi_build_word_index()
-    norm = _kbbi_normalize(kata)
-    rec = idx["by_key"].get(norm) or idx["by_lema"].get(norm)
+    rec = _kbbi_build_word_index().get(_kbbi_normalize(kata))
     if not rec:
         return None
     return _kbbi_transform_word_record(rec)
 
 
-def _kbbi_word_suggestions(prefix_norm: str, limit: int = 10):
+def _kbbi_build_suggest_index():
+    """
+    Return the shared prefix index used for `saran`, built once per index generation.
+    """
+    return _KBBI_INDICES.get("suggest")
+
+
+def _kbbi_make_suggest_index(word_index, offline_index):
+    """
+    Build the prefix index fed by the word DB (original keys as display) and
+    the offline index (normalized keys). Both arguments are callables returning
+    the index, so a failure in one source only drops that source.
+    """
+    sx = PrefixIndex()
+    try:
+        for nkey, orig in word_index().display_items():
+            sx.add(nkey, orig)
+    except Exception as e:
+        try:
+            current_app.logger.warning("KBBI suggest: word DB keys unavailable: %r", e)
+        except Exception:
+            pass
+    try:
+        for k in offline_index().keys():
+            sx.add(k)
+    except Exception as e:
+        try:
+            current_app.logger.warning("KBBI suggest: offline keys unavailable: %r", e)
+        except Exception:
+            pass
+    return sx.freeze()
+
+
+def _kbbi_suggestions(prefix_norm: str, limit: int = 10):
     """
-    Suggest using original keys from word DB matching a normalized prefix.
+    Top-N ranked keys (word DB + offline index) matching a normalized prefix.
+    """
+    sx = _kbbi_build_suggest_index()
+    _kbbi_fold_hits(sx)
+    return sx.complete(prefix_norm, limit)
+
+
+def _kbbi_note_hit(key_norm: str):
+    """
+    Count a successful lookup for suggestion ranking. Only a counter is
+    bumped here; the counts reach the index in _kbbi_fold_hits.
+    """
+    with _KBBI_HITS_LOCK:
+        _KBBI_PENDING_HITS[key_norm] += 1
+        fold = len(_KBBI_PENDING_HITS) >= _KBBI_HITS_FOLD_AT
+    if fold:
+        sx = _KBBI_INDICES.peek("suggest")
+        if sx is not None:
+            _kbbi_fold_hits(sx)
+
+
+def _kbbi_fold_hits(sx):
+    """
+    Apply the pending lookup hits to the ranking counts of PrefixIndex sx.
+    Called before ranking suggestions, so lookups never pay for the bisects.
+    """
+    global _KBBI_PENDING_HITS
+    if not _KBBI_PENDING_HITS:
+        return
+    with _KBBI_FOLD_LOCK:
+        with _KBBI_HITS_LOCK:
+            pending, _KBBI_PENDING_HITS = _KBBI_PENDING_HITS, Counter()
+        for key, n in pending.items():
+            sx.note_hit(key, n)
+
+
+def _kbbi_build_fuzzy_index():
+    """
+    Build the typo-tolerant (edit distance <= _KBBI_FUZZY_MAX_DISTANCE) index
+    over the suggestion vocabulary.
+    """
+    return _KBBI_INDICES.get("fuzzy")
+
+
+def _kbbi_build_morph_index():
+    """
+    Derived form -> base lemma index (affix stripping) over the suggestion vocabulary.
+    """
+    return _KBBI_INDICES.get("morph")
+
+
+def _kbbi_build_search_index():
+    """
+    Full-text (BM25) index over the definitions of the suggestion vocabulary.
+    """
+    return _KBBI_INDICES.get("search")
+
+
+def _kbbi_definition_texts(word_index, offline_index, key):
+    """
+    Definition texts of one normalized key: offline `definisi` followed by
+    the word DB `makna.deskripsi` texts not already listed.
     """
-    idx = _kbbi_build_word_index()
     out = []
-    for nkey, orig in idx["orig_key"].items():
-        if nkey.startswith(prefix_norm):
-            out.append(orig)
-            if len(out) >= limit:
-                break
+    data = offline_index.get(key)
+    if data:
+        out.extend(data.get("definisi") or [])
+    rec = word_index.by_key(key)
+    if rec:
+        seen = set(out)
+        for ent in _kbbi_transform_word_record(rec)["entri"]:
+            for m in ent["makna"]:
+                if m["deskripsi"] not in seen:
+                    seen.add(m["deskripsi"])
+                    out.append(m["deskripsi"])
     return out
 
 
-@kbbi_bp.get("/api/kbbi/cek")
-def kbbi_cek():
+def _kbbi_make_search_index(ix, info=None):
     """
-    Query: ?kata=...
-    Returns (online-first dengan offline fallback dan word-db):
-      200: {
-        valid: true, kata, lema: ["..."], definisi: ["..."],
-        entri: [{lema, makna:[{kelas, deskripsi, contoh:[], sinonim:[], antonim:[]}]}],
-        saran: [], sumber: "kbbi-online"|"kbbi-offline"|"kbbi-worddb"|"kbbi-simple", cache_hit: bool
-      }
-      404: { valid: false, error: "kata tidak ditemukan", saran: [...] }
-      400: { error: "parameter 'kata' wajib diisi" }
-      429: { error: "Terlalu banyak permintaan, coba lagi nanti." }
+    Build the search part of index set `ix` from its own word DB, offline
+    index and suggest parts. When the source files are unchanged since the
+    published generation built its search index, those postings are reused
+    instead of tokenizing the corpus again.
     """
-    kata = (request.args.get("kata") or "").strip()
-    if not kata:
-        return jsonify({"error": "parameter 'kata' wajib diisi"}), 400
+    sources = _kbbi_sources_signature(sorted(glob.glob(KBBI_FILE_GLOB)) + sorted(glob.glob(KBBI_WORD_DB_GLOB)))
+    px = ix.get("suggest")
+    texts = partial(_kbbi_definition_texts, ix.get("word_db"), ix.get("offline_index"))
+    current = _KBBI_INDICES
+    prev = current.peek("search") if current is not None and current is not ix else None
+    if prev is not None and (current.info.get("search") or {}).get("sources") == sources and prev.words.keys == px.keys:
+        sx = prev.rebind(px, texts)
+        reused = True
+    else:
+        sx = SearchIndex(px, texts)
+        reused = False
+    if info is not None:
+        info.update({"sources": sources, "reused": reused, "documents": len(sx), "terms": len(sx.terms)})
+    return sx
 
-    # Rate limiting sederhana per-IP
-    try:
-        ip = (request.headers.get("X-Forwarded-For") or request.remote_addr or "").split(",")[0].strip()
-    except Exception:
-        ip = ""
-    now_ts = time.time()
-    bucket = _RATE_BUCKET.get(ip, [])
-    bucket = [t for t in bucket if now_ts - t < _RATE_LIMIT_WINDOW]
-    if len(bucket) >= _RATE_LIMIT_MAX:
-        return jsonify({"error": "Terlalu banyak permintaan, coba lagi nanti."}), 429
-    bucket.append(now_ts)
-    _RATE_BUCKET[ip] = bucket
 
-    key_norm = _kbbi_normalize(kata)
+def _kbbi_build_relation_graph():
+    """
+    Synonym/antonym graph over the word DB records, built once per index generation.
+    """
+    return _KBBI_INDICES.get("relasi")
+
+
+def _kbbi_make_relation_graph(word_index, info=None):
+    """
+    One node per word DB key (original key as display) plus every word named
+    in a sinonim/antonim list; one edge per relation, in both directions.
+    """
+    g = RelationGraph(_kbbi_normalize)
+    for nk, rec in word_index.items():
+        src = word_index.display(nk)
+        g.node(src)
+        for ent in _kbbi_transform_word_record(rec)["entri"]:
+            for m in ent["makna"]:
+                for w in m["sinonim"]:
+                    g.add(src, w, SINONIM)
+                for w in m["antonim"]:
+                    g.add(src, w, ANTONIM)
+    g.freeze()
+    if info is not None:
+        info.update({"nodes": len(g), "edges": g.edge_count()})
+    return g
+
+
+def _kbbi_index_built(name, info):
     try:
-        current_app.logger.info("kbbi_cek query kata=%r norm=%r simple=%r", kata, key_norm, KBBI_SIMPLE_AVAILABLE)
+        current_app.logger.info("KBBI %s built in %.3fs (%s entries)", name, info["seconds"], info["size"])
     except Exception:
         pass
 
-    # Cache hit?
-    c = _KBBI_CACHE.get(key_norm)
-    if c and (now_ts - (c.get("ts") or 0) < _KBBI_CACHE_TTL):
-        payload = dict(c.get("payload") or {})
-        if payload:
-            payload["cache_hit"] = True
-            return jsonify(payload)
 
-    # Try KBBI online first
-    if 'KBBI_ONLINE_AVAILABLE' in globals() and KBBI_ONLINE_AVAILABLE:
+# name -> maker(index_set); makers only read parts of the set they are given
+_KBBI_INDEX_MAKERS = {
+    "word_db": lambda ix: _kbbi_make_word_index(ix.info.setdefault("word_db", {})),
+    "offline_index": lambda ix: _kbbi_open_or_compile_index(ix.info.setdefault("offline_index", {})),
+    "suggest": lambda ix: _kbbi_make_suggest_index(partial(ix.get, "word_db"), partial(ix.get, "offline_index")),
+    "fuzzy": lambda ix: FuzzyIndex(ix.get("suggest"), max_distance=_KBBI_FUZZY_MAX_DISTANCE),
+    "morph": lambda ix: MorphIndex(ix.get("suggest")),
+    "search": lambda ix: _kbbi_make_search_index(ix, ix.info.setdefault("search", {})),
+    "relasi": lambda ix: _kbbi_make_relation_graph(ix.get("word_db"), ix.info.setdefault("relasi", {})),
+}
+
+
+def _kbbi_new_index_set(generation=0):
+    return IndexSet(_KBBI_INDEX_MAKERS, generation=generation, on_built=_kbbi_index_built, lock=_KBBI_BUILD_LOCK)
+
+
+_KBBI_INDICES = _kbbi_new_index_set()
+
+
+def _kbbi_warm_up_all(app=None):
+    _KBBI_WARMUP["started_at"] = time.time()
+    _KBBI_WARMUP["finished_at"] = None
+    _KBBI_WARMUP["error"] = None
+    try:
+        with _KBBI_BUILD_LOCK:
+            if app is not None:
+                with app.app_context():
+                    _KBBI_INDICES.build_all()
+            else:
+                _KBBI_INDICES.build_all()
+    except Exception as e:
+        _KBBI_WARMUP["error"] = repr(e)
         try:
-            obj = KBBIOnline(kata)
-            serial = obj.serialisasi()
-            # Map online serialization to expected entri format
-            entri_src = serial.get("entri") or []
-            entri_payload = []
-            if isinstance(entri_src, list):
-                for ent in entri_src:
-                    if not isinstance(ent, dict):
-                        continue
-                    nama = ent.get("nama") or ent.get("lema") or None
-                    makna_list = []
-                    for m in (ent.get("makna") or []):
-                        if not isinstance(m, dict):
-                            continue
-                        cls = ""
-                        klist = m.get("kelas") or []
-                        if isinstance(klist, list) and klist:
-                            k0 = klist[0]
-                            if isinstance(k0, dict):
-                                cls = (k0.get("kode") or k0.get("nama") or "").strip()
-                        sub = m.get("submakna") or m.get("arti") or m.get("definisi") or []
-                        deskr = ""
-                        if isinstance(sub, list) and sub:
-                            deskr = str(sub[0]).strip()
-                        elif isinstance(sub, str):
-                            deskr = sub.strip()
-                        contoh = m.get("contoh") or []
-                        sinonim = m.get("sinonim") or []
-                        antonim = m.get("antonim") or []
-                        makna_list.append({
-                            "kelas": cls,
-                            "deskripsi": deskr,
-                            "contoh": contoh if isinstance(contoh, list) else [],
-                            "sinonim": sinonim if isinstance(sinonim, list) else [],
-                            "antonim": antonim if isinstance(antonim, list) else [],
-                        })
-                    entri_payload.append({"lema": nama, "makna": makna_list})
-            lemma = []
-            for e in entri_payload:
-                nm = e.get("lema")
-                if nm:
-                    lemma.append(nm)
-            definisi = []
-            for e in entri_payload:
-                for m in e.get("makna", []):
-                    d = m.get("deskripsi")
-                    if d:
-                        definisi.append(f"[{m['kelas']}] {d}" if m.get("kelas") else d)
-            payload = {
-                "valid": True,
-                "kata": kata,
-                "lema": sorted(list({*lemma})),
-                "definisi": definisi,
-                "entri": entri_payload,
-                "saran": [],
-                "sumber": "kbbi-online",
-                "cache_hit": False,
-            }
-            _KBBI_CACHE[key_norm] = {"ts": now_ts, "payload": payload}
-            try:
-                current_app.logger.info("kbbi_cek online-hit kata=%r", kata)
-            except Exception:
-                pass
-            return jsonify(payload)
-        except Exception as ex_online:
-            # Jika tidak ditemukan oleh KBBI online, kirim 404 dengan saran dari online jika tersedia
+            app.logger.warning("KBBI warm-up failed: %r", e)
+        except Exception:
+            pass
+    finally:
+        _KBBI_WARMUP["finished_at"] = time.time()
+
+
+def kbbi_warm_up(app=None, background=True):
+    """
+    Build every KBBI index (word DB, offline index, suggest, fuzzy, morph, search,
+    relasi) ahead of the
+    first request. With background=True this runs in a daemon thread and
+    returns it; requests arriving meanwhile wait on the index set's build
+    lock instead of starting their own build.
+    """
+    if not background:
+        _kbbi_warm_up_all(app)
+        return None
+    t = threading.Thread(target=_kbbi_warm_up_all, args=(app,), name="kbbi-warmup", daemon=True)
+    _KBBI_WARMUP["started_at"] = time.time()
+    t.start()
+    return t
+
+
+def kbbi_preload(app=None):
+    """
+    Build every KBBI index now, in this process, for workers forked from it
+    (e.g. gunicorn --preload). The parts are flat arrays and bytes blobs, and
+    gc.freeze() moves everything allocated so far out of the cyclic GC's
+    reach, so neither collections nor lookups write into their pages and
+    every worker keeps sharing them copy-on-write. The offline index is an
+    mmap of KBBI_INDEX_FILE and is shared through the page cache either way.
+    A reload inside a worker builds a private generation again.
+    Returns kbbi_readiness().
+    """
+    kbbi_warm_up(app, background=False)
+    gc.collect()
+    if hasattr(gc, "freeze"):
+        gc.freeze()
+    return kbbi_readiness()
+
+
+def kbbi_readiness():
+    """
+    Readiness of the KBBI indices for /api/health:
+      { ready, warm_up: {started_at, finished_at, error},
+        word_db_loaded, offline_index_loaded, suggest_loaded, fuzzy_loaded, morph_loaded, search_loaded,
+        relasi_loaded,
+        builds: {name: {seconds, size, built_at}} }
+    Without a warm-up the indices are built lazily and `ready` is always true.
+    """
+    ix = _KBBI_INDICES
+    loaded = {
+        "word_db_loaded": ix.loaded("word_db"),
+        "offline_index_loaded": ix.loaded("offline_index"),
+        "suggest_loaded": ix.loaded("suggest"),
+        "fuzzy_loaded": ix.loaded("fuzzy"),
+        "morph_loaded": ix.loaded("morph"),
+        "search_loaded": ix.loaded("search"),
+        "relasi_loaded": ix.loaded("relasi"),
+    }
+    warming = _KBBI_WARMUP["started_at"] is not None and _KBBI_WARMUP["finished_at"] is None
+    return dict(
+        loaded,
+        ready=not warming and (_KBBI_WARMUP["started_at"] is None or all(loaded.values())),
+        warm_up=dict(_KBBI_WARMUP),
+        generation=ix.generation,
+        builds=ix.stats()["builds"],
+    )
+
+
+def _kbbi_fuzzy_distance(key_norm: str, max_distance: int = None):
+    """
+    Edit distance for key_norm. An explicit `max_distance` is used as given,
+    bounded only by what the index was built for (_KBBI_FUZZY_MAX_DISTANCE).
+    Without one: 1 for short words, _KBBI_FUZZY_MAX_DISTANCE from
+    _KBBI_FUZZY_LONG_WORD characters on.
+    """
+    if max_distance is not None:
+        return max(0, min(max_distance, _KBBI_FUZZY_MAX_DISTANCE))
+    return _KBBI_FUZZY_MAX_DISTANCE if len(key_norm) >= _KBBI_FUZZY_LONG_WORD else 1
+
+
+def _kbbi_fuzzy_suggestions(key_norm: str, max_distance: int = None, limit: int = 10):
+    """
+    [(kata, jarak)] for vocabulary words within `max_distance` edits of key_norm
+    (see _kbbi_fuzzy_distance).
+    """
+    fx = _kbbi_build_fuzzy_index()
+    _kbbi_fold_hits(fx.words)
+    return fx.lookup(key_norm, max_distance=_kbbi_fuzzy_distance(key_norm, max_distance), limit=limit)
+
+
+def _kbbi_saran(kata: str, key_norm: str, limit: int = 10):
+    """
+    Suggestions for a miss: typo matches first (edit distance), then words
+    starting with what was typed, then kbbi_simple's own suggestions.
+    """
+    combined = []
+    try:
+        for x, _ in _kbbi_fuzzy_suggestions(key_norm, limit=limit):
+            if x not in combined:
+                combined.append(x)
+    except Exception:
+        pass
+    if len(combined) < limit:
+        try:
+            for x in _kbbi_suggestions(key_norm, limit=limit) or []:
+                if x not in combined:
+                    combined.append(x)
+        except Exception:
+            pass
+    if len(combined) < limit and KBBI_SIMPLE_AVAILABLE:
+        try:
+            for x in get_saran(kata) or []:
+                if x not in combined:
+                    combined.append(x)
+        except Exception:
+            pass
+    return combined[:limit]
+
+
+def _kbbi_payload(kata, data, sumber):
+    """
+    Success payload for one word from a source record {lema, definisi, entri}.
+    """
+    return {
+        "valid": True,
+        "kata": kata,
+        "lema": data.get("lema", []),
+        "definisi": data.get("definisi", []),
+        "entri": data.get("entri", []),
+        "saran": [],
+        "sumber": sumber,
+    }
+
+
+def _kbbi_miss_payload(saran, coba_lagi=False):
+    """
+    404 body. coba_lagi marks a miss that is not definitive (a source failed,
+    timed out or was unavailable), so a retry may find the word.
+    """
+    payload = {"valid": False, "error": "kata tidak ditemukan", "saran": saran}
+    if coba_lagi:
+        payload["coba_lagi"] = True
+    return payload
+
+
+def _kbbi_online_payload(kata):
+    """
+    Look kata up with KBBI online and map its serialization to the API payload.
+    Raises KBBI_TidakDitemukan when the word does not exist, or any network error.
+    """
+    obj = KBBIOnline(kata)
+    serial = obj.serialisasi()
+    # Map online serialization to expected entri format
+    entri_src = serial.get("entri") or []
+    entri_payload = []
+    if isinstance(entri_src, list):
+        for ent in entri_src:
+            if not isinstance(ent, dict):
+                continue
+            nama = ent.get("nama") or ent.get("lema") or None
+            makna_list = []
+            for m in (ent.get("makna") or []):
+                if not isinstance(m, dict):
+                    continue
+                cls = ""
+                klist = m.get("kelas") or []
+                if isinstance(klist, list) and klist:
+                    k0 = klist[0]
+                    if isinstance(k0, dict):
+                        cls = (k0.get("kode") or k0.get("nama") or "").strip()
+                sub = m.get("submakna") or m.get("arti") or m.get("definisi") or []
+                deskr = ""
+                if isinstance(sub, list) and sub:
+                    deskr = str(sub[0]).strip()
+                elif isinstance(sub, str):
+                    deskr = sub.strip()
+                contoh = m.get("contoh") or []
+                sinonim = m.get("sinonim") or []
+                antonim = m.get("antonim") or []
+                makna_list.append({
+                    "kelas": cls,
+                    "deskripsi": deskr,
+                    "contoh": contoh if isinstance(contoh, list) else [],
+                    "sinonim": sinonim if isinstance(sinonim, list) else [],
+                    "antonim": antonim if isinstance(antonim, list) else [],
+                })
+            entri_payload.append({"lema": nama, "makna": makna_list})
+    lemma = []
+    for e in entri_payload:
+        nm = e.get("lema")
+        if nm:
+            lemma.append(nm)
+    definisi = []
+    for e in entri_payload:
+        for m in e.get("makna", []):
+            d = m.get("deskripsi")
+            if d:
+                definisi.append(f"[{m['kelas']}] {d}" if m.get("kelas") else d)
+    return _kbbi_payload(
+        kata,
+        {"lema": sorted(list({*lemma})), "definisi": definisi, "entri": entri_payload},
+        "kbbi-online",
+    )
+
+
+def _kbbi_online_call(kata, key_norm):
+    """
+    One upstream call, run only by the singleflight leader: the breaker
+    records its outcome once (a failure as soon as the budget passes, timed
+    from when the call starts running), and a hit is backfilled into the
+    cache, also for callers that stopped waiting. A definite "not found"
+    (KBBI_TidakDitemukan) counts as healthy. Raises BreakerOpen when the
+    breaker does not allow the call.
+    """
+    prepared = _KBBI_ONLINE_BREAKER.call(
+        lambda: PreparedJSON(_kbbi_online_payload(kata)),
+        deadline=_KBBI_ONLINE_BUDGET,
+        ok=(KBBI_TidakDitemukan,),
+    )
+    try:
+        _kbbi_remember(key_norm, prepared)
+    except Exception:
+        pass
+    return prepared
+
+
+def _kbbi_online_lookup(kata, key_norm):
+    """
+    _kbbi_online_call, coalesced per normalized word: concurrent callers
+    wait for the same upstream request and receive the same PreparedJSON.
+    """
+    return _KBBI_ONLINE_FLIGHT.do(key_norm, partial(_kbbi_online_call, kata, key_norm))
+
+
+def _kbbi_online_release(fut):
+    with _KBBI_ONLINE_QUEUE_LOCK:
+        _KBBI_ONLINE_QUEUE["in_flight"] -= 1
+
+
+def _kbbi_online_submit(kata, key_norm):
+    """
+    Start an online lookup on the shared pool. Returns a Future, or None when
+    the breaker is open or the pool already has _KBBI_ONLINE_WORKERS +
+    _KBBI_ONLINE_QUEUE_MAX calls running or queued.
+    """
+    if not _KBBI_ONLINE_BREAKER.allow(reserve=False):
+        return None
+    with _KBBI_ONLINE_QUEUE_LOCK:
+        if _KBBI_ONLINE_QUEUE["in_flight"] >= _KBBI_ONLINE_WORKERS + _KBBI_ONLINE_QUEUE_MAX:
+            _KBBI_ONLINE_QUEUE["rejected"] += 1
+            return None
+        _KBBI_ONLINE_QUEUE["in_flight"] += 1
+    try:
+        fut = _KBBI_ONLINE_POOL.submit(_kbbi_online_lookup, kata, key_norm)
+    except Exception:
+        _kbbi_online_release(None)
+        raise
+    fut.add_done_callback(_kbbi_online_release)
+    return fut
+
+
+def _kbbi_online_pool_stats():
+    with _KBBI_ONLINE_QUEUE_LOCK:
+        return dict(_KBBI_ONLINE_QUEUE, workers=_KBBI_ONLINE_WORKERS, queue_max=_KBBI_ONLINE_QUEUE_MAX)
+
+
+def _kbbi_online_saran(ex_online):
+    """
+    Suggestions carried by a KBBI online TidakDitemukan error, if any.
+    """
+    try:
+        _obj = getattr(ex_online, "objek", None)
+        return list(getattr(_obj, "saran_entri", []) or []) if _obj else []
+    except Exception:
+        return []
+
+
+def _kbbi_lookup_local(kata, key_norm, failed=None):
+    """
+    Resolve kata from the enabled local sources only, in resolver order
+    (word DB -> kbbi_simple -> offline index -> root of a derived form).
+    Returns the payload or None; sources that failed are appended to `failed`.
+    """
+    return _KBBI_RESOLVER.resolve(kata, key_norm, exclude=("kbbi-online",), failed=failed)[1]
+
+
+def _kbbi_lookup_morph(kata, key_norm):
+    """
+    Resolve a derived form through its base lemma (affix stripping), if the
+    vocabulary attests the derivation (MorphIndex.attested). Roots with a word
+    DB record are preferred over offline-only ones. The payload is the base
+    lemma's, plus bentuk_dasar (the root) and imbuhan (stripped affixes).
+    Returns the payload or None.
+    """
+    roots = _kbbi_build_morph_index().roots(key_norm)
+    if not roots:
+        return None
+    widx = _kbbi_build_word_index()
+    found = None
+    for display, root, affixes in roots:
+        rec = widx.get(root)
+        if rec:
+            found = (display, affixes, _kbbi_transform_word_record(rec), "kbbi-worddb")
+            break
+    if found is None:
+        idx = _kbbi_build_index()
+        for display, root, affixes in roots:
+            data = idx.get(root)
+            if data:
+                found = (display, affixes, {"lema": data.get("lema", []), "definisi": data.get("definisi", [])}, "kbbi-offline")
+                break
+    if found is None:
+        return None
+    display, affixes, data, sumber = found
+    payload = _kbbi_payload(kata, data, sumber)
+    payload["bentuk_dasar"] = display
+    payload["imbuhan"] = affixes
+    return payload
+
+
+def _kbbi_source_worddb(kata, key_norm, timeout=None):
+    wd = _kbbi_lookup_word_db(kata)
+    return _kbbi_payload(kata, wd, "kbbi-worddb") if wd else None
+
+
+def _kbbi_source_simple(kata, key_norm, timeout=None):
+    data = cari_kata(kata)
+    return _kbbi_payload(kata, data, "kbbi-simple") if data else None
+
+
+def _kbbi_source_offline(kata, key_norm, timeout=None):
+    data = _kbbi_build_index().get(key_norm)
+    if not data:
+        return None
+    # offline dataset tidak memiliki struktur makna lengkap
+    return _kbbi_payload(kata, {"lema": data.get("lema", []), "definisi": data.get("definisi", [])}, "kbbi-offline")
+
+
+def _kbbi_source_morph(kata, key_norm, timeout=None):
+    # Bentuk turunan (menyalakan -> nyala): cari kata dasarnya secara lokal
+    return _kbbi_lookup_morph(kata, key_norm)
+
+
+def _kbbi_source_online(kata, key_norm, timeout=None):
+    """
+    KBBI online, waiting at most `timeout` seconds; a call over budget keeps
+    running and is backfilled into the cache. Returns a PreparedJSON. Raises
+    Miss when KBBI online does not know kata, Unavailable when the breaker is
+    open or the pool is full.
+    """
+    fut = _kbbi_online_submit(kata, key_norm)
+    if fut is None:
+        raise Unavailable()
+    try:
+        return fut.result(timeout=timeout)
+    except BreakerOpen:
+        raise Unavailable()
+    except FutureTimeout:
+        try:
+            current_app.logger.info("kbbi_cek online over budget kata=%r; backfilling", kata)
+        except Exception:
+            pass
+        raise
+    except KBBI_TidakDitemukan as ex_online:
+        raise Miss(_kbbi_online_saran(ex_online))
+
+
+def _kbbi_source_error(name, args, ex):
+    try:
+        current_app.logger.warning("KBBI %s lookup error for %r: %r", name.replace("kbbi-", ""), args[0], ex)
+    except Exception:
+        pass
+
+
+def _kbbi_configure_resolver(mode=None, disabled=None):
+    """
+    Apply a lookup mode (one of _KBBI_RESOLVER_MODES; unknown modes fall back
+    to offline-first) and a set of disabled source names to the resolver.
+    Returns the resulting source order.
+    """
+    global _KBBI_RESOLVER_MODE
+    mode = mode if mode in _KBBI_RESOLVER_MODES else "offline-first"
+    disabled = _KBBI_RESOLVER_DISABLED if disabled is None else frozenset(disabled)
+    _KBBI_RESOLVER_MODE = mode
+    for name in ("kbbi-worddb", "kbbi-simple", "kbbi-offline", "kbbi-morph"):
+        ok = name not in disabled and (name != "kbbi-simple" or KBBI_SIMPLE_AVAILABLE)
+        _KBBI_RESOLVER.configure(name, enabled=ok)
+    _KBBI_RESOLVER.configure(
+        "kbbi-online",
+        priority=0 if mode == "online-first" else 100,
+        enabled=KBBI_ONLINE_AVAILABLE and mode != "local-only" and "kbbi-online" not in disabled,
+    )
+    return _KBBI_RESOLVER.order()
+
+
+# Sources of /api/kbbi/cek, tried in priority order (see _KBBI_RESOLVER_MODES)
+_KBBI_RESOLVER = ResolverChain("kbbi", on_error=_kbbi_source_error)
+_KBBI_RESOLVER.register("kbbi-worddb", _kbbi_source_worddb, priority=10, timeout=_KBBI_LOCAL_TIMEOUT)
+_KBBI_RESOLVER.register("kbbi-simple", _kbbi_source_simple, priority=20, timeout=_KBBI_LOCAL_TIMEOUT)
+_KBBI_RESOLVER.register("kbbi-offline", _kbbi_source_offline, priority=30, timeout=_KBBI_LOCAL_TIMEOUT)
+_KBBI_RESOLVER.register("kbbi-morph", _kbbi_source_morph, priority=40, timeout=_KBBI_LOCAL_TIMEOUT)
+_KBBI_RESOLVER.register("kbbi-online", _kbbi_source_online, priority=100, timeout=_KBBI_ONLINE_BUDGET)
+_kbbi_configure_resolver(_KBBI_RESOLVER_MODE)
+
+
+def _kbbi_remember(key_norm, payload):
+    """
+    Cache a hit (payload dict or PreparedJSON) and return it as PreparedJSON.
+    """
+    prepared = payload if isinstance(payload, PreparedJSON) else PreparedJSON(payload)
+    _KBBI_CACHE.set(key_norm, prepared)
+    # a late online answer (backfill) overrides an earlier local miss
+    _KBBI_MISS_CACHE.delete(key_norm)
+    # only online answers are worth persisting; local ones are cheap to rebuild
+    sumber = prepared.payload.get("sumber")
+    if _KBBI_PERSISTENT is not None and sumber == "kbbi-online":
+        _KBBI_PERSISTENT.set(key_norm, prepared, sumber)
+    _kbbi_note_hit(key_norm)
+    return prepared
+
+
+def _kbbi_cache_get(key_norm):
+    """
+    Cached PreparedJSON: memory first, then the persistent tier (its stored
+    bytes are promoted into memory as is, for the rest of their lifetime
+    only). None on miss.
+    """
+    c = _KBBI_CACHE.get(key_norm)
+    if c is None and _KBBI_PERSISTENT is not None:
+        found = _KBBI_PERSISTENT.get(key_norm, raw=True, with_ts=True)
+        if found is not None and found[0]:
+            text, ts = found
+            c = PreparedJSON(body=text.encode("utf-8"))
+            left = _KBBI_PERSISTENT.ttl - (time.time() - ts)
+            if left > 0:
+                _KBBI_CACHE.set(key_norm, c, ttl=min(left, _KBBI_CACHE.ttl))
+    if c is None:
+        return None
+    _kbbi_note_hit(key_norm)
+    return c
+
+
+def _kbbi_remember_miss(key_norm, saran, definitive=True):
+    """
+    Build the miss payload for key_norm and, if the miss is definitive, cache
+    it in the negative cache. A miss after a failed, timed out or unavailable
+    source is not cached and is marked coba_lagi. Returns it as PreparedJSON.
+    """
+    prepared = PreparedJSON(_kbbi_miss_payload(saran, coba_lagi=not definitive))
+    if key_norm and definitive:
+        _KBBI_MISS_CACHE.set(key_norm, prepared)
+    return prepared
+
+
+def _kbbi_count_source(name):
+    with _KBBI_SOURCE_LOCK:
+        _KBBI_SOURCE_COUNTS[name or "miss"] += 1
+
+
+def _kbbi_source_stats():
+    """
+    { lookups, sources: {name: {count, ratio}} } over all answered lookups.
+    """
+    with _KBBI_SOURCE_LOCK:
+        counts = dict(_KBBI_SOURCE_COUNTS)
+    total = sum(counts.values())
+    return {
+        "lookups": total,
+        "sources": {k: {"count": v, "ratio": (v / total) if total else 0.0} for k, v in sorted(counts.items())},
+    }
+
+
+def _kbbi_send(prepared, status=200, cache_hit=False):
+    """
+    Response from a PreparedJSON without re-encoding: the stored bytes (gzip
+    when accepted and large enough), its ETag (answering 304 on a matching
+    If-None-Match) and the cache flag in the X-Cache-Hit header. The gzip
+    body is a different representation, so it gets its own ETag ("-gz").
+    """
+    body = prepared.body
+    gz = len(body) >= _KBBI_GZIP_MIN_BYTES and "gzip" in request.accept_encodings
+    etag = prepared.etag + "-gz" if gz else prepared.etag
+    if status == 200 and request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        resp = Response(prepared.gzipped() if gz else body, status=status, mimetype="application/json")
+        if gz:
+            resp.headers["Content-Encoding"] = "gzip"
+    resp.set_etag(etag)
+    resp.headers["Vary"] = "Accept-Encoding"
+    resp.headers["X-Cache-Hit"] = "1" if cache_hit else "0"
+    return resp
+
+
+@kbbi_bp.get("/api/kbbi/cek")
+@rate_limit(_KBBI_LIMITER)
+def kbbi_cek():
+    """
+    Query: ?kata=...
+    Sources are tried in the configured order (KBBI_RESOLVER_MODE: offline-first,
+    online-first or local-only; see _KBBI_RESOLVER_MODES).
+    Returns:
+      200: {
+        valid: true, kata, lema: ["..."], definisi: ["..."],
+        entri: [{lema, makna:[{kelas, deskripsi, contoh:[], sinonim:[], antonim:[]}]}],
+        saran: [], sumber: "kbbi-online"|"kbbi-offline"|"kbbi-worddb"|"kbbi-simple",
+        bentuk_dasar?, imbuhan?  (only when resolved through the root of a derived form)
+      }
+      304: body unchanged (If-None-Match matched the ETag)
+      404: { valid: false, error: "kata tidak ditemukan", saran: [...], coba_lagi? }
+      400: { error: "parameter 'kata' wajib diisi" }
+      429: { error: "Terlalu banyak permintaan, coba lagi nanti." }
+    coba_lagi: true marks a 404 given while a source failed or was unavailable
+    (e.g. KBBI online down); only misses without it are cached.
+    200/304/404 carry ETag and X-Cache-Hit: 1|0 headers; bodies of cached
+    answers are sent as stored (gzip if accepted).
+    """
+    kata = (request.args.get("kata") or "").strip()
+    if not kata:
+        return jsonify({"error": "parameter 'kata' wajib diisi"}), 400
+
+    key_norm = _kbbi_normalize(kata)
+    try:
+        current_app.logger.info("kbbi_cek query kata=%r norm=%r simple=%r", kata, key_norm, KBBI_SIMPLE_AVAILABLE)
+    except Exception:
+        pass
+
+    # Cache hit?
+    prepared = _kbbi_cache_get(key_norm)
+    if prepared is not None:
+        _kbbi_count_source("cache")
+        return _kbbi_send(prepared, cache_hit=True)
+    miss = _KBBI_MISS_CACHE.get(key_norm)
+    if miss is not None:
+        _kbbi_count_source("miss-cache")
+        return _kbbi_send(miss, 404, cache_hit=True)
+
+    # Sources in resolver order (KBBI_RESOLVER_MODE); KBBI online waits at most its budget
+    failed = []
+    try:
+        sumber, found = _KBBI_RESOLVER.resolve(kata, key_norm, failed=failed)
+    except Miss as miss:
+        # Jika tidak ditemukan oleh KBBI online, kirim 404 dengan saran dari online jika tersedia
+        saran = miss.saran
+        if not saran:
             try:
-                if isinstance(ex_online, KBBI_TidakDitemukan):
-                    saran = []
-                    try:
-                        _obj = getattr(ex_online, "objek", None)
-                        saran = getattr(_obj, "saran_entri", []) if _obj else []
-                    except Exception:
-                        saran = []
-                    if not saran and KBBI_SIMPLE_AVAILABLE:
-                        try:
-                            saran = get_saran(kata)
-                        except Exception:
-                            pass
-                    return jsonify({"valid": False, "error": "kata tidak ditemukan", "saran": saran}), 404
+                saran = _kbbi_saran(kata, key_norm)
             except Exception:
-                pass
+                saran = []
+        _kbbi_count_source("miss")
+        return _kbbi_send(_kbbi_remember_miss(key_norm, saran), 404)
+    if found is not None:
+        # online answers arrive prepared and already cached by the backfill hook
+        prepared = found if isinstance(found, PreparedJSON) else _kbbi_remember(key_norm, found)
+        try:
+            current_app.logger.info("kbbi_cek %s-hit kata=%r", sumber.replace("kbbi-", ""), kata)
+        except Exception:
+            pass
+        _kbbi_count_source(prepared.payload.get("sumber"))
+        return _kbbi_send(prepared)
+
+    # saran: typo-tolerant matches, prefix matches, lalu saran kbbi_simple
+    try:
+        saran = _kbbi_saran(kata, key_norm)
+    except Exception:
+        saran = []
+    try:
+        current_app.logger.info(
+            "kbbi_cek offline-miss kata=%r norm=%r failed=%r; suggestions=%r",
+            kata, key_norm, failed, saran[:5] if isinstance(saran, list) else saran,
+        )
+    except Exception:
+        pass
+    _kbbi_count_source("miss")
+    return _kbbi_send(_kbbi_remember_miss(key_norm, saran, definitive=not failed), 404)
+
+
+def _kbbi_online_batch(words):
+    """
+    Resolve [(kata, key_norm)] against KBBI online concurrently, waiting at
+    most the latency budget for the whole set.
+    Returns ({key_norm: PreparedJSON hit-or-miss}, failed) where `failed` is
+    the set of key_norms that errored, ran over budget or were rejected by
+    the breaker or the full pool (late results are backfilled).
+    """
+    futs = {}
+    failed = set()
+    for kata, key_norm in words:
+        fut = _kbbi_online_submit(kata, key_norm)
+        if fut is not None:
+            futs[fut] = (kata, key_norm)
+        else:
+            _KBBI_RESOLVER.record("kbbi-online", SKIPPED)
+            failed.add(key_norm)
+    if not futs:
+        return {}, failed
+    started = time.perf_counter()
+    done, not_done = futures_wait(list(futs), timeout=_KBBI_ONLINE_BUDGET)
+    elapsed = time.perf_counter() - started
+    for fut in not_done:
+        _KBBI_RESOLVER.record("kbbi-online", TIMEOUT, elapsed)
+        failed.add(futs[fut][1])
+    out = {}
+    for fut in done:
+        kata, key_norm = futs[fut]
+        try:
+            out[key_norm] = fut.result()
+            _KBBI_RESOLVER.record("kbbi-online", HIT, elapsed)
+        except Exception as ex_online:
+            if isinstance(ex_online, KBBI_TidakDitemukan):
+                _KBBI_RESOLVER.record("kbbi-online", MISS, elapsed)
+                out[key_norm] = _kbbi_remember_miss(key_norm, _kbbi_online_saran(ex_online))
+                continue
+            failed.add(key_norm)
+            if isinstance(ex_online, BreakerOpen):
+                _KBBI_RESOLVER.record("kbbi-online", SKIPPED, elapsed)
+                continue
+            _KBBI_RESOLVER.record("kbbi-online", ERROR, elapsed)
             try:
                 current_app.logger.warning("KBBI online lookup error for %r: %r", kata, ex_online)
             except Exception:
                 pass
-            # fall through to simple/worddb/offline
-
-    # Try Word DB (kbbi_word_data.json)
-    try:
-        wd = _kbbi_lookup_word_db(kata)
-        if wd:
-            payload = {
-                "valid": True,
-                "kata": kata,
-                "lema": wd.get("lema", []),
-                "definisi": wd.get("definisi", []),
-                "entri": wd.get("entri", []),
-                "saran": [],
-                "sumber": "kbbi-worddb",
-                "cache_hit": False,
-            }
-            _KBBI_CACHE[key_norm] = {"ts": now_ts, "payload": payload}
+    return out, failed
+
+
+@kbbi_bp.post("/api/kbbi/cek-batch")
+@rate_limit(_KBBI_LIMITER)
+def kbbi_cek_batch():
+    """
+    Body JSON: { kata: ["...", ...] }  (maks. _KBBI_BATCH_MAX kata)
+    Resolves all words in one pass: cache -> the enabled local sources, then
+    KBBI online (concurrently, unless disabled by the resolver mode) only for
+    words that missed locally. Words whose lookup failed, timed out or was
+    rejected get a miss payload with coba_lagi: true and are not cached.
+      200: { hasil: { "<kata>": <payload /api/kbbi/cek> }, jumlah, ditemukan }
+      400: { error: "..." }
+    """
+    body = request.get_json(silent=True) or {}
+    words = body.get("kata") if isinstance(body, dict) else None
+    if not isinstance(words, list) or not words:
+        return jsonify({"error": "field 'kata' wajib berupa daftar kata"}), 400
+    if len(words) > _KBBI_BATCH_MAX:
+        return jsonify({"error": f"maksimal {_KBBI_BATCH_MAX} kata per permintaan"}), 400
+
+    # dedupe by normalized key, keeping the first spelling seen
+    by_norm = {}
+    originals = []
+    for w in words:
+        if not isinstance(w, str) or not w.strip():
+            continue
+        kata = w.strip()
+        originals.append(kata)
+        key_norm = _kbbi_normalize(kata)
+        if key_norm and key_norm not in by_norm:
+            by_norm[key_norm] = kata
+
+    resolved = {}
+    pending = []
+    failed = set()
+    for key_norm, kata in by_norm.items():
+        prepared = _kbbi_cache_get(key_norm)
+        if prepared is not None:
+            _kbbi_count_source("cache")
+            resolved[key_norm] = prepared
+            continue
+        prepared = _KBBI_MISS_CACHE.get(key_norm)
+        if prepared is not None:
+            _kbbi_count_source("miss-cache")
+            resolved[key_norm] = prepared
+            continue
+        local_failed = []
+        payload = _kbbi_lookup_local(kata, key_norm, failed=local_failed)
+        if local_failed:
+            failed.add(key_norm)
+        if payload:
+            _kbbi_count_source(payload["sumber"])
+            resolved[key_norm] = _kbbi_remember(key_norm, payload)
+            continue
+        pending.append((kata, key_norm))
+
+    if pending and _KBBI_RESOLVER.enabled("kbbi-online"):
+        online, online_failed = _kbbi_online_batch(pending)
+        resolved.update(online)
+        failed |= online_failed
+
+    for kata, key_norm in pending:
+        res = resolved.get(key_norm)
+        if res is None or (not res.payload.get("valid") and not res.payload.get("saran")):
             try:
-                current_app.logger.info("kbbi_cek worddb-hit kata=%r", kata)
+                saran = _kbbi_saran(kata, key_norm)
             except Exception:
-                pass
-            return jsonify(payload)
-    except Exception as ex_worddb:
+                saran = []
+            # an online "not found" is definitive even if a local source failed
+            definitive = key_norm in resolved or key_norm not in failed
+            res = resolved[key_norm] = _kbbi_remember_miss(key_norm, saran, definitive=definitive)
+        _kbbi_count_source(res.payload.get("sumber") if res.payload.get("valid") else "miss")
+
+    hasil = {}
+    for kata in originals:
+        key_norm = _kbbi_normalize(kata)
+        res = resolved.get(key_norm)
+        hasil[kata] = res.payload if res is not None else _kbbi_miss_payload([])
+    return jsonify({
+        "hasil": hasil,
+        "jumlah": len(hasil),
+        "ditemukan": sum(1 for v in hasil.values() if v.get("valid")),
+    })
+
+
+def _kbbi_is_known(key_norm):
+    """
+    True if key_norm resolves in a local index (word DB, kbbi_simple, offline),
+    directly or as a derived form /api/kbbi/cek resolves (same morph rule).
+    """
+    if key_norm in _kbbi_build_word_index():
+        return True
+    if KBBI_SIMPLE_AVAILABLE:
         try:
-            current_app.logger.warning("KBBI worddb lookup error for %r: %r", kata, ex_worddb)
+            if cari_kata(key_norm):
+                return True
         except Exception:
             pass
+    if key_norm in _kbbi_build_index():
+        return True
+    return bool(_kbbi_build_morph_index().roots(key_norm))
 
-    # Try simple KBBI implementation
-    if KBBI_SIMPLE_AVAILABLE:
+
+def _kbbi_iter_tokens(chunks):
+    """
+    Yield (start, end, token) character spans from an iterable of text chunks.
+    A token that reaches the end of a chunk (possibly followed by a joiner)
+    may continue in the next one and is carried over; a token longer than
+    _KBBI_TOKEN_MAX is skipped as a whole, without buffering it.
+    """
+    base = 0
+    carry = ""
+    # inside an overlong token that is being skipped: None, or "a" / "j" when
+    # the text seen so far ends in a letter or digit / a joiner
+    skipping = None
+    for chunk in chunks:
+        text = carry + chunk
+        carry = ""
+        if not text:
+            continue
+        if skipping:
+            k = 0
+            if skipping == "a" or text[0].isalnum():
+                k = _KBBI_TOKEN_REST.match(text).end()
+            n = len(text)
+            if k == n or (k == n - 1 and text[k] in _KBBI_TOKEN_JOINERS and (text[k - 1].isalnum() if k else skipping == "a")):
+                skipping = "a" if k == n else "j"
+                base += n
+                continue
+            skipping = None
+            base += k
+            text = text[k:]
+        last = None
+        for m in _KBBI_TOKEN_RE.finditer(text):
+            if last is not None and last.end() - last.start() <= _KBBI_TOKEN_MAX:
+                yield base + last.start(), base + last.end(), last.group(0)
+            last = m
+        if last is not None:
+            end = last.end()
+            if end == len(text) or (end == len(text) - 1 and text[end] in _KBBI_TOKEN_JOINERS):
+                # may continue in the next chunk
+                if end - last.start() > _KBBI_TOKEN_MAX:
+                    skipping = "a" if end == len(text) else "j"
+                else:
+                    carry = text[last.start():]
+            elif end - last.start() <= _KBBI_TOKEN_MAX:
+                yield base + last.start(), base + end, last.group(0)
+        base += len(text) - len(carry)
+    if carry:
+        m = _KBBI_TOKEN_RE.match(carry)
+        yield base, base + m.end(), m.group(0)
+
+
+def _kbbi_request_body():
+    """
+    Readable request body of at most _KBBI_TEXT_MAX_BYTES, or None when it is
+    larger. With a Content-Length the request stream is used as is; a chunked
+    body is read (up to the limit + 1 byte) into a spooled temp file first.
+    """
+    if request.content_length is not None:
+        return request.stream if request.content_length <= _KBBI_TEXT_MAX_BYTES else None
+    spool = tempfile.SpooledTemporaryFile(max_size=_KBBI_TEXT_SPOOL)
+    left = _KBBI_TEXT_MAX_BYTES + 1
+    while left > 0:
+        raw = request.stream.read(min(_KBBI_TEXT_CHUNK, left))
+        if not raw:
+            break
+        spool.write(raw)
+        left -= len(raw)
+    if left == 0:
+        spool.close()
+        return None
+    spool.seek(0)
+    return spool
+
+
+def _kbbi_request_text_chunks(body):
+    """
+    Text of the request body in chunks: JSON {teks} or raw text/plain (streamed).
+    """
+    if request.is_json:
         try:
-            data = cari_kata(kata)
-            if data:
-                payload = {
-                    "valid": True,
-                    "kata": kata,
-                    "lema": data.get("lema", []),
-                    "definisi": data.get("definisi", []),
-                    "entri": data.get("entri", []),
-                    "saran": [],
-                    "sumber": "kbbi-simple",
-                    "cache_hit": False,
-                }
-                _KBBI_CACHE[key_norm] = {"ts": now_ts, "payload": payload}
+            body = json.loads(body.read().decode("utf-8", errors="replace"))
+        except ValueError:
+            body = {}
+        teks = body.get("teks") if isinstance(body, dict) else None
+        teks = teks if isinstance(teks, str) else ""
+        for i in range(0, len(teks), _KBBI_TEXT_CHUNK):
+            yield teks[i:i + _KBBI_TEXT_CHUNK]
+        return
+    dec = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while True:
+        raw = body.read(_KBBI_TEXT_CHUNK)
+        if not raw:
+            break
+        yield dec.decode(raw)
+    tail = dec.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+@kbbi_bp.post("/api/kbbi/periksa-teks")
+@rate_limit(_KBBI_LIMITER)
+def kbbi_periksa_teks():
+    """
+    Body: text/plain (streamed) or JSON { teks: "..." }; query ?saran=N (default 5).
+    Spell-checks a whole text against the local indices (no online calls).
+    Tokens are normalized like /api/kbbi/cek and checked once per distinct
+    form; only unknown words are reported, as a streamed JSON document:
+      200: { salah: [{kata, awal, akhir, saran: [...]}], jumlah_token, jumlah_unik, jumlah_salah }
+      413: { error: "..." }
+    awal/akhir are character offsets into the submitted text.
+    """
+    body = _kbbi_request_body()
+    if body is None:
+        return jsonify({"error": f"teks maksimal {_KBBI_TEXT_MAX_BYTES} byte"}), 413
+    try:
+        n_saran = max(0, min(int(request.args.get("saran") or 5), 10))
+    except ValueError:
+        n_saran = 5
+
+    def _generate():
+        known = {}   # key_norm -> bool
+        saran_for = {}  # key_norm -> serialized saran list, only for unknown words
+        n_tokens = 0
+        n_wrong = 0
+        yield '{"salah":['
+        for start, end, tok in _kbbi_iter_tokens(_kbbi_request_text_chunks(body)):
+            key_norm = _kbbi_normalize(tok)
+            if not key_norm or key_norm.isdigit():
+                continue
+            n_tokens += 1
+            ok = known.get(key_norm)
+            if ok is None:
+                ok = _kbbi_is_known(key_norm)
+                if not ok and "-" in tok:
+                    # kata ulang / gabungan: known if every part is known
+                    parts = [_kbbi_normalize(x) for x in tok.split("-")]
+                    ok = all(p and _kbbi_is_known(p) for p in parts)
+                known[key_norm] = ok
+            if ok:
+                continue
+            saran_json = saran_for.get(key_norm)
+            if saran_json is None:
                 try:
-                    current_app.logger.info("kbbi_cek simple-hit kata=%r", kata)
+                    saran = _kbbi_saran(tok, key_norm, limit=n_saran) if n_saran else []
                 except Exception:
-                    pass
-                return jsonify(payload)
-        except Exception as ex:
+                    saran = []
+                saran_json = saran_for[key_norm] = json.dumps(saran, ensure_ascii=False)
+            yield '%s{"kata":%s,"awal":%d,"akhir":%d,"saran":%s}' % (
+                "," if n_wrong else "", json.dumps(tok, ensure_ascii=False), start, end, saran_json,
+            )
+            n_wrong += 1
+        if body is not request.stream:
+            body.close()
+        yield '],"jumlah_token":%d,"jumlah_unik":%d,"jumlah_salah":%d}' % (n_tokens, len(known), n_wrong)
+
+    return Response(stream_with_context(_generate()), mimetype="application/json")
+
+
+@kbbi_bp.get("/api/kbbi/saran")
+@rate_limit(_KBBI_LIMITER)
+def kbbi_saran():
+    """
+    Query: ?kata=...&jarak=1|2&limit=N
+    Typo-tolerant suggestions over the word DB + offline index vocabulary.
+    Without jarak, words of at least _KBBI_FUZZY_LONG_WORD characters are
+    matched within two edits and shorter ones within one.
+      200: { kata, saran: ["..."], detail: [{kata, jarak}] }
+      400: { error: "parameter 'kata' wajib diisi" }
+    """
+    kata = (request.args.get("kata") or "").strip()
+    key_norm = _kbbi_normalize(kata)
+    if not key_norm:
+        return jsonify({"error": "parameter 'kata' wajib diisi"}), 400
+    try:
+        jarak = int(request.args.get("jarak") or 0) or None
+    except ValueError:
+        jarak = None
+    jarak = _kbbi_fuzzy_distance(key_norm, jarak)
+    try:
+        limit = int(request.args.get("limit") or 10)
+    except ValueError:
+        limit = 10
+    limit = max(1, min(limit, 50))
+    try:
+        found = _kbbi_fuzzy_suggestions(key_norm, max_distance=jarak, limit=limit)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    return jsonify({
+        "kata": kata,
+        "saran": [k for k, _ in found],
+        "detail": [{"kata": k, "jarak": d} for k, d in found],
+    })
+
+
+@kbbi_bp.get("/api/kbbi/cari")
+@rate_limit(_KBBI_LIMITER)
+def kbbi_cari():
+    """
+    Query: ?q=...&halaman=N&per_halaman=N
+    Words whose definitions mention the query terms, ranked by BM25.
+      200: { q, total, halaman, per_halaman, hasil: [{kata, skor, cuplikan}] }
+      400: { error: "parameter 'q' wajib diisi" }
+    """
+    q = (request.args.get("q") or "").strip()
+    if not q:
+        return jsonify({"error": "parameter 'q' wajib diisi"}), 400
+    try:
+        halaman = int(request.args.get("halaman") or 1)
+    except ValueError:
+        halaman = 1
+    halaman = max(1, halaman)
+    try:
+        per_halaman = int(request.args.get("per_halaman") or 20)
+    except ValueError:
+        per_halaman = 20
+    per_halaman = max(1, min(per_halaman, _KBBI_SEARCH_PAGE_MAX))
+    try:
+        total, found = _kbbi_build_search_index().search(q, offset=(halaman - 1) * per_halaman, limit=per_halaman)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    return jsonify({
+        "q": q,
+        "total": total,
+        "halaman": halaman,
+        "per_halaman": per_halaman,
+        "hasil": [{"kata": k, "skor": sc, "cuplikan": sn} for k, sc, sn in found],
+    })
+
+
+@kbbi_bp.get("/api/kbbi/relasi")
+@rate_limit(_KBBI_LIMITER)
+def kbbi_relasi():
+    """
+    Query: ?kata=...&depth=1..3&jenis=sinonim|antonim|semua&limit=N
+    Synonyms/antonyms of kata up to `depth` hops away (breadth first, nearest first).
+      200: { kata, depth, jenis, jumlah, terpotong,
+             hasil: [{kata, jarak, relasi: "sinonim"|"antonim", melalui}] }
+      404: { error: "kata tidak ditemukan", kata }
+      400: { error: "parameter 'kata' wajib diisi" }
+    `terpotong` is true when the result hit `limit` before the search finished.
+    """
+    kata = (request.args.get("kata") or "").strip()
+    if not _kbbi_normalize(kata):
+        return jsonify({"error": "parameter 'kata' wajib diisi"}), 400
+    try:
+        depth = int(request.args.get("depth") or 1)
+    except ValueError:
+        depth = 1
+    depth = max(1, min(depth, _KBBI_RELASI_MAX_DEPTH))
+    try:
+        limit = int(request.args.get("limit") or 100)
+    except ValueError:
+        limit = 100
+    limit = max(1, min(limit, _KBBI_RELASI_MAX_LIMIT))
+    jenis = (request.args.get("jenis") or "semua").strip().lower()
+    kinds = (KIND_NAMES.index(jenis),) if jenis in KIND_NAMES else (SINONIM, ANTONIM)
+    if jenis not in KIND_NAMES:
+        jenis = "semua"
+    try:
+        res = _kbbi_build_relation_graph().bfs(kata, depth=depth, limit=limit, kinds=kinds)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    if res is None:
+        return jsonify({"error": "kata tidak ditemukan", "kata": kata}), 404
+    found, truncated = res
+    return jsonify({
+        "kata": kata,
+        "depth": depth,
+        "jenis": jenis,
+        "jumlah": len(found),
+        "terpotong": truncated,
+        "hasil": [{"kata": w, "jarak": d, "relasi": r, "melalui": via} for w, d, r, via in found],
+    })
+
+
+def _kbbi_reload_job(job, app):
+    """
+    Build a complete new index generation off to the side, then publish it
+    with one reference assignment. Requests keep using the old generation
+    until the swap; caches are flushed right after it.
+    """
+    global _KBBI_INDICES
+    job["status"] = "running"
+    job["started_at"] = time.time()
+    try:
+        with app.app_context():
+            with _KBBI_BUILD_LOCK:
+                fresh = _kbbi_new_index_set(_KBBI_INDICES.generation + 1).build_all()
+                reindex = _KBBI_REINDEX
+            _KBBI_INDICES = fresh
+            _KBBI_CACHE.clear()
+            _KBBI_MISS_CACHE.clear()
+            _KBBI_ONLINE_FLIGHT.forget()
+            job["generation"] = fresh.generation
+            job["index_size"] = len(fresh.get("offline_index"))
+            job["builds"] = fresh.stats()["builds"]
+            job["reindex"] = reindex
+            job["status"] = "done"
             try:
-                current_app.logger.warning("KBBI simple lookup failed for %r: %r", kata, ex)
+                current_app.logger.info("KBBI reload %s: generation %d live", job["id"], fresh.generation)
             except Exception:
                 pass
+    except Exception as e:
+        job["status"] = "error"
+        job["error"] = str(e)
+        try:
+            app.logger.warning("KBBI reload %s failed: %r", job["id"], e)
+        except Exception:
+            pass
+    finally:
+        job["finished_at"] = time.time()
 
-    # Fallback: offline index yang sudah ada
-    idx = _kbbi_build_index()
-    data = idx.get(key_norm)
-    if not data:
-        # heuristik saran sederhana: gabungkan saran dari simple, word-db, dan index offline
+
+def _kbbi_start_reload(reason="manual", app=None):
+    """
+    Start a background reload job, or return the one already queued/running.
+    Returns (job, started_new).
+    """
+    with _KBBI_RELOAD_LOCK:
+        for job in reversed(_KBBI_RELOAD_JOBS.values()):
+            if job["status"] in ("queued", "running"):
+                return job, False
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": "queued",
+            "reason": reason,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "error": None,
+        }
+        _KBBI_RELOAD_JOBS[job["id"]] = job
+        while len(_KBBI_RELOAD_JOBS) > _KBBI_RELOAD_KEEP:
+            _KBBI_RELOAD_JOBS.popitem(last=False)
+    threading.Thread(
+        target=_kbbi_reload_job, args=(job, app or current_app._get_current_object()),
+        name=f"kbbi-reload-{job['id'][:8]}", daemon=True,
+    ).start()
+    return job, True
+
+
+def _kbbi_sources_snapshot():
+    return (
+        _kbbi_sources_signature(sorted(glob.glob(KBBI_FILE_GLOB))),
+        _kbbi_sources_signature(sorted(glob.glob(KBBI_WORD_DB_GLOB))),
+    )
+
+
+def _kbbi_watch_loop(app, interval):
+    last = _kbbi_sources_snapshot()
+    while True:
+        time.sleep(interval)
         try:
-            prefix = key_norm[:2]
-            combined = []
-            if KBBI_SIMPLE_AVAILABLE:
-                try:
-                    s = get_saran(kata) or []
-                    for x in s:
-                        if x not in combined:
-                            combined.append(x)
-                except Exception:
-                    pass
-            # from word-db (original keys)
-            try:
-                for x in _kbbi_word_suggestions(prefix, limit=10) or []:
-                    if x not in combined:
-                        combined.append(x)
-            except Exception:
-                pass
-            # from offline index keys (normalized keys)
+            cur = _kbbi_sources_snapshot()
+            if cur == last:
+                continue
+            with app.app_context():
+                job, started = _kbbi_start_reload(reason="watch", app=app)
+            # while another reload is pending, retry on the next tick
+            if started:
+                last = cur
+                app.logger.info("KBBI shards changed; reload job %s started", job["id"])
+        except Exception as e:
             try:
-                offline_keys = [k for k in idx.keys() if isinstance(k, str) and k.startswith(prefix)]
-                for x in sorted(offline_keys)[:10]:
-                    if x not in combined:
-                        combined.append(x)
+                app.logger.warning("KBBI shard watcher error: %r", e)
             except Exception:
                 pass
-            saran = combined[:10]
-        except Exception:
-            saran = []
-        try:
-            current_app.logger.info("kbbi_cek offline-miss kata=%r norm=%r; suggestions=%r", kata, key_norm, saran[:5] if isinstance(saran, list) else saran)
-        except Exception:
-            pass
-        return jsonify({"valid": False, "error": "kata tidak ditemukan", "saran": saran}), 404
 
-    payload = {
-        "valid": True,
-        "kata": kata,
-        "lema": data.get("lema", []),
-        "definisi": data.get("definisi", []),
-        "entri": [],  # offline dataset tidak memiliki struktur makna lengkap
-        "saran": [],
-        "sumber": "kbbi-offline",
-        "cache_hit": False,
-    }
-    _KBBI_CACHE[key_norm] = {"ts": now_ts, "payload": payload}
-    try:
-        current_app.logger.info("kbbi_cek offline-hit kata=%r", kata)
-    except Exception:
-        pass
-    return jsonify(payload)
+
+def kbbi_watch(app, interval=None):
+    """
+    Poll the part files and word DB shards every `interval` seconds (default
+    env KBBI_WATCH_INTERVAL; 0 disables) and start a reload job when any of
+    them is added, removed or modified. Only changed shards are reparsed.
+    At most one watcher runs per process; a forked child starts its own.
+    Returns the watcher thread, or None when disabled.
+    """
+    interval = _KBBI_WATCH_INTERVAL if interval is None else float(interval)
+    if interval <= 0:
+        return None
+    t = _KBBI_WATCHER["thread"]
+    if _KBBI_WATCHER["pid"] == os.getpid() and t is not None and t.is_alive():
+        return t
+    t = threading.Thread(target=_kbbi_watch_loop, args=(app, interval), name="kbbi-watch", daemon=True)
+    t.start()
+    _KBBI_WATCHER.update(pid=os.getpid(), thread=t)
+    return t
 
 
 @kbbi_bp.post("/api/kbbi/reload")
 def kbbi_reload():
     """
-    Force reload KBBI offline index and clear online cache.
+    Rebuild all KBBI indices (offline index, word DB, suggest, fuzzy) in the
+    background and swap them in atomically; caches are cleared on swap.
+    Only part files / word DB shards that changed are parsed again.
+    Returns immediately:
+      202: { job_id, status: "queued"|"running", status_url }
+    A reload requested while another is pending returns that job instead.
     """
     try:
-        global _kbbi_index
-        _kbbi_index = None
-        _KBBI_CACHE.clear()
-        idx = _kbbi_build_index()
-        return jsonify({"reloaded": True, "index_size": len(idx)})
+        job, _ = _kbbi_start_reload()
+        resp = jsonify({"job_id": job["id"], "status": job["status"], "status_url": f"/api/kbbi/reload/{job['id']}"})
+        resp.status_code = 202
+        resp.headers["Location"] = f"/api/kbbi/reload/{job['id']}"
+        return resp
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@kbbi_bp.get("/api/kbbi/reload/<job_id>")
+def kbbi_reload_status(job_id):
+    """
+    Status of a reload job:
+      200: { id, status: "queued"|"running"|"done"|"error", reason, created_at,
+             started_at, finished_at, error, generation, index_size, builds }
+      404: { error: "job tidak ditemukan" }
+    """
+    job = _KBBI_RELOAD_JOBS.get(job_id)
+    if job is None:
+        return jsonify({"error": "job tidak ditemukan"}), 404
+    return jsonify(dict(job))
+
+
 @kbbi_bp.get("/api/kbbi/stats")
 def kbbi_stats():
     """
-    Debug stats for KBBI index and files.
-    Returns: { files, entries_loaded, index_size, word_db_size, has_pijar, pijar_lema, sample_keys_pi }
+    Debug stats for KBBI index and files, served from metadata recorded when
+    the indices were built (never re-reads the part files or builds an index;
+    fields of indices not built yet are null).
+    Returns: { files, entries_loaded, index_size, word_db_size, has_pijar, pijar_lema, sample_keys_pi,
+               ready, memory_bytes, indices: {generation, loaded, builds, info}, lookups: {lookups, sources},
+               resolver: {mode, order, sources: {name: {priority, timeout, enabled, calls, hits, misses, ...}}},
+               cache: {entries, bytes, max_entries, max_bytes, ttl, hits, misses, evictions, ...}, ... }
     """
     try:
-        paths = sorted(glob.glob(KBBI_FILE_GLOB))
-        entries = _kbbi_load_all_parts()
-        idx = _kbbi_build_index()
-        widx = _kbbi_build_word_index()
+        ix = _KBBI_INDICES
+        # build metadata comes from published snapshots: no build lock taken
+        index_stats = ix.stats()
+        idx = ix.peek("offline_index")
+        sx = ix.peek("suggest")
+        off = index_stats["info"].get("offline_index") or {}
+        wd = index_stats["info"].get("word_db") or {}
         key = _kbbi_normalize("pijar")
-        sample_keys = [k for k in idx.keys() if isinstance(k, str) and k.startswith("pi")][:10]
+        pijar = idx.get(key) if idx is not None else None
+        sample_keys = []
+        if idx is not None and sx is not None:
+            lo, hi = sx.prefix_range("pi")
+            sample_keys = [k for k in sx.keys[lo:min(hi, lo + 50)] if k in idx][:10]
+        reindex = _KBBI_REINDEX
         return jsonify({
-            "files": len(paths),
-            "entries_loaded": len(entries),
-            "index_size": len(idx),
-            "word_db_size": len(widx.get("raw") or {}),
-            "has_pijar": key in idx,
-            "pijar_lema": idx.get(key, {}).get("lema") if key in idx else [],
+            "files": len(off.get("files") or []),
+            "entries_loaded": off.get("entries_loaded"),
+            "index_size": len(idx) if idx is not None else None,
+            "word_db_size": wd.get("records"),
+            "has_pijar": (pijar is not None) if idx is not None else None,
+            "pijar_lema": pijar.get("lema") if pijar else [],
             "sample_keys_pi": sample_keys,
+            "ready": all(ix.loaded(n) for n in _KBBI_INDEX_MAKERS),
+            "memory_bytes": sum((b.get("bytes") or 0) for b in index_stats["builds"].values()),
+            "indices": index_stats,
+            "lookups": _kbbi_source_stats(),
+            "resolver": dict(_KBBI_RESOLVER.stats(), mode=_KBBI_RESOLVER_MODE),
+            "cache": _KBBI_CACHE.stats(),
+            "miss_cache": _KBBI_MISS_CACHE.stats(),
+            "reindex": reindex,
+            "persistent_cache": _KBBI_PERSISTENT.stats() if _KBBI_PERSISTENT is not None else None,
+            "rate_limit": _KBBI_LIMITER.stats(),
+            "online_singleflight": _KBBI_ONLINE_FLIGHT.stats(),
+            "online_breaker": dict(_KBBI_ONLINE_BREAKER.stats(), budget=_KBBI_ONLINE_BUDGET),
+            "online_pool": _kbbi_online_pool_stats(),
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -0,0 +1,125 @@
+"""
+Synonym/antonym graph over the KBBI word DB.
+
+Words are integer node ids (position in `keys`). Edges are stored in CSR
+form: `offsets[n]:offsets[n + 1]` slices the flat `targets` and `kinds`
+arrays, and after freeze() the words themselves are FlatStrings tables, so
+the whole graph is a few arrays regardless of its size.
+Relations are treated as symmetric: "a sinonim b" also links b to a.
+"""
+
+from array import array
+from collections import deque
+
+from .flat import FlatStrings, FlatMap
+
+SINONIM = 0
+ANTONIM = 1
+KIND_NAMES = ("sinonim", "antonim")
+
+
+class RelationGraph:
+    """
+    Build with add(word, other, kind) for every relation, then freeze().
+      neighbors(node) -> [(node, kind)]
+      bfs(key, depth, limit, kinds) -> (found, truncated)
+    """
+
+    def __init__(self, normalize=None):
+        self.normalize = normalize or (lambda s: s.strip().lower())
+        self.keys = []
+        self.display = []
+        self._ids = {}
+        self._pending = []
+        self.offsets = array("I", [0])
+        self.targets = array("I")
+        self.kinds = array("B")
+
+    def node(self, word):
+        """
+        Node id for `word` (created on first use), or None for empty words.
+        """
+        if not isinstance(word, str):
+            return None
+        key = self.normalize(word)
+        if not key:
+            return None
+        nid = self._ids.get(key)
+        if nid is None:
+            nid = self._ids[key] = len(self.keys)
+            self.keys.append(key)
+            self.display.append(word.strip())
+        return nid
+
+    def add(self, word, other, kind):
+        a, b = self.node(word), self.node(other)
+        if a is None or b is None or a == b:
+            return
+        # packed (src, dst, kind); both directions since relations are symmetric
+        self._pending.append((a << 33) | (b << 1) | kind)
+        self._pending.append((b << 33) | (a << 1) | kind)
+
+    def freeze(self):
+        packed = sorted(set(self._pending))
+        self._pending = []
+        counts = array("I", bytes(4 * (len(self.keys) + 1)))
+        for p in packed:
+            counts[(p >> 33) + 1] += 1
+        for i in range(1, len(counts)):
+            counts[i] += counts[i - 1]
+        self.offsets = counts
+        self.targets = array("I", ((p >> 1) & 0xFFFFFFFF for p in packed))
+        self.kinds = array("B", (p & 1 for p in packed))
+        self.keys = FlatStrings(self.keys)
+        self.display = FlatStrings(self.display)
+        self._ids = FlatMap(self._ids.items(), typecode="I")
+        return self
+
+    def __len__(self):
+        return len(self.keys)
+
+    def edge_count(self):
+        return len(self.targets)
+
+    def nbytes(self):
+        return (
+            self.offsets.itemsize * len(self.offsets) + self.targets.itemsize * len(self.targets)
+            + self.kinds.itemsize * len(self.kinds) + self.keys.nbytes() + self.display.nbytes() + self._ids.nbytes()
+        )
+
+    def find(self, word):
+        return self._ids.get(self.normalize(word)) if isinstance(word, str) else None
+
+    def neighbors(self, node):
+        lo, hi = self.offsets[node], self.offsets[node + 1]
+        return list(zip(self.targets[lo:hi], self.kinds[lo:hi]))
+
+    def bfs(self, word, depth=1, limit=100, kinds=(SINONIM, ANTONIM)):
+        """
+        Words reachable from `word` in at most `depth` hops over edges of the
+        given kinds, nearest first: [(display, distance, kind, via_display)].
+        Stops once `limit` words are found; `truncated` tells whether it did.
+        Returns None when `word` is not in the graph.
+        """
+        start = self.find(word)
+        if start is None:
+            return None
+        allowed = set(kinds)
+        seen = {start}
+        found = []
+        queue = deque([(start, 0)])
+        offsets, targets, kinds_arr = self.offsets, self.targets, self.kinds
+        while queue:
+            node, dist = queue.popleft()
+            if dist >= depth:
+                continue
+            for i in range(offsets[node], offsets[node + 1]):
+                nxt, kind = targets[i], kinds_arr[i]
+                if kind not in allowed or nxt in seen:
+                    continue
+                if len(found) >= limit:
+                    return found, True
+                seen.add(nxt)
+                found.append((self.display[nxt], dist + 1, KIND_NAMES[kind], self.display[node]))
+                queue.append((nxt, dist + 1))
+        return found, False
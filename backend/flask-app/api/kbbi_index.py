@@ -0,0 +1,264 @@
+"""
+Compiled, memory-mapped KBBI offline index.
+
+The part files (kbbi_v_part*.json) are parsed once and written into a single
+binary file that every worker maps read-only, so lookups never materialize the
+whole dictionary as Python objects and the pages are shared via the OS cache.
+
+File layout (all integers little-endian):
+  header    : magic, version, count, key_tab, val_tab, key_blob, val_blob, meta_off, meta_len
+  key_tab   : (count + 1) x u64 offsets into key_blob
+  val_tab   : (count + 1) x u64 offsets into val_blob
+  key_blob  : normalized keys, UTF-8, sorted bytewise
+  val_blob  : one UTF-8 JSON object per key: {"lema": [...], "definisi": [...]}
+  meta      : UTF-8 JSON object (sources signature, build info)
+"""
+
+import os
+import json
+import mmap
+import struct
+import tempfile
+
+INDEX_MAGIC = b"KBBIIDX1"
+INDEX_VERSION = 1
+
+_HEADER = struct.Struct("<8sIIQQQQQQ")
+_U64 = struct.Struct("<Q")
+
+
+def compile_index(idx, path, meta=None):
+    """
+    Write a {key: {lema, definisi}} mapping to `path` in the compiled format.
+    The file is written to a uniquely named temporary file next to the target
+    and atomically renamed into place, so concurrent readers never observe a
+    partial index and concurrent writers (threads or processes) never share
+    a temporary file.
+    """
+    items = sorted(
+        ((k.encode("utf-8"), v) for k, v in idx.items() if isinstance(k, str) and k),
+        key=lambda kv: kv[0],
+    )
+    count = len(items)
+
+    key_offs = [0]
+    val_offs = [0]
+    key_parts = []
+    val_parts = []
+    for kb, v in items:
+        key_parts.append(kb)
+        key_offs.append(key_offs[-1] + len(kb))
+        vb = json.dumps(
+            {"lema": list(v.get("lema") or []), "definisi": list(v.get("definisi") or [])},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        val_parts.append(vb)
+        val_offs.append(val_offs[-1] + len(vb))
+
+    meta_b = json.dumps(meta or {}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    key_tab = _HEADER.size
+    val_tab = key_tab + 8 * (count + 1)
+    key_blob = val_tab + 8 * (count + 1)
+    val_blob = key_blob + key_offs[-1]
+    meta_off = val_blob + val_offs[-1]
+
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(
+                INDEX_MAGIC, INDEX_VERSION, count,
+                key_tab, val_tab, key_blob, val_blob, meta_off, len(meta_b),
+            ))
+            f.write(struct.pack(f"<{count + 1}Q", *key_offs))
+            f.write(struct.pack(f"<{count + 1}Q", *val_offs))
+            f.write(b"".join(key_parts))
+            f.write(b"".join(val_parts))
+            f.write(meta_b)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            try:
+                os.remove(tmp)
+            except Exception:
+                pass
+    return path
+
+
+def update_meta(path, meta):
+    """
+    Replace the meta object of the compiled index at `path`. The key and value
+    sections are copied unchanged into a temporary file that is renamed into
+    place, as in compile_index.
+    """
+    meta_b = json.dumps(meta or {}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    with open(path, "rb") as src:
+        fields = list(_HEADER.unpack(src.read(_HEADER.size)))
+        if fields[0] != INDEX_MAGIC or fields[1] != INDEX_VERSION:
+            raise ValueError(f"unsupported KBBI index format: {path}")
+        meta_off = fields[7]
+        fields[8] = len(meta_b)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_HEADER.pack(*fields))
+                remaining = meta_off - _HEADER.size
+                while remaining > 0:
+                    block = src.read(min(1 << 20, remaining))
+                    if not block:
+                        raise ValueError(f"compiled KBBI index truncated: {path}")
+                    f.write(block)
+                    remaining -= len(block)
+                f.write(meta_b)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                try:
+                    os.remove(tmp)
+                except Exception:
+                    pass
+    return path
+
+
+class CompiledIndex:
+    """
+    Read-only, dict-like view over a compiled index file.
+    Supports get(), `in`, len() and key iteration; values are decoded per hit.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < _HEADER.size:
+            self._mm.close()
+            raise ValueError(f"compiled KBBI index too small: {path}")
+        (magic, version, count, self._key_tab, self._val_tab,
+         self._key_blob, self._val_blob, meta_off, meta_len) = _HEADER.unpack_from(self._mm, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            self._mm.close()
+            raise ValueError(f"unsupported KBBI index format: {path}")
+        self._count = count
+        if not self._layout_ok(meta_off, meta_len):
+            self._mm.close()
+            raise ValueError(f"compiled KBBI index truncated or corrupt: {path}")
+        try:
+            self.meta = json.loads(self._mm[meta_off:meta_off + meta_len].decode("utf-8"))
+        except Exception:
+            self.meta = {}
+
+    def _layout_ok(self, meta_off, meta_len):
+        """
+        True if the sections follow each other as compile_index writes them
+        and the file ends exactly after the meta object.
+        """
+        tab = 8 * (self._count + 1)
+        if (self._key_tab != _HEADER.size or self._val_tab != self._key_tab + tab
+                or self._key_blob != self._val_tab + tab or meta_off + meta_len != len(self._mm)
+                or not self._key_blob <= self._val_blob <= meta_off):
+            return False
+        return (
+            self._off(self._key_tab, 0) == 0 and self._off(self._val_tab, 0) == 0
+            and self._key_blob + self._off(self._key_tab, self._count) == self._val_blob
+            and self._val_blob + self._off(self._val_tab, self._count) == meta_off
+        )
+
+    def close(self):
+        try:
+            self._mm.close()
+        except Exception:
+            pass
+
+    def __len__(self):
+        return self._count
+
+    def nbytes(self):
+        # mapped read-only, so the pages are shared with other workers
+        return len(self._mm)
+
+    def _off(self, table, i):
+        return _U64.unpack_from(self._mm, table + 8 * i)[0]
+
+    def _key_bytes(self, i):
+        a = self._off(self._key_tab, i)
+        b = self._off(self._key_tab, i + 1)
+        return self._mm[self._key_blob + a:self._key_blob + b]
+
+    def _value(self, i):
+        a = self._off(self._val_tab, i)
+        b = self._off(self._val_tab, i + 1)
+        return json.loads(self._mm[self._val_blob + a:self._val_blob + b].decode("utf-8"))
+
+    def _lower_bound(self, kb):
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_bytes(mid) < kb:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _find(self, key):
+        if not isinstance(key, str) or not key:
+            return -1
+        kb = key.encode("utf-8")
+        i = self._lower_bound(kb)
+        if i < self._count and self._key_bytes(i) == kb:
+            return i
+        return -1
+
+    def get(self, key, default=None):
+        i = self._find(key)
+        if i < 0:
+            return default
+        return self._value(i)
+
+    def __getitem__(self, key):
+        i = self._find(key)
+        if i < 0:
+            raise KeyError(key)
+        return self._value(i)
+
+    def __contains__(self, key):
+        return self._find(key) >= 0
+
+    def keys(self):
+        for i in range(self._count):
+            yield self._key_bytes(i).decode("utf-8")
+
+    __iter__ = keys
+
+    def items(self):
+        for i in range(self._count):
+            yield self._key_bytes(i).decode("utf-8"), self._value(i)
+
+
+def open_index(path, sources=None):
+    """
+    Open a compiled index if it exists and (when `sources` is given) was built
+    from exactly that source signature. Returns None when missing or stale.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        ci = CompiledIndex(path)
+    except Exception:
+        return None
+    if sources is not None and ci.meta.get("sources") != sources:
+        ci.close()
+        return None
+    return ci
+
+
+if __name__ == "__main__":
+    # Compile step: python -m api.kbbi_index (run from backend/flask-app)
+    from api.kbbi import _kbbi_compile_index
+
+    out = _kbbi_compile_index()
+    print(f"compiled {out['entries']} entries from {out['files']} files -> {out['path']}")
+    for name, ph in out["phases"].items():
+        print(f"  {name:<14} {ph['seconds']:.3f}s  " + " ".join(f"{k}={v}" for k, v in ph.items() if k != "seconds"))
+    for name, sh in out["shards"].items():
+        print(f"  {name:<24} {sh['seconds']:.3f}s  keys={sh['keys']}" + ("  (reused)" if sh["reused"] else ""))
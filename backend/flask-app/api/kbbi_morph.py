@@ -0,0 +1,304 @@
+"""
+Indonesian affix stripping for KBBI lookups of derived forms.
+
+root_candidates() follows the Nazief-Adriani order: particles (-lah, -kah,
+-tah, -pun), possessives (-ku, -mu, -nya) and derivational suffixes (-kan,
+-an, -i) are removed first, then up to three prefixes (di-, ke-, se-, ber-,
+ter-, me-, pe-, per-, with the usual sound changes such as meny- -> s-/ny-,
+mem- -> p-, men- -> t-, meng- -> k-). Confixes (pe-an, ke-an, ber-an, ...)
+fall out of combining both. Candidates are yielded from the least to the
+most stripped form, and the caller checks them against the dictionary.
+
+MorphIndex ties the rules to the vocabulary of a PrefixIndex. Stripping
+alone over-accepts (berkerja -> kerja, mempijar -> pijar), so an analysis is
+only accepted when its root is a vocabulary word, its affixes form an
+allowed pattern (one prefix, or per-/ke-/ber- under an outer prefix, each
+with an optional derivational suffix and clitics), and attach() puts the
+prefixes back onto the root with the same spelling (kerja -> bekerja, not
+berkerja; pijar -> memijar, not mempijar).
+"""
+
+PARTICLES = ("lah", "kah", "tah", "pun")
+POSSESSIVES = ("nya", "ku", "mu")
+DERIVATIONAL = ("kan", "an", "i")
+VOWELS = frozenset("aeiou")
+MIN_ROOT = 2
+MAX_PREFIXES = 3
+
+
+def _suffix_forms(word, groups=(PARTICLES, POSSESSIVES, DERIVATIONAL)):
+    """
+    [(base, suffixes)] from `word` itself to the most stripped base.
+    """
+    out = [(word, ())]
+    for group in groups:
+        base, tags = out[-1]
+        for suf in group:
+            if base.endswith(suf) and len(base) - len(suf) >= MIN_ROOT + 1:
+                out.append((base[:-len(suf)], tags + (suf,)))
+                break
+    return out
+
+
+def _strip_prefix(w):
+    """
+    [(rest, prefix)] for every way one prefix can be removed from `w`,
+    including the restored first letter of the root (sound changes).
+    """
+    out = []
+
+    def add(rest, tag):
+        if len(rest) >= MIN_ROOT:
+            out.append((rest, tag))
+
+    for p in ("di", "ke", "se"):
+        if w.startswith(p):
+            add(w[2:], p)
+
+    if w.startswith("ber"):
+        rest = w[3:]
+        add(rest, "ber")
+        if rest[:1] in VOWELS:
+            add("r" + rest, "ber")
+    elif w.startswith("be"):
+        # bekerja -> kerja, belajar -> ajar
+        if w.startswith("bel"):
+            add(w[3:], "be")
+        add(w[2:], "be")
+
+    if w.startswith("ter"):
+        rest = w[3:]
+        add(rest, "ter")
+        if rest[:1] in VOWELS:
+            add("r" + rest, "ter")
+    elif w.startswith("te") and w[2:3] not in VOWELS:
+        add(w[2:], "te")
+
+    for me in ("me", "pe"):
+        if not w.startswith(me):
+            continue
+        r = w[2:]
+        if r.startswith("ny") and r[2:3] in VOWELS:
+            # menyapu -> sapu, menyala -> nyala
+            add("s" + r[2:], me + "ny")
+            add(r, me + "ny")
+        elif r.startswith("ng"):
+            rest = r[2:]
+            if rest.startswith("e") and len(rest) <= 4:
+                # mengebom -> bom, pengecat -> cat
+                add(rest[1:], me + "nge")
+            if rest[:1] in VOWELS:
+                # mengambil -> ambil, mengirim -> kirim
+                add(rest, me + "ng")
+                add("k" + rest, me + "ng")
+            elif rest[:1] in ("g", "h", "k", "q"):
+                add(rest, me + "ng")
+        elif r.startswith("m"):
+            rest = r[1:]
+            if rest[:1] in ("b", "f", "p", "v"):
+                # membaca -> baca, memperkenalkan -> perkenalkan
+                add(rest, me + "m")
+            elif rest[:1] in VOWELS:
+                # memakai -> pakai, meminum -> minum
+                add("p" + rest, me + "m")
+                add("m" + rest, me + "m")
+        elif r.startswith("n"):
+            rest = r[1:]
+            if rest[:1] in ("c", "d", "j", "s", "t", "z"):
+                add(rest, me + "n")
+            elif rest[:1] in VOWELS:
+                # menulis -> tulis, menanti -> nanti
+                add("t" + rest, me + "n")
+                add("n" + rest, me + "n")
+        elif me == "pe" and r.startswith("r"):
+            rest = r[1:]
+            if rest[:1] in VOWELS:
+                # perumahan -> rumah (pe- + r-initial root)
+                add(r, "pe")
+            add(rest, "per")
+        elif me == "pe" and r.startswith("l") and r[1:2] in VOWELS:
+            # pelajar -> ajar, pelari -> lari
+            add(r, "pe")
+            add(r[1:], "pel")
+        elif r[:1] in ("l", "r", "w", "y") or (me == "pe" and r[:1] and r[:1] not in VOWELS):
+            add(r, me)
+    return out
+
+
+def _prefix_forms(base):
+    """
+    [(root, prefixes)] reachable by removing up to MAX_PREFIXES prefixes,
+    breadth first (fewer removals first).
+    """
+    out = []
+    frontier = [(base, ())]
+    seen = {base}
+    for _ in range(MAX_PREFIXES):
+        nxt = []
+        for w, tags in frontier:
+            for rest, tag in _strip_prefix(w):
+                if rest not in seen:
+                    seen.add(rest)
+                    nxt.append((rest, tags + (tag,)))
+        out.extend(nxt)
+        frontier = nxt
+    return out
+
+
+def root_candidates(word):
+    """
+    Yield (root, affixes) candidates for `word`, least stripped first:
+    suffix-only bases (most stripped first, as in Nazief-Adriani), then
+    prefix removals on each base, backtracking to the less stripped bases.
+    """
+    bases = _suffix_forms(word)
+    seen = {word}
+    for base, sufs in reversed(bases[1:]):
+        if base not in seen:
+            seen.add(base)
+            yield base, sufs
+    for base, sufs in reversed(bases):
+        for root, pres in _prefix_forms(base):
+            if root not in seen:
+                seen.add(root)
+                yield root, pres + sufs
+
+
+# _strip_prefix tag -> prefix kind for attach()
+_KIND = {"di": "di", "ke": "ke", "se": "se", "ber": "ber", "be": "ber", "ter": "ter", "te": "ter",
+         "per": "per", "pel": "pe"}
+# prefixes that can sit between an outer prefix and the root (memperbaiki,
+# diketahui, memberlakukan)
+_INNER = ("per", "ke", "ber")
+
+
+def _kind(tag):
+    return _KIND.get(tag) or tag[:2]
+
+
+def _attach_nasal(p, root, elide):
+    """
+    meN- / peN- (p = "me" / "pe") on `root`: the nasal follows the first
+    letter, and voiceless k, p, t, s before a vowel are dropped.
+    """
+    c, nxt = root[:1], root[1:2]
+    drop = elide and nxt in VOWELS
+    if sum(ch in VOWELS for ch in root) == 1:
+        # monosyllabic roots: mengebom, pengecat
+        return {p + "nge" + root}
+    if c in VOWELS or c in ("g", "h", "q"):
+        return {p + "ng" + root}
+    if c == "k":
+        return {p + "ng" + (root[1:] if drop else root)}
+    if c in ("b", "f", "v"):
+        return {p + "m" + root}
+    if c == "p":
+        return {p + "m" + (root[1:] if drop else root)}
+    if c in ("c", "d", "j", "z"):
+        return {p + "n" + root}
+    if c == "t":
+        return {p + "n" + (root[1:] if drop else root)}
+    if c == "s":
+        return {p + "ny" + root[1:]} if drop else {p + "n" + root}
+    return {p + root}
+
+
+def attach(kind, root, elide=True):
+    """
+    Spellings of prefix `kind` (di, ke, se, ber, ter, me, pe, per) on
+    `root`. `elide` is False for a root that starts with per- (memperbaiki
+    keeps its p).
+    """
+    c = root[:1]
+    # kerja, ternak: the first syllable ends in -er
+    er = c not in VOWELS and root[1:3] == "er"
+    if kind in ("di", "ke", "se"):
+        return {kind + root}
+    if kind == "ber":
+        if root == "ajar":
+            return {"belajar"}
+        return {"be" + root} if c == "r" or er else {"ber" + root}
+    if kind == "ter":
+        if c == "r":
+            return {"te" + root}
+        return {"te" + root, "ter" + root} if er else {"ter" + root}
+    if kind == "per":
+        return {"pe" + root} if c == "r" else {"per" + root}
+    if kind == "pe":
+        if root == "ajar":
+            return {"pelajar"}
+        # pe- without a nasal: petani, pekerja, pelari
+        forms = {"pe" + root} if c and c not in VOWELS else set()
+        return forms | _attach_nasal("pe", root, elide)
+    if kind == "me":
+        return _attach_nasal("me", root, elide)
+    return set()
+
+
+class MorphIndex:
+    """
+    Derived form -> base lemma over the vocabulary of a PrefixIndex.
+      analyses(word): [(root, affixes)] accepted for `word`, fewest affixes first
+      attested(word): `word` has at least one accepted analysis
+      roots(word): [(display, key, affixes)] for the least stripped accepted
+                   analyses, [] for any other word
+    """
+
+    def __init__(self, prefix_index, max_roots=3):
+        self.words = prefix_index
+        self.max_roots = max_roots
+
+    def __len__(self):
+        return len(self.words.keys)
+
+    def nbytes(self):
+        # rules over the PrefixIndex; no tables of its own
+        return 0
+
+    def _known(self, word):
+        return self.words._find(word) >= 0
+
+    def analyses(self, word):
+        if not word or " " in word:
+            return []
+        found = []
+        for form, clitics in _suffix_forms(word, (PARTICLES, POSSESSIVES)):
+            bases = [(form, ())]
+            for suf in DERIVATIONAL:
+                if form.endswith(suf) and len(form) - len(suf) >= MIN_ROOT + 1:
+                    bases.append((form[:-len(suf)], (suf,)))
+                    break
+            for base, suf in bases:
+                tail = suf + clitics
+                if (suf or clitics) and self._known(base):
+                    found.append((base, tail))
+                for rest, tag in _strip_prefix(base):
+                    kind = _kind(tag)
+                    if base in attach(kind, rest) and self._known(rest):
+                        found.append((rest, (tag,) + tail))
+                    for root, inner in _strip_prefix(rest):
+                        if (_kind(inner) in _INNER and rest in attach(_kind(inner), root)
+                                and base in attach(kind, rest, elide=inner != "per") and self._known(root)):
+                            found.append((root, (tag, inner) + tail))
+        found.sort(key=lambda a: len(a[1]))
+        out = []
+        for a in found:
+            if a not in out:
+                out.append(a)
+        return out
+
+    def attested(self, word):
+        return bool(self.analyses(word))
+
+    def roots(self, word):
+        px = self.words
+        found = []
+        for root, affixes in self.analyses(word):
+            if found and len(affixes) > len(found[0][2]):
+                break
+            if any(root == key for _, key, _ in found):
+                continue
+            found.append((px.display[px._find(root)], root, list(affixes)))
+            if len(found) >= self.max_roots:
+                break
+        return found
@@ -0,0 +1,161 @@
+"""
+Full-text search over KBBI definitions ("which words mention X").
+
+SearchIndex is an inverted index whose documents are the words of a
+PrefixIndex: a word's document is all of its definition texts, and its
+document id is its position in the PrefixIndex, so no keys are stored twice.
+Posting lists are two flat arrays (document id, term frequency); the sorted
+term table is a FlatStrings with one start offset per term. Queries are
+ranked with BM25.
+
+Documents are added one word at a time while iterating the vocabulary, so
+the build never holds the tokenized corpus in memory.
+"""
+
+import re
+import math
+import heapq
+from array import array
+
+from .flat import FlatStrings
+
+_LABEL_RE = re.compile(r"\[[^\]]*\]")
+_TOKEN_RE = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+MIN_TOKEN = 2
+STOPWORDS = frozenset((
+    "yang", "dan", "di", "ke", "dari", "untuk", "dengan", "atau", "dalam", "pada",
+    "itu", "ini", "sebagai", "oleh", "tentang", "akan", "tidak", "ada", "adalah",
+    "sb", "dsb", "spt", "dl", "tt", "dp", "thd",
+))
+
+
+def tokenize(text):
+    """
+    Lowercase word tokens of a definition, without class labels ("[n]"),
+    digits, one-letter tokens and stopwords.
+    """
+    text = _LABEL_RE.sub(" ", text.lower())
+    return [t for t in _TOKEN_RE.findall(text) if len(t) >= MIN_TOKEN and t not in STOPWORDS]
+
+
+class SearchIndex:
+    """
+    BM25 inverted index over definition texts of the words in a PrefixIndex.
+      texts(key) -> iterable of definition strings for one word (build + snippets)
+      search(query, offset, limit) -> (total, [(display, score, snippet)])
+    """
+
+    def __init__(self, prefix_index, texts, k1=1.2, b=0.75):
+        self.words = prefix_index
+        self.texts = texts
+        self.k1 = k1
+        self.b = b
+        self.doc_len = array("I", bytes(4 * len(prefix_index.keys)))
+        pending = {}  # term -> (array of doc ids, array of term frequencies)
+        total_len = 0
+        n_docs = 0
+        for wid, key in enumerate(prefix_index.keys):
+            counts = {}
+            for text in texts(key) or ():
+                for t in tokenize(text):
+                    counts[t] = counts.get(t, 0) + 1
+            if not counts:
+                continue
+            n_docs += 1
+            dl = sum(counts.values())
+            self.doc_len[wid] = dl
+            total_len += dl
+            for t, tf in counts.items():
+                post = pending.get(t)
+                if post is None:
+                    post = pending[t] = (array("I"), array("H"))
+                post[0].append(wid)
+                post[1].append(min(tf, 0xFFFF))
+        self.n_docs = n_docs
+        self.avg_len = (total_len / float(n_docs)) if n_docs else 0.0
+        # flatten: the i-th sorted term owns _docs/_tfs[_starts[i]:_starts[i + 1]]
+        self.terms = FlatStrings(sorted(pending))
+        self._docs = array("I")
+        self._tfs = array("H")
+        self._starts = array("Q", [0])
+        for t in self.terms:
+            docs, tfs = pending.pop(t)
+            self._docs.extend(docs)
+            self._tfs.extend(tfs)
+            self._starts.append(len(self._docs))
+
+    def __len__(self):
+        return self.n_docs
+
+    def nbytes(self):
+        return (
+            self._docs.itemsize * len(self._docs) + self._tfs.itemsize * len(self._tfs)
+            + self.doc_len.itemsize * len(self.doc_len) + self.terms.nbytes()
+            + self._starts.itemsize * len(self._starts)
+        )
+
+    def _span(self, term):
+        i = self.terms.find(term)
+        return (self._starts[i], self._starts[i + 1]) if i >= 0 else None
+
+    def rebind(self, prefix_index, texts):
+        """
+        Shallow copy serving the same postings through an equal vocabulary
+        from a newer index generation (the arrays are shared, not copied).
+        """
+        clone = object.__new__(SearchIndex)
+        clone.__dict__.update(self.__dict__)
+        clone.words = prefix_index
+        clone.texts = texts
+        return clone
+
+    def idf(self, term):
+        span = self._span(term)
+        if span is None:
+            return 0.0
+        df = span[1] - span[0]
+        return math.log(1.0 + (self.n_docs - df + 0.5) / (df + 0.5))
+
+    def score(self, terms):
+        """
+        {doc id: BM25 score} over every document matching at least one term.
+        """
+        scores = {}
+        k1, b, avg = self.k1, self.b, self.avg_len or 1.0
+        doc_len = self.doc_len
+        for t in set(terms):
+            span = self._span(t)
+            if span is None:
+                continue
+            idf = self.idf(t)
+            docs = self._docs[span[0]:span[1]]
+            tfs = self._tfs[span[0]:span[1]]
+            get = scores.get
+            for wid, tf in zip(docs, tfs):
+                norm = k1 * (1.0 - b + b * doc_len[wid] / avg)
+                scores[wid] = get(wid, 0.0) + idf * tf * (k1 + 1.0) / (tf + norm)
+        return scores
+
+    def snippet(self, wid, terms):
+        """
+        First definition of the word mentioning one of `terms`.
+        """
+        wanted = set(terms)
+        first = None
+        for text in self.texts(self.words.keys[wid]) or ():
+            if first is None:
+                first = text
+            if wanted.intersection(tokenize(text)):
+                return text
+        return first
+
+    def search(self, query, offset=0, limit=20):
+        terms = tokenize(query)
+        if not terms:
+            return 0, []
+        scores = self.score(terms)
+        # PrefixIndex keys are sorted, so ties broken by doc id are alphabetical
+        page = heapq.nsmallest(offset + limit, scores.items(), key=lambda it: (-it[1], it[0]))[offset:]
+        disp = self.words.display
+        return len(scores), [(disp[wid], round(s, 4), self.snippet(wid, terms)) for wid, s in page]
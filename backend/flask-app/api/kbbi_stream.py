@@ -0,0 +1,187 @@
+"""
+Streaming reader for concatenated / partially malformed JSON shards.
+
+The KBBI dumps are sometimes several JSON documents written back to back, and
+some shards contain truncated or corrupted spots. iter_json_values() reads a
+text stream chunk by chunk and yields each top-level value as soon as it is
+complete; the elements of a top-level array are yielded one by one, so memory
+is bounded by the chunk size plus the largest single value, not by the shard.
+
+Values that fit in the buffer are decoded directly with json's C decoder. When
+a value spans chunks or is malformed, a bracket scanner (string-aware) finds
+its end, so every byte is looked at a constant number of times.
+
+A pending value is only given up on a real syntax error: an opening bracket
+where JSON allows none (not after "[" / "," in an array or ":" in an object,
+as when a truncated value runs into the next one), a mismatched closing
+bracket, or a complete value that fails to decode. Layout alone (brackets at
+column 0, as with indent=0) never splits a value. Malformed input is skipped
+up to the next "{" / "[" and the number of skipped bytes is reported through
+the `stats` dict.
+"""
+
+import re
+import json
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+_SEP = re.compile(r"[\s,]*")
+_NEXT_OPEN = re.compile(r"[{\[]")
+_STRUCT = re.compile(r'[{}\[\]"\n]')
+_STR_TAIL = re.compile(r'(?:[^"\\\n]|\\.)*')
+_PAIR = {"}": "{", "]": "["}
+_WS = " \t\r\n"
+# characters that may precede a nested "{" / "[" inside an array / object
+_OPEN_AFTER = {"[": "[,", "{": ":"}
+
+
+def iter_json_values(fp, chunk_size=DEFAULT_CHUNK_SIZE, stats=None):
+    """
+    Yield JSON values read from text stream `fp`.
+    `stats` (optional dict) is updated with: values, skipped_bytes, resyncs.
+    """
+    if stats is None:
+        stats = {}
+    for k in ("values", "skipped_bytes", "resyncs"):
+        stats.setdefault(k, 0)
+
+    dec = json.JSONDecoder()
+    buf = ""
+    pos = 0          # next unread position when no value is pending
+    start = -1       # start of the pending (incomplete) value, -1 if none
+    scan = 0         # scanner position inside the pending value
+    stack = []       # open brackets of the pending value
+    in_array = False  # inside a top-level array: yield its elements
+    eof = False
+    more = True       # buffer needs another chunk before progress can be made
+
+    def _skipped(text):
+        stats["skipped_bytes"] += len(text.encode("utf-8", "replace"))
+
+    while True:
+        if more:
+            if eof:
+                break
+            more = False
+            cut = start if start >= 0 else pos
+            # grow reads with the pending value so long values stay linear
+            chunk = fp.read(max(chunk_size, len(buf) - cut))
+            if not chunk:
+                eof = True
+                continue
+            buf = buf[cut:] + chunk
+            pos -= cut
+            scan -= cut
+            if start >= 0:
+                start -= cut
+            continue
+
+        if start < 0:
+            pos = _SEP.match(buf, pos).end()
+            if pos >= len(buf):
+                more = True
+                continue
+            ch = buf[pos]
+            if ch == "[" and not in_array:
+                in_array = True
+                pos += 1
+                continue
+            if ch == "]" and in_array:
+                in_array = False
+                pos += 1
+                continue
+            if ch in "{[":
+                try:
+                    obj, end = dec.raw_decode(buf, pos)
+                except ValueError:
+                    # incomplete in this buffer or malformed: hand over to the scanner
+                    start = scan = pos
+                    stack = []
+                    continue
+                stats["values"] += 1
+                pos = end
+                yield obj
+                continue
+            if in_array:
+                # scalar array element (not an entry) -> step over it
+                try:
+                    _, end = dec.raw_decode(buf, pos)
+                    pos = end
+                    continue
+                except ValueError:
+                    pass
+            # noise: resync on the next "{" / "["
+            m = _NEXT_OPEN.search(buf, pos + 1)
+            nxt = m.start() if m else len(buf)
+            _skipped(buf[pos:nxt])
+            stats["resyncs"] += 1
+            pos = nxt
+            continue
+
+        # Scanner for the pending value buf[start:]
+        m = _STRUCT.search(buf, scan)
+        if not m:
+            scan = len(buf)
+            more = True
+            continue
+        j = m.start()
+        ch = buf[j]
+        if ch == '"':
+            k = _STR_TAIL.match(buf, j + 1).end()
+            if k >= len(buf) or (buf[k] == "\\" and k + 1 >= len(buf)):
+                # string (or an escape in it) runs past the buffer; rescan it
+                # after the next read
+                scan = j
+                more = True
+                continue
+            # closing quote, or a raw newline (invalid in JSON: string ends there)
+            scan = k + 1 if buf[k] == '"' else k
+            continue
+        if ch == "\n":
+            scan = j + 1
+            continue
+        if ch in "{[":
+            if stack:
+                k = j - 1
+                while buf[k] in _WS:
+                    k -= 1
+                if buf[k] not in _OPEN_AFTER[stack[-1]]:
+                    # no value may start here: the pending value was truncated,
+                    # start over from this opener
+                    _skipped(buf[start:j])
+                    stats["resyncs"] += 1
+                    start = -1
+                    pos = j
+                    stack = []
+                    in_array = False
+                    continue
+            stack.append(ch)
+            scan = j + 1
+            continue
+        # closing bracket
+        if not stack or stack[-1] != _PAIR[ch]:
+            _skipped(buf[start:j + 1])
+            stats["resyncs"] += 1
+            start = -1
+            pos = j + 1
+            stack = []
+            continue
+        stack.pop()
+        scan = j + 1
+        if not stack:
+            text = buf[start:j + 1]
+            start = -1
+            pos = j + 1
+            try:
+                obj = json.loads(text)
+            except ValueError:
+                _skipped(text)
+                stats["resyncs"] += 1
+                continue
+            stats["values"] += 1
+            yield obj
+
+    if start >= 0:
+        # truncated value at end of stream
+        _skipped(buf[start:])
+        stats["resyncs"] += 1
@@ -0,0 +1,286 @@
+"""
+Suggestion indices for KBBI misses (`saran`).
+
+PrefixIndex keeps every normalized key in one sorted array (a FlatStrings
+blob, so the vocabulary is a couple of objects rather than one str per word),
+so a prefix query is two bisects plus a walk over the matching slice. Several sources
+(word DB, offline index) feed the same index; the first source to add a key
+decides its display form.
+
+Short prefixes ("a", "me") match thousands of keys. Their best TOP_N keys
+are ranked over the whole range once, on first use, and kept per prefix;
+note_hit() moves a key within the lists of its prefixes, so the ranking
+stays exact without rescanning the range.
+"""
+
+import heapq
+from array import array
+from bisect import bisect_left, insort
+
+from .flat import FlatStrings
+
+# Prefixes with more matches than this are answered from their kept top list
+RANK_WINDOW = 512
+# Length of the kept top lists; a larger `limit` on a wide prefix only ranks
+# the first RANK_WINDOW matches (alphabetical), as an upper bound on the work.
+TOP_N = 50
+
+
+def default_rank(key, display, freq):
+    """
+    Default ranking: most looked-up first, then shorter words, then alphabetical.
+    Smaller sort keys rank higher.
+    """
+    return (-freq, len(key), key)
+
+
+class PrefixIndex:
+    """
+    Sorted-array prefix index with a pluggable ranking hook.
+      add(key, display) during build, then freeze(); complete(prefix, limit)
+    `freq` counts successful lookups per key (see note_hit) and feeds ranking.
+    """
+
+    def __init__(self, rank=None):
+        self.rank = rank or default_rank
+        self._pending = {}
+        self.keys = FlatStrings()
+        self.display = FlatStrings()
+        self.freq = array("I")
+        self._top = {}  # wide prefix -> [(rank, id)] of its TOP_N best keys, best first
+
+    def add(self, key, display=None):
+        if not isinstance(key, str) or not key:
+            return
+        if key not in self._pending:
+            self._pending[key] = display if isinstance(display, str) and display else key
+
+    def freeze(self):
+        items = sorted(self._pending.items())
+        self._pending = {}
+        self.keys = FlatStrings(k for k, _ in items)
+        self.display = FlatStrings(d for _, d in items)
+        self.freq = array("I", bytes(4 * len(items)))
+        self._top = {}
+        return self
+
+    def __len__(self):
+        return len(self.keys)
+
+    def nbytes(self):
+        return self.keys.nbytes() + self.display.nbytes() + self.freq.itemsize * len(self.freq)
+
+    def _find(self, key):
+        return self.keys.find(key)
+
+    def __contains__(self, key):
+        return self._find(key) >= 0
+
+    def _rank_of(self, i):
+        return self.rank(self.keys[i], self.display[i], self.freq[i])
+
+    def note_hit(self, key, n=1):
+        i = self._find(key)
+        if i < 0:
+            return
+        before = self._rank_of(i) if self._top else None
+        self.freq[i] = min(self.freq[i] + n, 0xFFFFFFFF)
+        if not self._top:
+            return
+        after = self._rank_of(i)
+        for j in range(1, len(key) + 1):
+            top = self._top.get(key[:j])
+            if top is None:
+                continue
+            listed = (before, i) in top
+            if listed and after > before:
+                # ranked lower now: a key outside the list may overtake it
+                self._top.pop(key[:j], None)
+                continue
+            if listed or len(top) < TOP_N or (after, i) < top[-1]:
+                # lists are replaced, never mutated: complete() may be reading one
+                top = [e for e in top if e[1] != i]
+                insort(top, (after, i))
+                self._top[key[:j]] = top[:TOP_N]
+
+    def prefix_range(self, prefix):
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + "\U0010ffff", lo)
+        return lo, hi
+
+    def complete(self, prefix, limit=10):
+        """
+        Return up to `limit` display strings whose key starts with `prefix`,
+        ordered by the ranking hook.
+        """
+        if not prefix or limit <= 0:
+            return []
+        lo, hi = self.prefix_range(prefix)
+        if hi - lo > RANK_WINDOW and limit <= TOP_N:
+            top = self._top.get(prefix)
+            if top is None:
+                top = self._top[prefix] = heapq.nsmallest(TOP_N, ((self._rank_of(i), i) for i in range(lo, hi)))
+            return [self.display[i] for _, i in top[:limit]]
+        hi = min(hi, lo + RANK_WINDOW)
+        keys, disp, freq, rank = self.keys, self.display, self.freq, self.rank
+        best = heapq.nsmallest(limit, range(lo, hi), key=lambda i: rank(keys[i], disp[i], freq[i]))
+        return [disp[i] for i in best]
+
+
+def _deletes(word, max_distance):
+    """
+    All strings reachable from `word` by deleting up to `max_distance` chars.
+    """
+    out = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        nxt = set()
+        for w in frontier:
+            for i in range(len(w)):
+                nxt.add(w[:i] + w[i + 1:])
+        nxt -= out
+        out |= nxt
+        frontier = nxt
+    return out
+
+
+def edit_distance(a, b, max_distance):
+    """
+    Optimal string alignment distance (Levenshtein + adjacent transposition),
+    returning max_distance + 1 as soon as the bound is exceeded.
+    """
+    if a == b:
+        return 0
+    la, lb = len(a), len(b)
+    if abs(la - lb) > max_distance:
+        return max_distance + 1
+    # strip common prefix/suffix: the DP only needs the differing middle
+    p = 0
+    while p < la and p < lb and a[p] == b[p]:
+        p += 1
+    while la > p and lb > p and a[la - 1] == b[lb - 1]:
+        la -= 1
+        lb -= 1
+    a, b = a[p:la], b[p:lb]
+    la, lb = len(a), len(b)
+    if not la or not lb:
+        return la or lb
+    prev2 = None
+    prev = list(range(lb + 1))
+    for i in range(1, la + 1):
+        cur = [i] + [0] * lb
+        ca = a[i - 1]
+        row_min = i
+        for j in range(1, lb + 1):
+            cb = b[j - 1]
+            cost = 0 if ca == cb else 1
+            v = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                v = min(v, prev2[j - 2] + 1)
+            cur[j] = v
+            if v < row_min:
+                row_min = v
+        if row_min > max_distance:
+            return max_distance + 1
+        prev2, prev = prev, cur
+    return min(prev[lb], max_distance + 1)
+
+
+def _signature(word):
+    """
+    64-bit letter-count signature: two bits per character class (ord & 31),
+    set for "occurs at least once" and "at least twice". One edit flips at
+    most two bits, so keys whose signatures differ in more than 2 * d bits
+    are more than d edits away and can be dropped without running the DP.
+    """
+    seen = 0
+    sig = 0
+    for ch in word:
+        b = 1 << (ord(ch) & 31)
+        if seen & b:
+            sig |= b << 32
+        seen |= b
+    return sig | seen
+
+
+class FuzzyIndex:
+    """
+    SymSpell-style typo index over the vocabulary of a PrefixIndex.
+
+    Every key contributes the deletions of its first `prefix_length` chars (up
+    to `max_distance` deletions). Instead of a dict of lists, the deletions are
+    stored as two parallel arrays (hash of the deletion, key id) sorted by
+    hash, so a query is a handful of bisects followed by exact verification
+    with edit_distance(). Hash collisions only add candidates, never lose them.
+
+    Each id also carries the number of chars deleted, so a 1-edit lookup on a
+    2-edit index skips the (much larger) 2-deletion buckets. Candidates are
+    checked against the key length and a letter-count signature before the
+    edit-distance DP, which is where the time of a lookup goes.
+    """
+
+    def __init__(self, prefix_index, max_distance=2, prefix_length=7):
+        self.words = prefix_index
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        mask = (1 << 64) - 1
+        packed = []
+        lens = array("H")
+        sigs = array("Q")
+        for wid, key in enumerate(prefix_index.keys):
+            lens.append(min(len(key), 0xFFFF))
+            sigs.append(_signature(key))
+            head = key[:prefix_length]
+            for d in _deletes(head, max_distance):
+                packed.append(((hash(d) & mask) << 32) | ((len(head) - len(d)) << 30) | wid)
+        packed.sort()
+        self._hashes = array("Q", (p >> 32 for p in packed))
+        self._ids = array("I", (p & 0xFFFFFFFF for p in packed))
+        self._lens = lens
+        self._sigs = sigs
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def nbytes(self):
+        return sum(a.itemsize * len(a) for a in (self._hashes, self._ids, self._lens, self._sigs))
+
+    def lookup(self, word, max_distance=None, limit=10):
+        """
+        Return [(display, distance)] for keys within `max_distance` edits of
+        `word`, best first: distance, then the PrefixIndex ranking hook.
+        """
+        if not word:
+            return []
+        if max_distance is None or max_distance > self.max_distance:
+            max_distance = self.max_distance
+        mask = (1 << 64) - 1
+        hashes, ids = self._hashes, self._ids
+        n = len(hashes)
+        # deletions beyond max_distance on the key side cannot pair up
+        depth = (max_distance + 1) << 30
+        cand = set()
+        for d in _deletes(word[:self.prefix_length], max_distance):
+            h = hash(d) & mask
+            i = bisect_left(hashes, h)
+            while i < n and hashes[i] == h:
+                v = ids[i]
+                if v < depth:
+                    cand.add(v & 0x3FFFFFFF)
+                i += 1
+
+        px = self.words
+        keys, disp, freq, rank = px.keys, px.display, px.freq, px.rank
+        lens, sigs = self._lens, self._sigs
+        lw, sw = len(word), _signature(word)
+        flips = 2 * max_distance
+        found = []
+        for wid in cand:
+            if abs(lens[wid] - lw) > max_distance or bin(sigs[wid] ^ sw).count("1") > flips:
+                continue
+            key = keys[wid]
+            dist = edit_distance(word, key, max_distance)
+            if dist <= max_distance:
+                found.append(((dist, rank(key, disp[wid], freq[wid])), wid, dist))
+        best = heapq.nsmallest(limit, found)
+        return [(disp[wid], dist) for _, wid, dist in best]
@@ -0,0 +1,261 @@
+"""
+Memory-lean store for the KBBI word DB (kbbi_word_data*.json).
+
+Instead of keeping every record as nested dicts, each shard keeps its records
+as raw JSON byte slices in one bytes blob (plus an offsets array), and a
+record is decoded only when a lookup hits it. The lookup tables are sorted
+FlatMap tables from normalized keys to an integer reference (shard number
+<< 32 | record number), so a loaded store is a few dozen objects however
+many records it holds, and its pages stay shared between forked workers.
+
+Merging follows the old loader: the first shard defining a raw key wins,
+by_key is filled in that order (a later key normalizing to the same form
+replaces an earlier one), and by_lema keeps the first record per lemma.
+
+Benchmark (bytes per record, dicts vs this store):
+    python -m api.kbbi_worddb [shard.json ...]   (run from backend/flask-app)
+"""
+
+import re
+import sys
+import json
+import time
+from array import array
+
+from .flat import FlatStrings, FlatMap
+
+_WS = re.compile(r"[ \t\n\r]*")
+
+
+def _entry_names(obj):
+    """
+    entri[].nama (or lema) strings of one raw record.
+    """
+    data = (obj or {}).get("data") if isinstance(obj, dict) else None
+    entri = (data or {}).get("entri") if isinstance(data, dict) else None
+    names = []
+    if isinstance(entri, list):
+        for ent in entri:
+            if isinstance(ent, dict):
+                nama = ent.get("nama") or ent.get("lema")
+                if isinstance(nama, str):
+                    names.append(nama)
+    return names
+
+
+class WordShard:
+    """
+    One parsed shard: records as byte slices of `blob`, in file order.
+      keys:   raw key of each record
+      lemmas: normalized entri names of each record that differ from its
+              normalized key, joined by LEMMA_SEP ("" when there are none)
+      seconds: time parse() took
+    """
+
+    __slots__ = ("name", "blob", "offsets", "keys", "lemmas", "seconds")
+
+    LEMMA_SEP = "\x1f"
+
+    def __init__(self, name, blob, offsets, keys, lemmas, seconds=0.0):
+        self.name = name
+        self.blob = blob
+        self.offsets = offsets
+        self.keys = keys if isinstance(keys, FlatStrings) else FlatStrings(keys)
+        self.lemmas = lemmas if isinstance(lemmas, FlatStrings) else FlatStrings(lemmas)
+        self.seconds = seconds
+
+    @classmethod
+    def parse(cls, name, data, normalize):
+        """
+        Split the top-level JSON object in `data` (bytes) into record slices.
+        Raises ValueError on malformed JSON; a non-object document is empty.
+        """
+        started = time.perf_counter()
+        text = data.decode("utf-8") if isinstance(data, (bytes, bytearray)) else data
+        scan = json.JSONDecoder().scan_once
+        ws = _WS.match
+        parts = []
+        offsets = array("Q", [0])
+        keys = []
+        lemmas = []
+        pos = ws(text, 0).end()
+        if text[pos:pos + 1] != "{":
+            json.loads(text)  # raises on malformed input
+            return cls(name, b"", offsets, keys, lemmas, round(time.perf_counter() - started, 6))
+        pos = ws(text, pos + 1).end()
+        if text[pos:pos + 1] == "}":
+            return cls(name, b"", offsets, keys, lemmas, round(time.perf_counter() - started, 6))
+        while True:
+            if text[pos:pos + 1] != '"':
+                raise ValueError(f"{name}: expected key at char {pos}")
+            key, pos = json.decoder.scanstring(text, pos + 1)
+            pos = ws(text, pos).end()
+            if text[pos:pos + 1] != ":":
+                raise ValueError(f"{name}: expected ':' at char {pos}")
+            pos = ws(text, pos + 1).end()
+            try:
+                obj, end = scan(text, pos)
+            except StopIteration:
+                raise ValueError(f"{name}: expected value at char {pos}")
+            raw = text[pos:end].encode("utf-8")
+            parts.append(raw)
+            offsets.append(offsets[-1] + len(raw))
+            keys.append(key)
+            nk = normalize(key)
+            extra = [ln for ln in dict.fromkeys(normalize(n) for n in _entry_names(obj)) if ln and ln != nk]
+            lemmas.append(cls.LEMMA_SEP.join(extra))
+            pos = ws(text, end).end()
+            c = text[pos:pos + 1]
+            if c == ",":
+                pos = ws(text, pos + 1).end()
+            elif c == "}":
+                break
+            else:
+                raise ValueError(f"{name}: expected ',' or '}}' at char {pos}")
+        return cls(name, b"".join(parts), offsets, keys, lemmas, round(time.perf_counter() - started, 6))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def index(self):
+        """
+        raw key -> record number; a key repeated in the file keeps its first
+        position and last value, as json.load would.
+        """
+        return {k: i for i, k in enumerate(self.keys)}
+
+    def record_lemmas(self, i):
+        names = self.lemmas[i]
+        return names.split(self.LEMMA_SEP) if names else ()
+
+    def record(self, i):
+        return json.loads(self.blob[self.offsets[i]:self.offsets[i + 1]])
+
+    def nbytes(self):
+        return len(self.blob) + self.offsets.itemsize * len(self.offsets) + self.keys.nbytes() + self.lemmas.nbytes()
+
+
+class WordStore:
+    """
+    Word DB lookups over a list of WordShard, decoding records on demand.
+      get(key)      -> record dict by normalized key, else by entri lemma
+      by_key(key)   -> record dict by normalized key only
+      display(key)  -> original spelling of a normalized key
+      items()       -> (normalized key, record dict) for every key (decodes all)
+    """
+
+    __slots__ = ("shards", "_by_key", "_by_lema", "_display", "records")
+
+    def __init__(self, shards, normalize):
+        self.shards = list(shards)
+        by_key = {}
+        by_lema = {}
+        orig = {}
+        self.records = 0
+        seen = set()
+        for si, shard in enumerate(self.shards):
+            for raw_key, rec in shard.index().items():
+                # keep first occurrence to avoid accidental overwrite
+                if raw_key in seen:
+                    continue
+                seen.add(raw_key)
+                self.records += 1
+                ref = (si << 32) | rec
+                nk = normalize(raw_key)
+                if nk:
+                    by_key[nk] = ref
+                    orig[nk] = raw_key
+                for ln in shard.record_lemmas(rec):
+                    if ln not in by_lema:
+                        by_lema[ln] = ref
+        # a lemma that is also a key is always answered by _by_key
+        self._by_key = FlatMap(by_key.items())
+        self._by_lema = FlatMap((ln, ref) for ln, ref in by_lema.items() if ln not in by_key)
+        self._display = FlatStrings(orig[nk] for nk in self._by_key.keys)
+
+    def _decode(self, ref):
+        return self.shards[ref >> 32].record(ref & 0xFFFFFFFF)
+
+    def __len__(self):
+        return self.records
+
+    def __contains__(self, key):
+        return key in self._by_key or key in self._by_lema
+
+    def get(self, key):
+        ref = self._by_key.get(key)
+        if ref is None:
+            ref = self._by_lema.get(key)
+        return self._decode(ref) if ref is not None else None
+
+    def by_key(self, key):
+        ref = self._by_key.get(key)
+        return self._decode(ref) if ref is not None else None
+
+    def display(self, key):
+        i = self._by_key.keys.find(key)
+        return self._display[i] if i >= 0 else key
+
+    def keys(self):
+        return iter(self._by_key.keys)
+
+    def display_items(self):
+        return zip(self._by_key.keys, self._display)
+
+    def items(self):
+        for nk, ref in self._by_key.items():
+            yield nk, self._decode(ref)
+
+    def nbytes(self):
+        tables = self._by_key.nbytes() + self._by_lema.nbytes() + self._display.nbytes()
+        return sum(s.nbytes() for s in self.shards) + tables
+
+
+if __name__ == "__main__":
+    import gc
+    import glob
+    import tracemalloc
+    from api.kbbi import KBBI_WORD_DB_GLOB, _kbbi_normalize
+
+    paths = sys.argv[1:] or sorted(glob.glob(KBBI_WORD_DB_GLOB))
+
+    def dict_store():
+        raw = {}
+        for p in paths:
+            with open(p, "r", encoding="utf-8") as f:
+                obj = json.load(f)
+            for k, v in (obj.items() if isinstance(obj, dict) else ()):
+                if k not in raw:
+                    raw[k] = v
+        by_key, by_lema, orig_key = {}, {}, {}
+        for k, rec in raw.items():
+            nk = _kbbi_normalize(k)
+            if nk:
+                by_key[nk] = rec
+                orig_key[nk] = k
+            for n in _entry_names(rec):
+                ln = _kbbi_normalize(n)
+                if ln and ln not in by_lema:
+                    by_lema[ln] = rec
+        return {"by_key": by_key, "by_lema": by_lema, "orig_key": orig_key, "raw": raw}, len(raw)
+
+    def lean_store():
+        shards = []
+        for p in paths:
+            with open(p, "rb") as f:
+                shards.append(WordShard.parse(p, f.read(), _kbbi_normalize))
+        store = WordStore(shards, _kbbi_normalize)
+        return store, len(store)
+
+    for label, build in (("dicts", dict_store), ("WordStore", lean_store)):
+        gc.collect()
+        tracemalloc.start()
+        started = time.perf_counter()
+        kept, n = build()
+        seconds = time.perf_counter() - started
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        per = retained / n if n else 0
+        print(f"{label:<10} {n} records  {retained / 1e6:9.1f} MB  {per:8.0f} bytes/record  load {seconds:.2f}s")
+        del kept
@@ -5,8 +5,13 @@ import random
 import string
 from flask import Blueprint, request, jsonify, send_file, after_this_request, current_app
 
+from .ratelimit import RateLimiter, rate_limit
+
 library_bp = Blueprint("library", __name__)
 
+# Per-IP limit shared by all library routes
+_LIBRARY_LIMITER = RateLimiter("library", max_requests=120, window=60)
+
 # Paths
 APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 LIB_DATA_DIR = os.path.join(APP_DIR, "data")
@@ -130,6 +135,7 @@ def _lib_write_all(records):
 
 
 @library_bp.get("/api/library/books")
+@rate_limit(_LIBRARY_LIMITER)
 def library_list_books():
     """
     Return all books as JSON array [{pk, date_add, penulis, judul, tahun}]
@@ -146,6 +152,7 @@ def library_list_books():
 
 
 @library_bp.post("/api/library/books")
+@rate_limit(_LIBRARY_LIMITER)
 def library_add_book():
     """
     Body JSON: { penulis: str, judul: str, tahun: "YYYY" }
@@ -185,6 +192,7 @@ def library_add_book():
 
 
 @library_bp.put("/api/library/books/<pk>")
+@rate_limit(_LIBRARY_LIMITER)
 def library_update_book(pk):
     """
     Body JSON: any of { penulis, judul, tahun }
@@ -231,6 +239,7 @@ def library_update_book(pk):
 
 
 @library_bp.delete("/api/library/books/<pk>")
+@rate_limit(_LIBRARY_LIMITER)
 def library_delete_book(pk):
     recs = _lib_read_all()
     new_recs = [r for r in recs if r["pk"] != pk]
@@ -248,6 +257,7 @@ def library_delete_book(pk):
 
 
 @library_bp.get("/api/library/export")
+@rate_limit(_LIBRARY_LIMITER)
 def library_export():
     """
     ?format=json|txt
@@ -0,0 +1,227 @@
+"""
+Reusable per-client rate limiting for blueprint routes.
+
+Each RateLimiter is a token bucket per key (client IP by default): `capacity`
+requests may burst, refilled at `max_requests / window` tokens per second.
+Bucket state is two numbers per key, so a check is O(1). Keys idle long
+enough to be full again are swept periodically, since dropping them is
+equivalent to keeping a full bucket.
+
+Bucket state lives in a store. MemoryBucketStore is per process; set
+RATE_LIMIT_DB to a SQLite file path to share limits across worker processes.
+When the SQLite store fails (locked past its timeout, disk full, ...) the
+limiter logs it and falls back to a per-process memory store instead of
+failing the request.
+
+Usage:
+    _LIMITER = RateLimiter("kbbi", max_requests=60, window=60)
+
+    @kbbi_bp.get("/api/kbbi/cek")
+    @rate_limit(_LIMITER)
+    def kbbi_cek(): ...
+"""
+
+import os
+import math
+import time
+import sqlite3
+import threading
+from functools import wraps
+from flask import request, jsonify, current_app
+
+RATE_LIMIT_MESSAGE = "Terlalu banyak permintaan, coba lagi nanti."
+
+
+def client_ip() -> str:
+    """
+    Best-effort client address (first X-Forwarded-For hop, else remote_addr).
+    """
+    try:
+        return (request.headers.get("X-Forwarded-For") or request.remote_addr or "").split(",")[0].strip()
+    except Exception:
+        return ""
+
+
+def _refill(tokens, ts, now, rate, capacity):
+    if ts is None:
+        return float(capacity)
+    return min(float(capacity), tokens + max(0.0, now - ts) * rate)
+
+
+class MemoryBucketStore:
+    """
+    In-process bucket state: key -> [tokens, last_ts].
+    """
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, capacity, now):
+        """
+        Consume one token for `key`. Returns (allowed, retry_after_seconds).
+        """
+        with self._lock:
+            b = self._buckets.get(key)
+            tokens = _refill(b[0], b[1], now, rate, capacity) if b else float(capacity)
+            if tokens >= 1.0:
+                self._buckets[key] = [tokens - 1.0, now]
+                return True, 0.0
+            self._buckets[key] = [tokens, now]
+            return False, (1.0 - tokens) / rate
+
+    def sweep(self, idle_before):
+        with self._lock:
+            dead = [k for k, b in self._buckets.items() if b[1] < idle_before]
+            for k in dead:
+                del self._buckets[k]
+        return len(dead)
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SQLiteBucketStore:
+    """
+    Bucket state in a SQLite file (WAL mode), shared by all worker processes.
+    One connection per thread and process.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self):
+        c = getattr(self._local, "conn", None)
+        if c is not None and getattr(self._local, "pid", None) == os.getpid():
+            return c
+        c = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        c.execute("PRAGMA journal_mode=WAL")
+        c.execute("PRAGMA synchronous=NORMAL")
+        c.execute("CREATE TABLE IF NOT EXISTS buckets (k TEXT PRIMARY KEY, tokens REAL, ts REAL)")
+        self._local.conn = c
+        self._local.pid = os.getpid()
+        return c
+
+    def take(self, key, rate, capacity, now):
+        c = self._conn()
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            row = c.execute("SELECT tokens, ts FROM buckets WHERE k = ?", (key,)).fetchone()
+            tokens = _refill(row[0], row[1], now, rate, capacity) if row else float(capacity)
+            allowed = tokens >= 1.0
+            if allowed:
+                tokens -= 1.0
+            c.execute("INSERT OR REPLACE INTO buckets (k, tokens, ts) VALUES (?, ?, ?)", (key, tokens, now))
+            c.execute("COMMIT")
+        except Exception:
+            c.execute("ROLLBACK")
+            raise
+        return (True, 0.0) if allowed else (False, (1.0 - tokens) / rate)
+
+    def sweep(self, idle_before):
+        cur = self._conn().execute("DELETE FROM buckets WHERE ts < ?", (idle_before,))
+        return cur.rowcount
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM buckets").fetchone()[0]
+
+
+_DEFAULT_STORE = None
+
+
+def default_store():
+    """
+    Shared store for all limiters: SQLite when RATE_LIMIT_DB is set, else memory.
+    """
+    global _DEFAULT_STORE
+    if _DEFAULT_STORE is None:
+        db = os.environ.get("RATE_LIMIT_DB")
+        _DEFAULT_STORE = SQLiteBucketStore(db) if db else MemoryBucketStore()
+    return _DEFAULT_STORE
+
+
+class RateLimiter:
+    """
+    Token bucket limiter: at most `max_requests` per `window` seconds per key,
+    bursting up to `max_requests`. Keys are namespaced by `name`.
+    """
+
+    def __init__(self, name, max_requests=60, window=60, store=None, sweep_interval=60):
+        self.name = name
+        self.capacity = max(1, int(max_requests))
+        self.rate = self.capacity / float(window)
+        self.store = store
+        self.sweep_interval = sweep_interval
+        self._last_sweep = time.time()
+        self._fallback = None  # MemoryBucketStore used while the store fails
+        self.allowed = 0
+        self.limited = 0
+        self.store_errors = 0
+
+    def _store(self):
+        if self.store is None:
+            self.store = default_store()
+        return self.store
+
+    def allow(self, key):
+        """
+        Returns (allowed, retry_after_seconds) and consumes a token if allowed.
+        """
+        now = time.time()
+        store = self._store()
+        if now - self._last_sweep >= self.sweep_interval:
+            self._last_sweep = now
+            for s in (store, self._fallback):
+                try:
+                    # a bucket idle for capacity/rate seconds is full again
+                    if s is not None:
+                        s.sweep(now - self.capacity / self.rate)
+                except Exception:
+                    pass
+        key = f"{self.name}:{key}"
+        try:
+            ok, retry = store.take(key, self.rate, self.capacity, now)
+        except sqlite3.Error as e:
+            self.store_errors += 1
+            try:
+                current_app.logger.warning("rate limit %s: store failed, using per-process buckets: %r", self.name, e)
+            except Exception:
+                pass
+            if self._fallback is None:
+                self._fallback = MemoryBucketStore()
+            ok, retry = self._fallback.take(key, self.rate, self.capacity, now)
+        if ok:
+            self.allowed += 1
+        else:
+            self.limited += 1
+        return ok, retry
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "max_requests": self.capacity,
+            "window": self.capacity / self.rate,
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "store_errors": self.store_errors,
+        }
+
+
+def rate_limit(limiter, key_func=client_ip):
+    """
+    Route decorator: answer 429 (JSON error + Retry-After) once the caller's
+    bucket is empty. Place it below the blueprint route decorator.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            ok, retry = limiter.allow(key_func())
+            if not ok:
+                resp = jsonify({"error": RATE_LIMIT_MESSAGE})
+                resp.status_code = 429
+                resp.headers["Retry-After"] = str(max(1, int(math.ceil(retry))))
+                return resp
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,184 @@
+"""
+Ordered chain of lookup sources, tried until one answers.
+
+Each source is registered under a name with a priority (lower runs first), a
+timeout and an enabled flag, all of which can be changed later with
+configure(). resolve() calls the enabled sources in priority order:
+
+  result        : the source answered; the chain stops
+  None          : the source does not know the key; try the next one
+  raise Miss    : definite "does not exist" (e.g. from an authoritative
+                  upstream); the chain stops and the Miss propagates
+  raise Timeout : the source ran out of its time budget; try the next one
+  raise Unavailable : the source could not be asked right now (circuit
+                  breaker open, pool full); try the next one
+  other errors  : counted, reported to on_error and skipped
+
+A None from resolve() is only a definite miss if no source timed out, failed
+or was unavailable; pass a `failed` list to find out (callers use it to avoid
+caching answers that a retry could change).
+
+The timeout is handed to the lookup, which enforces it where it can (an
+upstream call waits at most that long); a local call that returns later than
+its timeout is counted as slow. Every outcome is counted per source, so the
+stats show which sources actually answer and what they cost.
+"""
+
+import time
+import threading
+from concurrent.futures import TimeoutError as FutureTimeout
+
+HIT = "hits"
+MISS = "misses"
+ERROR = "errors"
+TIMEOUT = "timeouts"
+SKIPPED = "skipped"
+
+
+class Miss(Exception):
+    """
+    Raised by a source that knows the key does not exist; carries the
+    suggestions it returned, if any.
+    """
+
+    def __init__(self, saran=None):
+        super().__init__("not found")
+        self.saran = list(saran or [])
+
+
+class Unavailable(Exception):
+    """
+    Raised by a source that was short-circuited without asking its backend.
+    """
+
+
+class Source:
+    __slots__ = ("name", "lookup", "priority", "timeout", "enabled", "calls", "hits", "misses", "errors", "timeouts",
+                 "skipped", "slow", "seconds")
+
+    def __init__(self, name, lookup, priority=100, timeout=None, enabled=True):
+        self.name = name
+        self.lookup = lookup
+        self.priority = priority
+        self.timeout = timeout
+        self.enabled = bool(enabled)
+        self.calls = 0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.skipped = 0
+        self.slow = 0
+        self.seconds = 0.0
+
+
+class ResolverChain:
+    """
+      register(name, lookup, priority, timeout, enabled); lookup(*args, timeout=...)
+      resolve(*args, exclude=(), failed=None) -> (source name, result) or (None, None);
+        names of sources that timed out, failed or were unavailable are
+        appended to `failed`
+      record(name, outcome, seconds) for lookups made outside resolve()
+    """
+
+    def __init__(self, name, on_error=None):
+        self.name = name
+        self.on_error = on_error
+        self._lock = threading.Lock()
+        self._sources = {}
+        self._order = ()
+
+    def register(self, name, lookup, priority=100, timeout=None, enabled=True):
+        with self._lock:
+            self._sources[name] = Source(name, lookup, priority, timeout, enabled)
+            self._reorder()
+
+    def configure(self, name, priority=None, timeout=None, enabled=None):
+        with self._lock:
+            src = self._sources[name]
+            if priority is not None:
+                src.priority = priority
+            if timeout is not None:
+                src.timeout = timeout
+            if enabled is not None:
+                src.enabled = bool(enabled)
+            self._reorder()
+
+    def _reorder(self):
+        # registration order breaks priority ties; readers use the tuple lock-free
+        self._order = tuple(sorted(self._sources.values(), key=lambda s: s.priority))
+
+    def enabled(self, name):
+        src = self._sources.get(name)
+        return src is not None and src.enabled
+
+    def order(self):
+        return [s.name for s in self._order if s.enabled]
+
+    def record(self, name, outcome, seconds=0.0):
+        src = self._sources.get(name)
+        if src is None:
+            return
+        with self._lock:
+            src.calls += 1
+            setattr(src, outcome, getattr(src, outcome) + 1)
+            src.seconds += seconds
+            if outcome != TIMEOUT and src.timeout is not None and seconds > src.timeout:
+                src.slow += 1
+
+    def resolve(self, *args, exclude=(), failed=None):
+        for src in self._order:
+            if not src.enabled or src.name in exclude:
+                continue
+            started = time.perf_counter()
+            try:
+                result = src.lookup(*args, timeout=src.timeout)
+            except Miss:
+                self.record(src.name, MISS, time.perf_counter() - started)
+                raise
+            except Unavailable:
+                self.record(src.name, SKIPPED, time.perf_counter() - started)
+                if failed is not None:
+                    failed.append(src.name)
+                continue
+            except (TimeoutError, FutureTimeout):
+                self.record(src.name, TIMEOUT, time.perf_counter() - started)
+                if failed is not None:
+                    failed.append(src.name)
+                continue
+            except Exception as ex:
+                self.record(src.name, ERROR, time.perf_counter() - started)
+                if failed is not None:
+                    failed.append(src.name)
+                if self.on_error is not None:
+                    self.on_error(src.name, args, ex)
+                continue
+            if result is None:
+                self.record(src.name, MISS, time.perf_counter() - started)
+                continue
+            self.record(src.name, HIT, time.perf_counter() - started)
+            return src.name, result
+        return None, None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "name": self.name,
+                "order": self.order(),
+                "sources": {
+                    s.name: {
+                        "priority": s.priority,
+                        "timeout": s.timeout,
+                        "enabled": s.enabled,
+                        "calls": s.calls,
+                        "hits": s.hits,
+                        "misses": s.misses,
+                        "errors": s.errors,
+                        "timeouts": s.timeouts,
+                        "skipped": s.skipped,
+                        "slow": s.slow,
+                        "avg_ms": round(1000.0 * s.seconds / s.calls, 3) if s.calls else None,
+                    }
+                    for s in self._order
+                },
+            }
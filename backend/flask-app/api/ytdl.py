@@ -9,9 +9,13 @@ from flask import Blueprint, request, jsonify, send_file, after_this_request, cu
 from pytube import YouTube
 
 from .utils import normalize_yt_url, human_size, sanitize_filename
+from .ratelimit import RateLimiter, rate_limit
 
 ytdl_bp = Blueprint("ytdl", __name__)
 
+# Per-IP limits: extraction and downloads are expensive (yt-dlp subprocesses)
+_YTDL_LIMITER = RateLimiter("ytdl", max_requests=20, window=60)
+
 # Paths
 APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DOWNLOADS_DIR = os.path.join(APP_DIR, "downloads")
@@ -302,6 +306,7 @@ def ytdlp_download(url: str, format_id: str, dl_type: str):
 
 # ---------- Routes ----------
 @ytdl_bp.get("/api/ytdl/info")
+@rate_limit(_YTDL_LIMITER)
 def ytdl_info():
     """
     Query: ?url=YOUTUBE_URL
@@ -435,6 +440,7 @@ def ytdl_info():
 
 
 @ytdl_bp.post("/api/ytdl/download")
+@rate_limit(_YTDL_LIMITER)
 def ytdl_download_endpoint():
     """
     Body (JSON): { "url": "...", "itag": 123, "type": "video" | "audio" }
@@ -21,15 +21,49 @@ except Exception:
 
 # Import feature blueprints
 from api import health_bp, library_bp, kbbi_bp, ytdl_bp  # noqa: E402
+from api.kbbi import kbbi_warm_up, kbbi_preload, kbbi_watch  # noqa: E402
 
-app = Flask(__name__)
-CORS(app, resources={r"/api/*": {"origins": "*"}})
 
-# Register blueprints (routes remain exactly the same)
-app.register_blueprint(health_bp)
-app.register_blueprint(library_bp)
-app.register_blueprint(kbbi_bp)
-app.register_blueprint(ytdl_bp)
+def create_app(warm_up=None, preload=None):
+    """
+    Application factory. With warm_up (default: env KBBI_WARMUP, on unless
+    0/false/no) the KBBI indices are built in a background thread at boot and
+    /api/health reports 503 until they are ready. Set KBBI_WATCH_INTERVAL to
+    reindex changed KBBI shards automatically.
+
+    With preload (default: env KBBI_PRELOAD, off) the indices are built
+    synchronously and frozen before returning, for servers that fork workers
+    after importing the app (gunicorn --preload): the workers share one copy.
+    No watcher thread is started then, since it would not survive the fork;
+    gunicorn.conf.py calls kbbi_watch(app) from its post_fork hook.
+    """
+    app = Flask(__name__)
+    CORS(app, resources={r"/api/*": {"origins": "*"}})
+
+    # Register blueprints (routes remain exactly the same)
+    app.register_blueprint(health_bp)
+    app.register_blueprint(library_bp)
+    app.register_blueprint(kbbi_bp)
+    app.register_blueprint(ytdl_bp)
+
+    if preload is None:
+        preload = os.environ.get("KBBI_PRELOAD", "0") not in ("0", "false", "no", "")
+    if preload:
+        kbbi_preload(app)
+        return app
+    if warm_up is None:
+        warm_up = os.environ.get("KBBI_WARMUP", "1") not in ("0", "false", "no", "")
+    if warm_up:
+        kbbi_warm_up(app)
+    # Optional shard watcher (env KBBI_WATCH_INTERVAL, seconds)
+    kbbi_watch(app)
+    return app
+
+
+# KBBI shard pool workers (forkserver/spawn) import this file again as
+# __mp_main__; they only run index jobs, so no app is created there.
+if __name__ != "__mp_main__":
+    app = create_app()
 
 
 if __name__ == "__main__":
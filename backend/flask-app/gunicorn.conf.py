@@ -0,0 +1,24 @@
+"""
+Gunicorn settings:  gunicorn -c gunicorn.conf.py app:app   (from backend/flask-app)
+
+The app is imported once in the master with KBBI_PRELOAD on, so the KBBI
+indices are built before the workers fork and shared copy-on-write (see
+kbbi_preload). Threads do not survive a fork, so the shard watcher
+(KBBI_WATCH_INTERVAL) is started in every worker by post_fork.
+"""
+
+import os
+
+os.environ.setdefault("KBBI_PRELOAD", "1")
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("GUNICORN_WORKERS", 2))
+preload_app = True
+
+
+def post_fork(server, worker):
+    from app import app
+    from api.kbbi import kbbi_watch
+
+    if kbbi_watch(app) is not None:
+        server.log.info("worker %s: KBBI watcher started", worker.pid)
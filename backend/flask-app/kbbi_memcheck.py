@@ -0,0 +1,83 @@
+"""
+Per-worker memory of the KBBI indices, with and without preload (Linux only).
+
+    python kbbi_memcheck.py [preload|private] [workers] [requests]
+
+Forks `workers` processes the way gunicorn does and has each one serve
+`requests` rounds of cek/saran/sugesti/cari through the Flask test client,
+then prints Rss, Pss and Private_Dirty (MB, from /proc/<pid>/smaps_rollup)
+for every worker. With "preload" the indices are built in the parent first
+(kbbi_preload, as gunicorn.conf.py does); with "private" each worker builds
+its own. Pss is the figure to compare: shared pages count once per sharer.
+Uses the KBBI shards in data/, like the app.
+"""
+
+import os
+import sys
+import time
+
+os.environ["KBBI_WARMUP"] = "0"
+os.environ["KBBI_PRELOAD"] = "0"
+os.environ.setdefault("KBBI_RESOLVER_MODE", "local-only")
+
+from app import app  # noqa: E402
+from api.kbbi import kbbi_preload, kbbi_warm_up  # noqa: E402
+
+FIELDS = ("Rss", "Pss", "Private_Dirty")
+
+
+def smaps(pid):
+    out = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in FIELDS:
+                out[key] = int(value.split()[0]) // 1024
+    return out
+
+
+def serve(rounds):
+    client = app.test_client()
+    for i in range(rounds):
+        client.get(f"/api/kbbi/cek?kata=kata{i * 97 % 60000}")
+        client.get(f"/api/kbbi/saran?kata=kata{i}x&jarak=1")
+        client.get(f"/api/kbbi/sugesti?q=ka{i % 50}")
+        client.get("/api/kbbi/cari?q=rumah")
+
+
+def main(mode="preload", workers=2, rounds=300):
+    if mode == "preload":
+        started = time.time()
+        kbbi_preload(app)
+        print(f"parent: build {time.time() - started:.1f}s", smaps(os.getpid()))
+    children = []
+    for _ in range(workers):
+        r, w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(r)
+            if mode != "preload":
+                kbbi_warm_up(app, background=False)
+            serve(rounds)
+            os.write(w, b"x")
+            time.sleep(600)
+            os._exit(0)
+        os.close(w)
+        children.append((pid, r))
+    try:
+        for pid, r in children:
+            os.read(r, 1)
+        # measure only once every worker is done: Pss depends on who still shares
+        for pid, _ in children:
+            print(f"{mode} worker {pid}:", smaps(pid))
+    finally:
+        for pid, _ in children:
+            os.kill(pid, 9)
+            os.waitpid(pid, 0)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(args[0] if args else "preload",
+         int(args[1]) if len(args) > 1 else 2,
+         int(args[2]) if len(args) > 2 else 300)
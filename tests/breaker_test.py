@@ -0,0 +1,196 @@
+import os
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait as futures_wait
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "flask-app"))
+
+from api.breaker import CircuitBreaker, BreakerOpen, CLOSED, OPEN, HALF_OPEN
+from api.cache import SingleFlight
+
+
+def _fail():
+    raise ConnectionError("upstream down")
+
+
+def test_breaker_transitions():
+    br = CircuitBreaker("t", failure_threshold=2, reset_timeout=0.05)
+    assert br.state == CLOSED and br.allow()
+    br.record_failure()
+    assert br.state == CLOSED
+    br.record_failure()
+    assert br.state == OPEN and br.trips == 1
+    assert not br.allow() and br.rejected == 1
+    time.sleep(0.06)
+    assert br.state == HALF_OPEN
+    assert br.allow()          # the probe
+    assert not br.allow()      # only one probe at a time
+    br.record_success()
+    assert br.state == CLOSED and br.allow()
+    # a failed probe re-opens immediately
+    br.record_failure()
+    br.record_failure()
+    time.sleep(0.06)
+    assert br.allow()
+    br.record_failure()
+    assert br.state == OPEN and br.trips == 3
+
+
+def test_breaker_check_without_reserve():
+    br = CircuitBreaker("t", failure_threshold=1, reset_timeout=0.05)
+    br.record_failure()
+    assert not br.allow(reserve=False)
+    time.sleep(0.06)
+    assert br.allow(reserve=False) and br.allow(reserve=False)
+    assert br.allow()
+    assert not br.allow(reserve=False)
+
+
+def test_call_outcomes():
+    br = CircuitBreaker("t", failure_threshold=1, reset_timeout=60)
+    assert br.call(lambda: 42) == 42 and br.successes == 1
+    # a definite answer raised by the upstream counts as healthy
+    try:
+        br.call(lambda: {}["x"], ok=(KeyError,))
+    except KeyError:
+        pass
+    assert br.successes == 2 and br.failures == 0
+    try:
+        br.call(_fail)
+    except ConnectionError:
+        pass
+    assert br.failures == 1 and br.state == OPEN
+    try:
+        br.call(lambda: 1)
+        assert False, "expected BreakerOpen"
+    except BreakerOpen:
+        pass
+
+
+def test_coalesced_failure_counts_once():
+    br = CircuitBreaker("t", failure_threshold=5, reset_timeout=60)
+    flight = SingleFlight(failure_backoff=2.0)
+    gate = threading.Barrier(6)
+
+    def upstream():
+        time.sleep(0.1)
+        _fail()
+
+    def caller():
+        gate.wait()
+        try:
+            flight.do("kata", lambda: br.call(upstream, deadline=1.0))
+        except ConnectionError:
+            pass
+
+    threads = [threading.Thread(target=caller) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert br.failures == 1, br.stats()
+    assert br.state == CLOSED
+
+
+def test_queue_wait_is_not_a_timeout():
+    br = CircuitBreaker("t", failure_threshold=3, reset_timeout=60)
+    pool = ThreadPoolExecutor(max_workers=1)
+    try:
+        # each call takes 30ms against a 100ms deadline; the last one waits ~300ms in the queue
+        futs = [pool.submit(br.call, lambda: time.sleep(0.03), 0.1) for _ in range(10)]
+        futures_wait(futs)
+    finally:
+        pool.shutdown()
+    assert br.failures == 0 and br.successes == 10, br.stats()
+
+
+def test_hanging_call_fails_at_deadline():
+    br = CircuitBreaker("t", failure_threshold=1, reset_timeout=60)
+    release = threading.Event()
+    t = threading.Thread(target=lambda: br.call(release.wait, deadline=0.05))
+    t.start()
+    time.sleep(0.2)
+    # recorded while the call is still hanging
+    assert t.is_alive()
+    assert br.failures == 1 and br.timeouts == 1 and br.state == OPEN
+    release.set()
+    t.join()
+    # the late return is not recorded a second time
+    assert br.failures == 1 and br.successes == 0
+
+
+def test_deadlines_share_one_thread():
+    br = CircuitBreaker("t", failure_threshold=100, reset_timeout=60)
+    release = threading.Event()
+    threads = [threading.Thread(target=lambda: br.call(release.wait, deadline=0.05)) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for _ in range(50):
+        br.call(lambda: None, deadline=5.0)
+    checkers = [t for t in threading.enumerate() if t.name == "breaker-deadlines"]
+    assert len(checkers) == 1
+    assert not any(isinstance(t, threading.Timer) for t in threading.enumerate())
+    time.sleep(0.2)
+    assert br.timeouts == 20 and br.successes == 50
+    release.set()
+    for t in threads:
+        t.join()
+    assert br.timeouts == 20 and br.successes == 50
+
+
+def test_kbbi_online_coalesced_and_bounded():
+    import api.kbbi as K
+
+    saved = (K._kbbi_online_payload, K._KBBI_ONLINE_BREAKER, K._KBBI_ONLINE_FLIGHT, K._KBBI_ONLINE_QUEUE_MAX)
+    release = threading.Event()
+
+    def payload(kata):
+        if kata == "hang":
+            release.wait()
+            return {"kata": kata}
+        time.sleep(0.1)
+        _fail()
+
+    try:
+        K._kbbi_online_payload = payload
+        K._KBBI_ONLINE_BREAKER = CircuitBreaker("kbbi-online", failure_threshold=5, reset_timeout=60)
+        K._KBBI_ONLINE_FLIGHT = SingleFlight(failure_backoff=2.0)
+        # one failing upstream call shared by 6 callers is one failure
+        futs = [K._kbbi_online_submit("rusak", "rusak") for _ in range(6)]
+        futures_wait(futs)
+        assert K._KBBI_ONLINE_BREAKER.failures == 1, K._KBBI_ONLINE_BREAKER.stats()
+
+        # the pool takes at most workers + queue_max calls; the rest are rejected
+        K._KBBI_ONLINE_QUEUE_MAX = 2
+        limit = K._KBBI_ONLINE_WORKERS + 2
+        rejected = K._kbbi_online_pool_stats()["rejected"]
+        futs = [K._kbbi_online_submit("hang", "hang") for _ in range(limit)]
+        assert all(f is not None for f in futs)
+        assert K._kbbi_online_submit("hang", "hang") is None
+        assert K._kbbi_online_pool_stats()["rejected"] == rejected + 1
+        release.set()
+        futures_wait(futs)
+        time.sleep(0.05)
+        assert K._kbbi_online_pool_stats()["in_flight"] == 0
+    finally:
+        release.set()
+        K._kbbi_online_payload, K._KBBI_ONLINE_BREAKER, K._KBBI_ONLINE_FLIGHT, K._KBBI_ONLINE_QUEUE_MAX = saved
+
+
+if __name__ == "__main__":
+    for test in (
+        test_breaker_transitions,
+        test_breaker_check_without_reserve,
+        test_call_outcomes,
+        test_coalesced_failure_counts_once,
+        test_queue_wait_is_not_a_timeout,
+        test_hanging_call_fails_at_deadline,
+        test_deadlines_share_one_thread,
+        test_kbbi_online_coalesced_and_bounded,
+    ):
+        try:
+            test()
+            print(f"{test.__name__}: OK")
+        except AssertionError as e:
+            print(f"{test.__name__}: FAIL:", e)
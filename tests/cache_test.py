@@ -0,0 +1,183 @@
+import os
+import sys
+import time
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "flask-app"))
+
+from api.cache import TTLCache, PersistentCache, SingleFlight
+
+
+def test_ttlcache_evicts_lru_by_count():
+    c = TTLCache(max_entries=3, max_bytes=0, sweep_interval=0)
+    for k in "abc":
+        c.set(k, k)
+    assert c.get("a") == "a"  # a is now the most recently used
+    c.set("d", "d")
+    assert c.get("b") is None and [c.get(k) for k in "acd"] == ["a", "c", "d"]
+    assert len(c) == 3 and c.evictions == 1
+
+
+def test_ttlcache_evicts_by_bytes():
+    c = TTLCache(max_entries=100, max_bytes=100, sweep_interval=0, sizer=len)
+    c.set("a", "x" * 40)
+    c.set("b", "x" * 40)
+    c.set("c", "x" * 40)  # 120 bytes: a goes
+    assert c.get("a") is None and c.stats()["bytes"] == 80
+    c.set("b", "x" * 10)  # replacing an entry releases its old size
+    assert c.stats()["bytes"] == 50 and c.evictions == 1
+    c.set("huge", "x" * 101)  # larger than the whole budget: not cached, nothing evicted
+    assert c.get("huge") is None and len(c) == 2 and c.evictions == 1
+    c.delete("c")
+    assert c.stats()["bytes"] == 10
+
+
+def test_ttlcache_expires():
+    c = TTLCache(ttl=0.05, sweep_interval=0)
+    c.set("a", 1)
+    c.set("b", 2, ttl=10)
+    c.set("c", 3)
+    assert c.get("a") == 1
+    time.sleep(0.06)
+    assert c.get("a") is None and c.expirations == 1
+    assert c.sweep() == 1 and len(c) == 1  # c expired unread
+    assert c.get("b") == 2
+    s = c.stats()
+    assert s["hits"] == 2 and s["misses"] == 1 and s["expirations"] == 2
+
+
+def _concurrently(n, fn):
+    gate = threading.Barrier(n)
+    out = [None] * n
+
+    def run(i):
+        gate.wait()
+        try:
+            out[i] = fn()
+        except Exception as e:
+            out[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return out
+
+
+def test_singleflight_coalesces():
+    sf = SingleFlight()
+    runs = []
+
+    def slow():
+        runs.append(1)
+        time.sleep(0.1)
+        return {"kata": "pijar"}
+
+    out = _concurrently(8, lambda: sf.do("pijar", slow))
+    assert len(runs) == 1 and all(r is out[0] for r in out)
+    st = sf.stats()
+    assert st["calls"] == 1 and st["coalesced"] == 7 and st["in_flight"] == 0
+    # finished calls are not cached: the next call runs again
+    sf.do("pijar", slow)
+    assert len(runs) == 2
+    # other keys are independent
+    assert sf.do("rumah", lambda: "rumah") == "rumah"
+
+
+def test_singleflight_failure_backoff():
+    sf = SingleFlight(failure_backoff=0.1)
+    runs = []
+
+    def failing():
+        runs.append(1)
+        time.sleep(0.05)
+        raise ConnectionError("upstream down")
+
+    out = _concurrently(4, lambda: sf.do("pijar", failing))
+    assert len(runs) == 1 and all(isinstance(e, ConnectionError) for e in out)
+    # within the backoff the failure is replayed without calling fn
+    try:
+        sf.do("pijar", failing)
+        assert False, "expected ConnectionError"
+    except ConnectionError:
+        pass
+    assert len(runs) == 1 and sf.stats()["backoff_hits"] == 1
+    time.sleep(0.11)
+    assert sf.do("pijar", lambda: "ok") == "ok"
+    # forget() clears a remembered failure early
+    _concurrently(1, lambda: sf.do("rumah", failing))
+    sf.forget("rumah")
+    assert sf.do("rumah", lambda: "ok") == "ok"
+
+
+def test_singleflight_without_backoff():
+    sf = SingleFlight(failure_backoff=0)
+    try:
+        sf.do("pijar", lambda: {}["x"])
+    except KeyError:
+        pass
+    assert sf.do("pijar", lambda: 1) == 1
+
+
+def _persistent(d, ttl):
+    return PersistentCache(os.path.join(d, "c.sqlite3"), ttl=ttl, compact_interval=0)
+
+
+def _age(pc, key, seconds):
+    pc._conn().execute("UPDATE cache SET ts = ts - ? WHERE k = ?", (seconds, key))
+
+
+def test_persistent_get_with_ts():
+    with tempfile.TemporaryDirectory() as d:
+        pc = _persistent(d, ttl=60)
+        before = time.time()
+        pc.set("pijar", {"valid": True}, "kbbi-worddb")
+        value, ts = pc.get("pijar", with_ts=True)
+        assert value == {"valid": True} and before <= ts <= time.time()
+        text, _ = pc.get("pijar", raw=True, with_ts=True)
+        assert text == '{"valid":true}'
+        _age(pc, "pijar", 61)
+        assert pc.get("pijar", with_ts=True) is None
+
+
+def test_promotion_keeps_remaining_ttl():
+    import api.kbbi as K
+
+    saved = (K._KBBI_PERSISTENT, K._KBBI_CACHE)
+    with tempfile.TemporaryDirectory() as d:
+        try:
+            K._KBBI_PERSISTENT = _persistent(d, ttl=100)
+            K._KBBI_CACHE = TTLCache(ttl=100, sweep_interval=0)
+            K._KBBI_PERSISTENT.set("pijar", {"valid": True})
+            _age(K._KBBI_PERSISTENT, "pijar", 90)
+            assert K._kbbi_cache_get("pijar") is not None
+            expires = K._KBBI_CACHE._data["pijar"][0]
+            # 10s left in the persistent tier, not a fresh 100s in memory
+            assert expires - time.time() <= 10.5, expires - time.time()
+            # the memory tier's own TTL still bounds a younger row
+            K._KBBI_CACHE = TTLCache(ttl=5, sweep_interval=0)
+            K._KBBI_PERSISTENT.set("rumah", {"valid": True})
+            K._kbbi_cache_get("rumah")
+            assert K._KBBI_CACHE._data["rumah"][0] - time.time() <= 5.5
+        finally:
+            K._KBBI_PERSISTENT, K._KBBI_CACHE = saved
+
+
+if __name__ == "__main__":
+    for test in (
+        test_ttlcache_evicts_lru_by_count,
+        test_ttlcache_evicts_by_bytes,
+        test_ttlcache_expires,
+        test_singleflight_coalesces,
+        test_singleflight_failure_backoff,
+        test_singleflight_without_backoff,
+        test_persistent_get_with_ts,
+        test_promotion_keeps_remaining_ttl,
+    ):
+        try:
+            test()
+            print(f"{test.__name__}: OK")
+        except AssertionError as e:
+            print(f"{test.__name__}: FAIL:", e)
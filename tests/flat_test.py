@@ -0,0 +1,63 @@
+import os
+import sys
+import pickle
+from bisect import bisect_left
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "flask-app"))
+
+from api.flat import FlatStrings, FlatMap
+
+WORDS = sorted({"rumah", "ramah", "kerja", "bekerja", "ça", "élan", "nyala", "a", "", "kata-kata", "rumah’nya"})
+
+
+def test_strings_round_trip():
+    fs = FlatStrings(WORDS)
+    assert len(fs) == len(WORDS)
+    assert list(fs) == WORDS
+    assert [fs[i] for i in range(len(fs))] == WORDS
+    assert fs[-1] == WORDS[-1] and fs[2:5] == WORDS[2:5]
+    try:
+        fs[len(WORDS)]
+        assert False, "IndexError not raised"
+    except IndexError:
+        pass
+    assert fs == FlatStrings(WORDS) and hash(fs) == hash(FlatStrings(WORDS))
+    assert fs != FlatStrings(WORDS[:-1])
+    assert pickle.loads(pickle.dumps(fs)) == fs
+    assert len(FlatStrings()) == 0 and list(FlatStrings()) == []
+
+
+def test_strings_bisect_and_find():
+    fs = FlatStrings(WORDS)
+    # byte order of UTF-8 equals str order, also past ASCII
+    for probe in WORDS + ["rum", "zzz", "b", "é", "rumah0"]:
+        assert bisect_left(fs, probe) == bisect_left(WORDS, probe), probe
+    for i, w in enumerate(WORDS):
+        assert fs.find(w) == i
+    assert fs.find("rum") == -1 and fs.find("zzz") == -1
+    assert fs.nbytes() == len("".join(WORDS).encode("utf-8")) + 8 * (len(WORDS) + 1)
+
+
+def test_map_last_value_wins():
+    fm = FlatMap([("rumah", 1), ("kata", 2), ("élan", 3), ("rumah", 4)])
+    assert len(fm) == 3
+    assert list(fm.items()) == [("kata", 2), ("rumah", 4), ("élan", 3)]
+    assert fm.get("rumah") == 4 and fm.get("élan") == 3
+    assert fm.get("rum") is None and fm.get("rum", 0) == 0
+    assert "kata" in fm and "kat" not in fm
+    small = FlatMap({"a": 7}.items(), typecode="I")
+    assert small.get("a") == 7 and small.values.typecode == "I"
+    assert len(FlatMap()) == 0 and FlatMap().get("a") is None
+
+
+if __name__ == "__main__":
+    for test in (
+        test_strings_round_trip,
+        test_strings_bisect_and_find,
+        test_map_last_value_wins,
+    ):
+        try:
+            test()
+            print(f"{test.__name__}: OK")
+        except AssertionError as e:
+            print(f"{test.__name__}: FAIL:", e)
@@ -0,0 +1,90 @@
+import os
+import sys
+import time
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "flask-app"))
+
+from api.indexset import IndexSet
+from api.kbbi_index import compile_index, open_index
+
+
+def test_parts_built_once_from_the_same_generation():
+    calls = []
+    makers = {
+        "base": lambda s: calls.append("base") or {"gen": s.generation},
+        "derived": lambda s: calls.append("derived") or [s.get("base")["gen"]],
+    }
+    live = IndexSet(makers, generation=1)
+    assert live.get("derived") == [1] and live.get("derived") is live.get("derived")
+    assert calls == ["derived", "base"] and live.peek("base") == {"gen": 1}
+    st = live.stats()
+    assert st["loaded"] == ["base", "derived"] and st["generation"] == 1
+    assert st["builds"]["base"]["size"] == 1
+    # hot swap: a reader holding the old set keeps its parts
+    fresh = IndexSet(makers, generation=2).build_all()
+    old, live = live, fresh
+    assert old.get("derived") == [1] and live.get("derived") == [2]
+
+
+def test_shared_lock_serializes_builders():
+    lock = threading.RLock()
+    active, seen = [0], []
+
+    def slow(s):
+        active[0] += 1
+        seen.append(active[0])
+        time.sleep(0.05)
+        active[0] -= 1
+        return [s.generation]
+
+    sets = [IndexSet({"p": slow}, generation=g, lock=lock) for g in range(4)]
+    threads = [threading.Thread(target=s.get, args=("p",)) for s in sets]
+    for t in threads:
+        t.start()
+    time.sleep(0.01)
+    # stats() does not wait for the build in progress
+    started = time.perf_counter()
+    assert sets[0].stats()["generation"] == 0
+    assert time.perf_counter() - started < 0.03  # each build holds the lock for 50ms
+    for t in threads:
+        t.join()
+    assert seen == [1, 1, 1, 1]
+
+
+def test_concurrent_compiles_of_one_path():
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "kbbi_index.bin")
+        idx = {"kata%d" % i: {"lema": ["kata%d" % i], "definisi": ["arti"] * 20} for i in range(2000)}
+        errors = []
+
+        def build(n):
+            try:
+                compile_index(idx, path, {"builder": n})
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=build, args=(n,)) for n in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert errors == []
+        ci = open_index(path)
+        assert ci is not None and len(ci) == len(idx) and ci.meta["builder"] in range(6)
+        ci.close()
+        assert os.listdir(d) == ["kbbi_index.bin"]  # no temporary files left behind
+
+
+if __name__ == "__main__":
+    for test in (
+        test_parts_built_once_from_the_same_generation,
+        test_shared_lock_serializes_builders,
+        test_concurrent_compiles_of_one_path,
+    ):
+        try:
+            test()
+            print(f"{test.__name__}: OK")
+        except AssertionError as e:
+            print(f"{test.__name__}: FAIL:", e)
@@ -0,0 +1,73 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "flask-app"))
+
+from api.kbbi_graph import RelationGraph, SINONIM, ANTONIM
+
+RELATIONS = [
+    ("Besar", "agung", SINONIM),
+    ("besar", "raya", SINONIM),
+    ("besar", "kecil", ANTONIM),
+    ("agung", "mulia", SINONIM),
+    ("raya", "besar", SINONIM),   # duplicate of the reverse edge
+    ("kecil", "mungil", SINONIM),
+    ("besar", "besar", SINONIM),  # self loops are dropped
+    ("besar", "", SINONIM),
+    ("besar", None, ANTONIM),
+]
+
+
+def _graph():
+    g = RelationGraph()
+    for a, b, kind in RELATIONS:
+        g.add(a, b, kind)
+    return g.freeze()
+
+
+def _names(g, pairs):
+    return sorted((g.keys[n], k) for n, k in pairs)
+
+
+def test_csr_neighbors_are_symmetric_and_deduplicated():
+    g = _graph()
+    assert len(g) == 6 and g.edge_count() == 10
+    besar = g.find("  BESAR ")
+    assert g.display[besar] == "Besar"  # first spelling seen
+    assert _names(g, g.neighbors(besar)) == [("agung", SINONIM), ("kecil", ANTONIM), ("raya", SINONIM)]
+    assert _names(g, g.neighbors(g.find("mulia"))) == [("agung", SINONIM)]
+    # offsets slice targets/kinds per node and cover every edge exactly once
+    assert g.offsets[0] == 0 and g.offsets[-1] == len(g.targets) == len(g.kinds)
+    assert all(g.offsets[i] <= g.offsets[i + 1] for i in range(len(g)))
+    for n in range(len(g)):
+        for m, kind in g.neighbors(n):
+            assert (n, kind) in g.neighbors(m)
+    assert g.find("tidakada") is None and g.find(None) is None
+
+
+def test_bfs_depth_kinds_and_limit():
+    g = _graph()
+    found, truncated = g.bfs("besar", depth=1)
+    assert not truncated
+    assert sorted(found) == [("agung", 1, "sinonim", "Besar"), ("kecil", 1, "antonim", "Besar"),
+                             ("raya", 1, "sinonim", "Besar")]
+    found, _ = g.bfs("besar", depth=2, kinds=(SINONIM,))
+    assert sorted((w, d) for w, d, _, _ in found) == [("agung", 1), ("mulia", 2), ("raya", 1)]
+    found, _ = g.bfs("besar", depth=3)
+    assert [d for _, d, _, _ in found] == sorted(d for _, d, _, _ in found)  # nearest first
+    assert ("mungil", 2, "sinonim", "kecil") in found
+    found, truncated = g.bfs("besar", depth=3, limit=2)
+    assert len(found) == 2 and truncated
+    assert g.bfs("tidakada") is None
+
+
+if __name__ == "__main__":
+    for test in (
+        test_csr_neighbors_are_symmetric_and_deduplicated,
+        test_bfs_depth_kinds_and_limit,
+    ):
+        try:
+            test()
+            print(f"{test.__name__}: OK")
+        except AssertionError as e:
+            print(f"{test.__name__}: FAIL:", e)
@@ -0,0 +1,120 @@
+import os
+import sys
+import struct
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "flask-app"))
+
+from api.kbbi_index import compile_index, open_index, update_meta, CompiledIndex
+
+IDX = {
+    "pijar": {"lema": ["pi·jar"], "definisi": ["[n] bara; nyala"]},
+    "rumah": {"lema": ["ru·mah"], "definisi": ["[n] bangunan untuk tempat tinggal"]},
+    "énak": {"lema": ["énak"], "definisi": []},
+    "anak-anak": {"lema": ["anak-anak"], "definisi": ["[n] anak yang masih kecil"]},
+}
+META = {"sources": [["kbbi_v_part0.json", 123, 456]]}
+
+
+def _compiled(d, idx=IDX, meta=META):
+    return compile_index(idx, os.path.join(d, "kbbi_index.bin"), meta)
+
+
+def test_round_trip():
+    with tempfile.TemporaryDirectory() as d:
+        ci = open_index(_compiled(d), META["sources"])
+        try:
+            assert len(ci) == len(IDX) and ci.meta == META
+            assert list(ci.keys()) == sorted(IDX, key=lambda k: k.encode("utf-8"))
+            for k, v in IDX.items():
+                assert k in ci and ci.get(k) == v and ci[k] == v
+            assert dict(ci.items()) == IDX
+            assert ci.get("tidakada") is None and "" not in ci and None not in ci
+        finally:
+            ci.close()
+
+
+def test_empty_index():
+    with tempfile.TemporaryDirectory() as d:
+        ci = open_index(_compiled(d, {}, {}))
+        assert ci is not None and len(ci) == 0 and list(ci.keys()) == [] and ci.get("pijar") is None
+        ci.close()
+
+
+def test_stale_or_missing():
+    with tempfile.TemporaryDirectory() as d:
+        path = _compiled(d)
+        assert open_index(path, [["kbbi_v_part0.json", 123, 999]]) is None
+        assert open_index(os.path.join(d, "tidakada.bin")) is None
+
+
+def test_torn_file_is_rejected():
+    with tempfile.TemporaryDirectory() as d:
+        path = _compiled(d)
+        with open(path, "rb") as f:
+            data = f.read()
+        # cut anywhere: inside the header, the tables, the blobs or the meta
+        for size in (0, 10, 80, 120, len(data) // 2, len(data) - 1):
+            with open(path, "wb") as f:
+                f.write(data[:size])
+            assert open_index(path) is None, size
+        # trailing garbage
+        with open(path, "wb") as f:
+            f.write(data + b"\0" * 16)
+        assert open_index(path) is None
+
+
+def test_corrupt_header_is_rejected():
+    with tempfile.TemporaryDirectory() as d:
+        path = _compiled(d)
+        with open(path, "rb") as f:
+            data = bytearray(f.read())
+        for offset, value in ((0, b"XXXXXXXX"), (8, struct.pack("<I", 2)), (12, struct.pack("<I", 1000))):
+            bad = bytearray(data)
+            bad[offset:offset + len(value)] = value
+            with open(path, "wb") as f:
+                f.write(bad)
+            assert open_index(path) is None, offset
+        try:
+            CompiledIndex(path)
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+
+def test_update_meta_keeps_entries():
+    with tempfile.TemporaryDirectory() as d:
+        path = _compiled(d)
+        update_meta(path, {"sources": "baru", "catatan": "ü" * 100})
+        ci = open_index(path, "baru")
+        assert ci is not None and dict(ci.items()) == IDX and ci.meta["catatan"] == "ü" * 100
+        ci.close()
+        assert sorted(os.listdir(d)) == ["kbbi_index.bin"]
+
+
+def test_replace_while_open():
+    with tempfile.TemporaryDirectory() as d:
+        old = open_index(_compiled(d))
+        _compiled(d, {"baru": {"lema": ["baru"], "definisi": []}})
+        new = open_index(os.path.join(d, "kbbi_index.bin"))
+        # the old mapping keeps serving the replaced file
+        assert old.get("pijar") == IDX["pijar"] and "pijar" not in new and "baru" in new
+        old.close()
+        new.close()
+
+
+if __name__ == "__main__":
+    for test in (
+        test_round_trip,
+        test_empty_index,
+        test_stale_or_missing,
+        test_torn_file_is_rejected,
+        test_corrupt_header_is_rejected,
+        test_update_meta_keeps_entries,
+        test_replace_while_open,
+    ):
+        try:
+            test()
+            print(f"{test.__name__}: OK")
+        except AssertionError as e:
+            print(f"{test.__name__}: FAIL:", e)
@@ -0,0 +1,64 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "flask-app"))
+
+from api.kbbi_suggest import PrefixIndex
+from api.kbbi_morph import MorphIndex, root_candidates
+
+# roots only: every derived form below has to be analysed, not looked up
+VOCAB = ("pijar", "kerja", "rumah", "nyala", "pukul", "baik", "tahu", "ajar", "sapu")
+
+
+def _index(vocab=VOCAB):
+    px = PrefixIndex()
+    for w in vocab:
+        px.add(w)
+    return MorphIndex(px.freeze())
+
+
+def test_root_candidates():
+    roots = [r for r, _ in root_candidates("menyalakan")]
+    assert "nyala" in roots and "sala" in roots
+    assert ("kerja", ("be",)) in list(root_candidates("bekerja"))
+
+
+def test_derived_forms_of_roots():
+    m = _index()
+    assert m.roots("berpijar") == [("pijar", "pijar", ["ber"])]
+    assert m.roots("perumahan") == [("rumah", "rumah", ["pe", "an"])]
+    assert m.roots("menyalakan") == [("nyala", "nyala", ["meny", "kan"])]
+    assert m.roots("bekerja") == [("kerja", "kerja", ["be"])]
+    assert m.roots("dinyalakan") == [("nyala", "nyala", ["di", "kan"])]
+    for w in ("rumahnya", "berpijarlah", "dinyalakannya", "memukul", "dipukul", "pekerja", "belajar",
+              "pelajar", "menyapu", "memperbaiki", "diperbaiki", "mengetahui"):
+        assert m.attested(w), w
+
+
+def test_wrong_allomorphs():
+    m = _index()
+    # stripping alone would accept all of these
+    for w in ("berkerja", "mempijar", "mempukul", "mengkerja", "mensapu", "mentahu"):
+        assert not m.attested(w), w
+        assert m.roots(w) == [], w
+
+
+def test_least_stripped_root_first():
+    m = _index(VOCAB + ("menyala",))
+    # the vocabulary word menyala, not nyala
+    assert m.roots("menyalakan") == [("menyala", "menyala", ["kan"])]
+    assert m.roots("rumahnya") == [("rumah", "rumah", ["nya"])]
+
+
+if __name__ == "__main__":
+    for test in (
+        test_root_candidates,
+        test_derived_forms_of_roots,
+        test_wrong_allomorphs,
+        test_least_stripped_root_first,
+    ):
+        try:
+            test()
+            print(f"{test.__name__}: OK")
+        except AssertionError as e:
+            print(f"{test.__name__}: FAIL:", e)
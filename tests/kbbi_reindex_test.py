@@ -0,0 +1,131 @@
+import os
+import sys
+import json
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "flask-app"))
+
+import api.kbbi as K
+from api.kbbi_index import open_index
+
+
+def _part(*words):
+    return json.dumps([{"entri": [
+        {"nama": w, "makna": [{"kelas": [{"kode": "n", "nama": "Nomina"}], "submakna": ["arti " + w]}]}
+        for w in words
+    ]}])
+
+
+class _Parts:
+    """
+    Part files in a temporary data dir, with the module pointed at it.
+    """
+
+    NAMES = ("KBBI_FILE_GLOB", "KBBI_INDEX_FILE", "KBBI_SHARD_INDEX_DIR", "_KBBI_LOAD_WORKERS", "_kbbi_parse_shard")
+
+    def __enter__(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.saved = {n: getattr(K, n) for n in self.NAMES}
+        K.KBBI_FILE_GLOB = os.path.join(self.dir, "kbbi_v_part*.json")
+        K.KBBI_INDEX_FILE = os.path.join(self.dir, "kbbi_index.bin")
+        K.KBBI_SHARD_INDEX_DIR = os.path.join(self.dir, "kbbi_index.d")
+        K._KBBI_LOAD_WORKERS = 1
+        return self
+
+    def __exit__(self, *exc):
+        for n, v in self.saved.items():
+            setattr(K, n, v)
+        self.tmp.cleanup()
+
+    def write(self, name, text, mtime_ns=None):
+        path = os.path.join(self.dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+        return path
+
+    def compile(self):
+        return K._kbbi_compile_index()
+
+    def shard_meta(self, name):
+        ci = open_index(os.path.join(K.KBBI_SHARD_INDEX_DIR, name + ".bin"))
+        try:
+            return ci.meta["shard"]
+        finally:
+            ci.close()
+
+
+def _current_index():
+    paths = sorted(K.glob.glob(K.KBBI_FILE_GLOB))
+    return open_index(K.KBBI_INDEX_FILE, K._kbbi_sources_signature(paths))
+
+
+def test_only_changed_shards_are_rebuilt():
+    with _Parts() as p:
+        p.write("kbbi_v_part1.json", _part("pijar", "rumah"))
+        p.write("kbbi_v_part2.json", _part("nyala"))
+        out = p.compile()
+        assert out["rebuilt"] == ["kbbi_v_part1.json", "kbbi_v_part2.json"] and out["entries"] == 3
+        assert p.compile()["rebuilt"] == []
+        # same size, different content: the hash catches it
+        p.write("kbbi_v_part2.json", _part("kecil"))
+        out = p.compile()
+        assert out["rebuilt"] == ["kbbi_v_part2.json"]
+        ci = _current_index()
+        assert ci is not None and "kecil" in ci and "nyala" not in ci and "pijar" in ci
+        ci.close()
+        os.remove(os.path.join(p.dir, "kbbi_v_part2.json"))
+        p.compile()
+        assert K._KBBI_REINDEX["offline_index"]["removed"] == ["kbbi_v_part2.json"]
+
+
+def test_touched_shard_meta_is_refreshed():
+    with _Parts() as p:
+        p.write("kbbi_v_part1.json", _part("pijar"), mtime_ns=10 ** 18)
+        p.compile()
+        assert p.shard_meta("kbbi_v_part1.json")["mtime_ns"] == 10 ** 18
+        # touched, same bytes: reused, and the new mtime is stored so it is not hashed again
+        p.write("kbbi_v_part1.json", _part("pijar"), mtime_ns=2 * 10 ** 18)
+        assert p.compile()["rebuilt"] == []
+        assert p.shard_meta("kbbi_v_part1.json")["mtime_ns"] == 2 * 10 ** 18
+
+
+def test_failed_shard_is_retried():
+    with _Parts() as p:
+        p.write("kbbi_v_part1.json", _part("pijar"))
+        p.write("kbbi_v_part2.json", _part("nyala"))
+        parse = K._kbbi_parse_shard
+
+        def flaky(path, *args):
+            if path.endswith("part2.json"):
+                raise OSError("transient")
+            return parse(path, *args)
+
+        K._kbbi_parse_shard = flaky
+        out = p.compile()
+        assert out["rebuilt"] == ["kbbi_v_part1.json"] and out["entries"] == 1
+        assert K._KBBI_REINDEX["offline_index"]["failed"] == ["kbbi_v_part2.json"]
+        # no shard index under the current signature, and the merged index reads as stale
+        assert not os.path.exists(os.path.join(K.KBBI_SHARD_INDEX_DIR, "kbbi_v_part2.json.bin"))
+        assert _current_index() is None
+        K._kbbi_parse_shard = parse
+        out = p.compile()
+        assert out["rebuilt"] == ["kbbi_v_part2.json"] and out["entries"] == 2
+        ci = _current_index()
+        assert ci is not None and "nyala" in ci
+        ci.close()
+
+
+if __name__ == "__main__":
+    for test in (
+        test_only_changed_shards_are_rebuilt,
+        test_touched_shard_meta_is_refreshed,
+        test_failed_shard_is_retried,
+    ):
+        try:
+            test()
+            print(f"{test.__name__}: OK")
+        except AssertionError as e:
+            print(f"{test.__name__}: FAIL:", e)
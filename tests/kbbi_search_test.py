@@ -0,0 +1,83 @@
+import os
+import sys
+import math
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "flask-app"))
+
+from api.kbbi_suggest import PrefixIndex
+from api.kbbi_search import SearchIndex, tokenize
+
+DEFS = {
+    "rumah": ["[n] bangunan untuk tempat tinggal", "keluarga; rumah tangga"],
+    "gedung": ["[n] bangunan tembok yang besar"],
+    "pondok": ["[n] bangunan untuk tempat sementara", "rumah kecil, tempat tinggal di ladang"],
+    "air": ["[n] cairan jernih"],
+    "kosong": [],
+}
+
+
+def _index(defs=DEFS):
+    px = PrefixIndex()
+    for w in defs:
+        px.add(w)
+    px.freeze()
+    return SearchIndex(px, defs.get)
+
+
+def test_tokenize():
+    assert tokenize("[n] Bangunan untuk 2 tempat, dsb.") == ["bangunan", "tempat"]
+    assert tokenize("a b cd") == ["cd"]
+
+
+def test_bm25_ordering():
+    si = _index()
+    assert len(si) == 4  # "kosong" has no definition
+    total, hits = si.search("bangunan")
+    assert total == 3
+    # same term frequency everywhere: shorter documents rank higher (3, 6, 8 tokens)
+    assert [w for w, _, _ in hits] == ["gedung", "rumah", "pondok"]
+    assert hits[0][1] > hits[1][1] > hits[2][1]
+    # "tempat" twice outweighs the longer document
+    total, hits = si.search("tempat tinggal")
+    assert total == 2 and [w for w, _, _ in hits] == ["pondok", "rumah"]
+    # a rarer term weighs more
+    assert si.idf("tinggal") == si.idf("tempat") and si.idf("tembok") > si.idf("bangunan")
+    assert si.idf("tidakada") == 0.0
+    total, hits = si.search("tembok bangunan")
+    assert hits[0][0] == "gedung"
+
+
+def test_bm25_score_formula():
+    si = _index()
+    scores = si.score(["cairan"])
+    wid = si.words.keys.find("air")
+    idf = math.log(1.0 + (4 - 1 + 0.5) / 1.5)
+    norm = 1.2 * (1.0 - 0.75 + 0.75 * 2 / si.avg_len)
+    assert list(scores) == [wid]
+    assert abs(scores[wid] - idf * 2.2 / (1 + norm)) < 1e-9
+
+
+def test_paging_and_snippets():
+    si = _index()
+    total, page1 = si.search("bangunan", offset=0, limit=2)
+    total2, page2 = si.search("bangunan", offset=2, limit=2)
+    assert total == total2 == 3 and len(page1) == 2 and len(page2) == 1
+    assert [w for w, _, _ in page1 + page2] == [w for w, _, _ in si.search("bangunan")[1]]
+    # the snippet is the first definition mentioning a query term
+    assert dict((w, s) for w, _, s in si.search("ladang")[1]) == {"pondok": "rumah kecil, tempat tinggal di ladang"}
+    assert si.search("yang dan") == (0, [])  # stopwords only
+    assert si.search("zzz") == (0, [])
+
+
+if __name__ == "__main__":
+    for test in (
+        test_tokenize,
+        test_bm25_ordering,
+        test_bm25_score_formula,
+        test_paging_and_snippets,
+    ):
+        try:
+            test()
+            print(f"{test.__name__}: OK")
+        except AssertionError as e:
+            print(f"{test.__name__}: FAIL:", e)
@@ -0,0 +1,84 @@
+import io
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "flask-app"))
+
+from api.kbbi_stream import iter_json_values
+
+
+def _read(text, chunk_size=1 << 16):
+    stats = {}
+    return list(iter_json_values(io.StringIO(text), chunk_size, stats)), stats
+
+
+def _entries(n):
+    return [
+        {"lema": f"kata{i}", "definisi": [{"makna": [i, {"contoh": "x" * 30}], "kelas": {"kode": [{"n": 1}]}}]}
+        for i in range(n)
+    ]
+
+
+def test_valid_indent0_across_chunks():
+    # indent=0 puts every nested "{" / "[" at column 0; none of it may be taken for a new value
+    doc = _entries(2000)
+    text = json.dumps(doc, indent=0)
+    for chunk_size in (1 << 16, 1000, 37):
+        values, stats = _read(text, chunk_size)
+        assert values == doc, f"chunk {chunk_size}: {len(values)} values"
+        assert stats["skipped_bytes"] == 0 and stats["resyncs"] == 0, stats
+
+
+def test_concatenated_documents():
+    a, b = _entries(3), {"lema": "pijar"}
+    values, stats = _read(json.dumps(a, indent=0) + "\n" + json.dumps(b) + json.dumps(a))
+    assert values == a + [b] + a
+    assert stats["resyncs"] == 0
+
+
+def test_truncated_value_is_skipped():
+    values, stats = _read('{"a": [1, 2\n{"b": 1}\n{"c": 2}')
+    assert values == [{"b": 1}, {"c": 2}]
+    assert stats["resyncs"] == 1 and stats["skipped_bytes"] == len('{"a": [1, 2\n')
+    # string cut by the end of a line
+    values, stats = _read('{"a": "xy\n{"b": 1}')
+    assert values == [{"b": 1}] and stats["resyncs"] == 1
+    # truncated at end of stream
+    values, stats = _read('{"a": 1}\n{"b": [1')
+    assert values == [{"a": 1}] and stats["resyncs"] == 1
+
+
+def test_garbage_between_values():
+    values, stats = _read('{"a": 1} garbage!! {"b": 2}')
+    assert values == [{"a": 1}, {"b": 2}]
+    assert stats["skipped_bytes"] == len("garbage!! ") and stats["resyncs"] == 1
+
+
+def test_escapes_across_chunks():
+    # a chunk may end right after the backslash of an escape; with ensure_ascii
+    # every non-ASCII char is a \uXXXX escape
+    doc = [{"e": "\u00e9"}, {"lema": "kata \"kutip\" \\ garis", "contoh": ["é]}", "\\", "a\\\"{"]}]
+    for ensure_ascii in (True, False):
+        text = "\n".join(json.dumps(v, ensure_ascii=ensure_ascii) for v in doc)
+        for chunk_size in (1, 2, 3, 5, 7, 1 << 16):
+            values, stats = _read(text, chunk_size)
+            assert values == doc, (ensure_ascii, chunk_size, values)
+            assert stats["resyncs"] == 0, (ensure_ascii, chunk_size, stats)
+    values, stats = _read('{"e": "\\u00e9"}', 1)
+    assert values == [{"e": "\u00e9"}] and stats["resyncs"] == 0
+
+
+if __name__ == "__main__":
+    for test in (
+        test_valid_indent0_across_chunks,
+        test_concatenated_documents,
+        test_truncated_value_is_skipped,
+        test_garbage_between_values,
+        test_escapes_across_chunks,
+    ):
+        try:
+            test()
+            print(f"{test.__name__}: OK")
+        except AssertionError as e:
+            print(f"{test.__name__}: FAIL:", e)
@@ -0,0 +1,139 @@
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "flask-app"))
+
+from api.kbbi_suggest import PrefixIndex, FuzzyIndex, edit_distance, RANK_WINDOW
+
+VOCAB = ("rumah", "rumahan", "perumahan", "ramah", "murah", "marah", "kerja", "bekerja", "pekerja",
+         "pijar", "berpijar", "nyala", "menyala", "menyalakan", "pukul", "memukul", "kata", "kita")
+
+
+def _prefix(words=VOCAB):
+    px = PrefixIndex()
+    for w in words:
+        px.add(w)
+    return px.freeze()
+
+
+def _reference_distance(a, b):
+    # plain optimal string alignment DP, no bounds or shortcuts
+    d = [[i + j if not i * j else 0 for j in range(len(b) + 1)] for i in range(len(a) + 1)]
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[len(a)][len(b)]
+
+
+def test_prefix_complete_and_display():
+    px = PrefixIndex()
+    px.add("rumah", "Rumah")
+    px.add("rumah", "RUMAH")  # the first source decides the display form
+    for w in ("rumahan", "rumput", "ramah", "ru"):
+        px.add(w)
+    px.freeze()
+    assert "rumput" in px and "rum" not in px
+    lo, hi = px.prefix_range("rum")
+    assert list(px.keys[lo:hi]) == ["rumah", "rumahan", "rumput"]
+    assert px.complete("ru") == ["ru", "Rumah", "rumput", "rumahan"]  # shorter first
+    assert px.complete("rum", limit=2) == ["Rumah", "rumput"]
+    assert px.complete("x") == [] and px.complete("") == []
+
+
+def test_prefix_hits_change_ranking():
+    px = _prefix()
+    assert px.complete("ru") == ["rumah", "rumahan"]
+    px.note_hit("rumahan")
+    assert px.complete("ru") == ["rumahan", "rumah"]
+    px.note_hit("rumah", 2)
+    assert px.complete("ru") == ["rumah", "rumahan"]
+    px.note_hit("tidakada")  # unknown keys are ignored
+
+
+def test_wide_prefix_ranks_whole_range():
+    # far more matches than RANK_WINDOW; the best ones sort last alphabetically
+    words = ["ka%05d" % i for i in range(RANK_WINDOW * 4)] + ["kz", "kzzzzzzzz"]
+    px = _prefix(words)
+    assert px.complete("k", limit=3) == ["kz", "ka00000", "ka00001"]
+    px.note_hit("kzzzzzzzz")
+    assert px.complete("k", limit=2) == ["kzzzzzzzz", "kz"]
+    px.note_hit("ka01999", 5)
+    assert px.complete("k", limit=3) == ["ka01999", "kzzzzzzzz", "kz"]
+    assert px.complete("ka0", limit=1) == ["ka01999"]
+
+
+def test_edit_distance_basics():
+    assert edit_distance("rumah", "rumah", 2) == 0
+    assert edit_distance("rumah", "ramah", 2) == 1      # substitution
+    assert edit_distance("rumah", "rumahan", 2) == 2    # insertions
+    assert edit_distance("rumah", "rmuah", 2) == 1      # adjacent transposition
+    assert edit_distance("", "ab", 2) == 2
+    assert edit_distance("rumah", "perumahan", 2) == 3  # over the bound: bound + 1
+    assert edit_distance("kerja", "pukul", 1) == 2
+
+
+def test_edit_distance_matches_reference():
+    rng = random.Random(3)
+    for _ in range(3000):
+        a = "".join(rng.choice("abc") for _ in range(rng.randrange(7)))
+        b = "".join(rng.choice("abc") for _ in range(rng.randrange(7)))
+        ref = _reference_distance(a, b)
+        for bound in (1, 2, 3):
+            assert edit_distance(a, b, bound) == min(ref, bound + 1), (a, b, bound)
+
+
+def test_fuzzy_lookup_orders_by_distance():
+    fx = FuzzyIndex(_prefix(), max_distance=2)
+    got = fx.lookup("rumha", max_distance=2)
+    assert got[0] == ("rumah", 1)
+    assert dict(got)["ramah"] == 2 and "murah" not in dict(got)  # 3 edits
+    assert [d for _, d in got] == sorted(d for _, d in got)
+    # one edit only: the 2-edit neighbours are gone
+    assert fx.lookup("rumha", max_distance=1) == [("rumah", 1)]
+    assert fx.lookup("qqqqq") == []
+
+
+def test_fuzzy_lookup_matches_brute_force():
+    rng = random.Random(5)
+    words = set()
+    while len(words) < 400:
+        words.add("".join(rng.choice("aeikmnrstu") for _ in range(rng.randrange(3, 12))))
+    px = _prefix(sorted(words))
+    fx = FuzzyIndex(px, max_distance=2, prefix_length=5)
+    for _ in range(100):
+        q = "".join(rng.choice("aeikmnrstu-") for _ in range(rng.randrange(1, 13)))
+        want = {w: _reference_distance(q, w) for w in words}
+        for d in (1, 2):
+            got = {k: dist for k, dist in fx.lookup(q, max_distance=d, limit=len(words))}
+            assert got == {w: x for w, x in want.items() if x <= d}, (q, d)
+
+
+def test_fuzzy_lookup_bounded_by_index():
+    fx = FuzzyIndex(_prefix(), max_distance=1)
+    assert fx.lookup("rumha", max_distance=2) == [("rumah", 1)]
+    px = _prefix()
+    px.note_hit("kita")
+    got = FuzzyIndex(px, max_distance=1).lookup("kxta")
+    assert got == [("kita", 1), ("kata", 1)]  # same distance: most looked-up first
+
+
+if __name__ == "__main__":
+    for test in (
+        test_prefix_complete_and_display,
+        test_prefix_hits_change_ranking,
+        test_wide_prefix_ranks_whole_range,
+        test_edit_distance_basics,
+        test_edit_distance_matches_reference,
+        test_fuzzy_lookup_orders_by_distance,
+        test_fuzzy_lookup_matches_brute_force,
+        test_fuzzy_lookup_bounded_by_index,
+    ):
+        try:
+            test()
+            print(f"{test.__name__}: OK")
+        except AssertionError as e:
+            print(f"{test.__name__}: FAIL:", e)
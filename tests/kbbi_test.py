@@ -25,6 +25,36 @@ def http_get_json(url, timeout=60):
     except Exception as e:
         return None, {"error": str(e)}, {}
 
+def http_post_json(url, payload, timeout=60):
+    data = json.dumps(payload).encode("utf-8")
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"}, method="POST")
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return resp.getcode(), json.loads(resp.read().decode("utf-8")), dict(resp.getheaders())
+    except urllib.error.HTTPError as e:
+        try:
+            data = json.loads(e.read().decode("utf-8"))
+        except Exception:
+            data = {"error": str(e)}
+        return e.code, data, dict(e.headers or {})
+    except Exception as e:
+        return None, {"error": str(e)}, {}
+
+def test_health_readiness():
+    # tunggu sampai indeks KBBI selesai dibangun (warm-up saat boot)
+    code, data = None, {}
+    for _ in range(60):
+        code, data, _ = http_get_json(f"{API}/api/health")
+        if code != 503:
+            break
+        time.sleep(1)
+    print("health readiness:", code, data.get("kbbi") if isinstance(data, dict) else data)
+    assert code == 200, f"Expected 200 once ready, got {code}, data={data}"
+    assert data.get("ready") is True
+    kbbi = data.get("kbbi") or {}
+    assert "word_db_loaded" in kbbi and "offline_index_loaded" in kbbi
+    assert isinstance(kbbi.get("builds"), dict)
+
 def test_valid_word():
     kata = "pijar"
     url = f"{API}/api/kbbi/cek?kata={urllib.parse.quote(kata)}"
@@ -39,6 +69,25 @@ def test_valid_word():
     assert isinstance(data.get("lema"), list)
     assert isinstance(data.get("definisi"), list)
 
+def test_cek_etag_cache_header():
+    url = f"{API}/api/kbbi/cek?kata={urllib.parse.quote('pijar')}"
+    code, data, headers = http_get_json(url)
+    assert code == 200, f"Expected 200, got {code}, data={data}"
+    assert "cache_hit" not in data
+    etag = headers.get("ETag")
+    assert etag, f"missing ETag, headers={headers}"
+    # kedua kali: dari cache, ETag sama; If-None-Match -> 304 tanpa body
+    code, _, headers = http_get_json(url)
+    assert headers.get("X-Cache-Hit") == "1" and headers.get("ETag") == etag
+    req = urllib.request.Request(url, headers={"If-None-Match": etag})
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            code = resp.getcode()
+    except urllib.error.HTTPError as e:
+        code = e.code
+    print("etag revalidation status:", code)
+    assert code == 304, f"Expected 304 for matching If-None-Match, got {code}"
+
 def test_invalid_word_with_suggestions():
     kata = "xqzptlkxyz"  # mestinya tidak ada
     url = f"{API}/api/kbbi/cek?kata={urllib.parse.quote(kata)}"
@@ -52,6 +101,123 @@ def test_invalid_word_with_suggestions():
     # saran boleh kosong, tapi per kontrak ada field-nya
     assert "saran" in data
 
+def test_derived_form():
+    kata = "berpijar"  # turunan dari "pijar"
+    url = f"{API}/api/kbbi/cek?kata={urllib.parse.quote(kata)}"
+    code, data, _ = http_get_json(url)
+    print("derived status:", code)
+    print("derived data:", data)
+    assert code == 200, f"Expected 200 for derived form, got {code}, data={data}"
+    assert data.get("valid") is True
+    # sumber lokal menjawab lewat kata dasar; sumber online bisa punya entri sendiri
+    if "bentuk_dasar" in data:
+        assert data["bentuk_dasar"] == "pijar"
+        assert "ber" in (data.get("imbuhan") or [])
+
+def test_saran_typo():
+    kata = "pijer"  # salah ketik dari "pijar"
+    url = f"{API}/api/kbbi/saran?kata={urllib.parse.quote(kata)}"
+    code, data, _ = http_get_json(url)
+    print("saran status:", code)
+    print("saran data:", data)
+    assert code == 200, f"Expected 200 for saran, got {code}, data={data}"
+    assert isinstance(data.get("saran"), list)
+    assert isinstance(data.get("detail"), list)
+    for d in data["detail"]:
+        assert 0 <= d.get("jarak", -1) <= 2
+
+def test_cek_batch():
+    words = ["pijar", "rumah", "xqzptlkxyz"]
+    code, data, _ = http_post_json(f"{API}/api/kbbi/cek-batch", {"kata": words})
+    print("batch status:", code)
+    assert code == 200, f"Expected 200 for batch, got {code}, data={data}"
+    hasil = data.get("hasil") or {}
+    assert set(hasil.keys()) == set(words)
+    assert hasil["pijar"].get("valid") is True
+    assert hasil["xqzptlkxyz"].get("valid") is False
+    assert "saran" in hasil["xqzptlkxyz"]
+
+def test_periksa_teks():
+    teks = "Pijar api di rumha itu."
+    code, data, _ = http_post_json(f"{API}/api/kbbi/periksa-teks", {"teks": teks})
+    print("periksa-teks status:", code)
+    print("periksa-teks data:", data)
+    assert code == 200, f"Expected 200 for periksa-teks, got {code}, data={data}"
+    assert isinstance(data.get("salah"), list)
+    for it in data["salah"]:
+        assert teks[it["awal"]:it["akhir"]] == it["kata"]
+        assert isinstance(it.get("saran"), list)
+    assert data.get("jumlah_token") == 5
+
+def test_cari_definisi():
+    url = f"{API}/api/kbbi/cari?q={urllib.parse.quote('cahaya')}&per_halaman=5"
+    code, data, _ = http_get_json(url)
+    print("cari status:", code)
+    print("cari data:", data)
+    assert code == 200, f"Expected 200 for cari, got {code}, data={data}"
+    assert data.get("halaman") == 1 and data.get("per_halaman") == 5
+    hasil = data.get("hasil")
+    assert isinstance(hasil, list) and len(hasil) <= 5
+    assert data.get("total", 0) >= len(hasil)
+    skor = [h["skor"] for h in hasil]
+    assert skor == sorted(skor, reverse=True)
+    code, data, _ = http_get_json(f"{API}/api/kbbi/cari")
+    assert code == 400, f"Expected 400 without q, got {code}"
+
+def test_relasi_bfs():
+    url = f"{API}/api/kbbi/relasi?kata={urllib.parse.quote('besar')}&depth=2&limit=20"
+    code, data, _ = http_get_json(url)
+    print("relasi status:", code)
+    print("relasi data:", data)
+    if code == 404:
+        return  # kata tidak ada di word DB server ini
+    assert code == 200, f"Expected 200 for relasi, got {code}, data={data}"
+    hasil = data.get("hasil")
+    assert isinstance(hasil, list) and len(hasil) <= 20
+    assert data.get("jumlah") == len(hasil)
+    jarak = [h["jarak"] for h in hasil]
+    assert jarak == sorted(jarak) and all(1 <= j <= 2 for j in jarak)
+    for h in hasil:
+        assert h["relasi"] in ("sinonim", "antonim")
+
+def test_resolver_stats():
+    code, data, _ = http_get_json(f"{API}/api/kbbi/stats")
+    assert code == 200, f"Expected 200 for stats, got {code}, data={data}"
+    resolver = data.get("resolver") or {}
+    print("resolver:", resolver.get("mode"), resolver.get("order"))
+    assert resolver.get("mode") in ("offline-first", "online-first", "local-only")
+    order = resolver.get("order") or []
+    assert order, "resolver has no enabled sources"
+    if resolver["mode"] == "offline-first":
+        assert order[-1] == "kbbi-online" or "kbbi-online" not in order
+    if resolver["mode"] == "local-only":
+        assert "kbbi-online" not in order
+    # kata acak (belum di-cache) melewati sumber pertama dalam urutan
+    first = order[0]
+    before = resolver["sources"][first]["calls"]
+    kata = f"zqx{int(time.time() * 1000) % 100000}"
+    http_get_json(f"{API}/api/kbbi/cek?kata={kata}")
+    code, data, _ = http_get_json(f"{API}/api/kbbi/stats")
+    assert data["resolver"]["sources"][first]["calls"] == before + 1
+
+def test_reload_job():
+    code, data, _ = http_post_json(f"{API}/api/kbbi/reload", {})
+    print("reload status:", code, data)
+    assert code == 202, f"Expected 202 for reload, got {code}, data={data}"
+    assert data.get("job_id") and data.get("status_url")
+    job = {}
+    for _ in range(120):
+        code, job, _ = http_get_json(f"{API}{data['status_url']}")
+        assert code == 200, f"Expected 200 for job status, got {code}, data={job}"
+        if job.get("status") in ("done", "error"):
+            break
+        time.sleep(0.5)
+    print("reload job:", job)
+    assert job.get("status") == "done", f"reload job did not finish: {job}"
+    # index lama tetap dipakai selama rebuild; setelah swap kata tetap ditemukan
+    code, data, _ = http_get_json(f"{API}/api/kbbi/cek?kata=pijar")
+    assert code == 200
+
 def test_rate_limit_basic():
     # Kirim >60 permintaan dalam 60 detik untuk memicu 429 (rate limit per-IP)
     kata = "pijar"
@@ -74,6 +240,13 @@ if __name__ == "__main__":
     code, data, _ = http_get_json(hc)
     print("health:", code, data)
 
+    print("\n== HEALTH READINESS TEST ==")
+    try:
+        test_health_readiness()
+        print("readiness test: OK")
+    except AssertionError as e:
+        print("readiness test: FAIL:", e)
+
     print("\n== VALID WORD TEST ==")
     try:
         test_valid_word()
@@ -81,6 +254,13 @@ if __name__ == "__main__":
     except AssertionError as e:
         print("valid test: FAIL:", e)
 
+    print("\n== ETAG / CACHE HEADER TEST ==")
+    try:
+        test_cek_etag_cache_header()
+        print("etag test: OK")
+    except AssertionError as e:
+        print("etag test: FAIL:", e)
+
     print("\n== INVALID WORD TEST ==")
     try:
         test_invalid_word_with_suggestions()
@@ -88,6 +268,62 @@ if __name__ == "__main__":
     except AssertionError as e:
         print("invalid test: FAIL:", e)
 
+    print("\n== DERIVED FORM TEST ==")
+    try:
+        test_derived_form()
+        print("derived test: OK")
+    except AssertionError as e:
+        print("derived test: FAIL:", e)
+
+    print("\n== SARAN TEST ==")
+    try:
+        test_saran_typo()
+        print("saran test: OK")
+    except AssertionError as e:
+        print("saran test: FAIL:", e)
+
+    print("\n== BATCH TEST ==")
+    try:
+        test_cek_batch()
+        print("batch test: OK")
+    except AssertionError as e:
+        print("batch test: FAIL:", e)
+
+    print("\n== PERIKSA TEKS TEST ==")
+    try:
+        test_periksa_teks()
+        print("periksa-teks test: OK")
+    except AssertionError as e:
+        print("periksa-teks test: FAIL:", e)
+
+    print("\n== CARI DEFINISI TEST ==")
+    try:
+        test_cari_definisi()
+        print("cari test: OK")
+    except AssertionError as e:
+        print("cari test: FAIL:", e)
+
+    print("\n== RELASI TEST ==")
+    try:
+        test_relasi_bfs()
+        print("relasi test: OK")
+    except AssertionError as e:
+        print("relasi test: FAIL:", e)
+
+    print("\n== RESOLVER STATS TEST ==")
+    try:
+        test_resolver_stats()
+        print("resolver test: OK")
+    except AssertionError as e:
+        print("resolver test: FAIL:", e)
+
+    print("\n== RELOAD JOB TEST ==")
+    try:
+        test_reload_job()
+        print("reload test: OK")
+    except AssertionError as e:
+        print("reload test: FAIL:", e)
+
     print("\n== RATE LIMIT TEST ==")
     try:
         test_rate_limit_basic()
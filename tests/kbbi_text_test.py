@@ -0,0 +1,69 @@
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "flask-app"))
+
+from api.kbbi import _kbbi_iter_tokens, _KBBI_TOKEN_RE, _KBBI_TOKEN_MAX
+
+
+def _reference(text):
+    return [(m.start(), m.end(), m.group(0)) for m in _KBBI_TOKEN_RE.finditer(text)
+            if m.end() - m.start() <= _KBBI_TOKEN_MAX]
+
+
+def _splits(text, *cuts):
+    bounds = [0] + list(cuts) + [len(text)]
+    return [text[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+def test_single_chunk():
+    text = "Kata-kata itu rumah'nya, bukan  x_y; " + "z" * 65 + " akhir"
+    assert list(_kbbi_iter_tokens([text])) == _reference(text)
+    assert [t for _, _, t in _kbbi_iter_tokens([text])] == ["Kata-kata", "itu", "rumah'nya", "bukan", "x", "y", "akhir"]
+
+
+def test_every_split_point():
+    texts = [
+        "kata -'" + "x" * 113 + " lagi",
+        "kata-kata " + "y" * 64 + " " + "y" * 65 + "-z lagi--tiga 'empat' lima’",
+        "ab-" + "c" * 70 + "-d -e- f--g",
+        "x" * 64 + "-" + "y" * 3,
+    ]
+    for text in texts:
+        want = _reference(text)
+        for cut in range(len(text) + 1):
+            got = list(_kbbi_iter_tokens(_splits(text, cut)))
+            assert got == want, (text, cut, got)
+
+
+def test_overlong_run_skipped_across_many_chunks():
+    text = "awal " + "-".join(["x" * 30] * 5) + " akhir"
+    want = _reference(text)
+    assert [t for _, _, t in want] == ["awal", "akhir"]
+    for size in (1, 2, 3, 7, 31, 64, 65):
+        chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        assert list(_kbbi_iter_tokens(chunks)) == want, size
+
+
+def test_random_chunking():
+    rng = random.Random(8)
+    alphabet = "ab-'’ _."
+    for _ in range(300):
+        text = "".join(rng.choice(alphabet) if rng.random() < 0.3 else "a" for _ in range(rng.randrange(200)))
+        cuts = sorted(rng.sample(range(len(text) + 1), min(len(text) + 1, rng.randrange(1, 6))))
+        assert list(_kbbi_iter_tokens(_splits(text, *cuts))) == _reference(text), (text, cuts)
+
+
+if __name__ == "__main__":
+    for test in (
+        test_single_chunk,
+        test_every_split_point,
+        test_overlong_run_skipped_across_many_chunks,
+        test_random_chunking,
+    ):
+        try:
+            test()
+            print(f"{test.__name__}: OK")
+        except AssertionError as e:
+            print(f"{test.__name__}: FAIL:", e)
@@ -0,0 +1,121 @@
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "flask-app"))
+
+from api.kbbi_worddb import WordShard, WordStore
+
+
+def _norm(s):
+    return s.strip().lower()
+
+
+def _rec(tag, *names):
+    return {"data": {"entri": [{"nama": n, "makna": []} for n in names]}, "tag": tag}
+
+
+def _shard(name, text):
+    return WordShard.parse(name, text.encode("utf-8"), _norm)
+
+
+def _doc(*pairs):
+    # JSON object text that may repeat keys
+    return "{" + ", ".join(f"{json.dumps(k)}: {json.dumps(v)}" for k, v in pairs) + "}"
+
+
+def test_parse_records_and_lemmas():
+    sh = _shard("a", _doc(("pijar", _rec(1, "pijar", "berpijar", "Berpijar")), ("rumah", _rec(2))))
+    assert list(sh.keys) == ["pijar", "rumah"] and len(sh) == 2
+    assert sh.record(0) == _rec(1, "pijar", "berpijar", "Berpijar")
+    # entri names other than the key itself, normalized and deduplicated
+    assert list(sh.record_lemmas(0)) == ["berpijar"] and sh.record_lemmas(1) == ()
+    assert len(_shard("e", " {\n } ")) == 0
+    assert len(_shard("l", "[1, 2]")) == 0
+    for bad in ('{"a": 1', '{"a" 1}', '{"a": 1,}', "{a: 1}"):
+        try:
+            _shard("bad", bad)
+            assert False, bad
+        except ValueError:
+            pass
+
+
+def test_repeated_key_in_one_shard():
+    # like json.load: the last value wins, at the key's first position
+    sh = _shard("a", _doc(("pijar", _rec(1)), ("rumah", _rec(2)), ("pijar", _rec(3))))
+    idx = sh.index()
+    assert list(idx) == ["pijar", "rumah"]
+    assert sh.record(idx["pijar"])["tag"] == 3
+    assert json.loads(_doc(("pijar", _rec(1)), ("pijar", _rec(3))))["pijar"]["tag"] == 3
+
+
+def test_first_shard_wins():
+    s0 = _shard("0", _doc(("pijar", _rec("s0")), ("api", _rec("s0"))))
+    s1 = _shard("1", _doc(("pijar", _rec("s1")), ("rumah", _rec("s1"))))
+    ws = WordStore([s0, s1], _norm)
+    assert len(ws) == 3
+    assert ws.get("pijar")["tag"] == "s0" and ws.get("rumah")["tag"] == "s1"
+    ws = WordStore([s1, s0], _norm)
+    assert ws.get("pijar")["tag"] == "s1"
+
+
+def test_normalized_collision_later_key_wins():
+    # distinct raw keys, same normalized form: filled in order, so the later one answers
+    s0 = _shard("0", _doc(("PIJAR", _rec("upper"))))
+    s1 = _shard("1", _doc(("pijar", _rec("lower"))))
+    ws = WordStore([s0, s1], _norm)
+    assert len(ws) == 2 and list(ws.keys()) == ["pijar"]
+    assert ws.by_key("pijar")["tag"] == "lower" and ws.display("pijar") == "pijar"
+    ws = WordStore([s1, s0], _norm)
+    assert ws.by_key("pijar")["tag"] == "upper" and ws.display("pijar") == "PIJAR"
+
+
+def test_lemma_lookup_order():
+    s0 = _shard("0", _doc(("pijar", _rec("pijar", "pijar", "berpijar")), ("nyala", _rec("nyala", "nyala", "berpijar"))))
+    s1 = _shard("1", _doc(("api", _rec("api", "api", "berpijar", "rumah")), ("rumah", _rec("rumah"))))
+    ws = WordStore([s0, s1], _norm)
+    # the first record naming a lemma answers for it
+    assert ws.get("berpijar")["tag"] == "pijar" and "berpijar" in ws
+    assert ws.by_key("berpijar") is None
+    # a lemma that is also a key is answered by the key's own record
+    assert ws.get("rumah")["tag"] == "rumah"
+    assert dict((k, v["tag"]) for k, v in ws.items()) == {"api": "api", "nyala": "nyala", "pijar": "pijar", "rumah": "rumah"}
+
+
+def test_matches_dict_merge():
+    # same answers as merging the decoded shards with dicts, first shard first
+    docs = [
+        _doc(("A", _rec(0, "a", "x")), ("b", _rec(1, "b")), ("a", _rec(2, "y")), ("c", _rec(3, "x", "z"))),
+        _doc(("b", _rec(4)), ("B", _rec(5, "w")), ("d", _rec(6, "z", "c"))),
+        _doc(("a", _rec(7)), ("e", _rec(8, "w", "y"))),
+    ]
+    ws = WordStore([_shard(str(i), d) for i, d in enumerate(docs)], _norm)
+    raw = {}
+    for d in docs:
+        for k, v in json.loads(d).items():
+            raw.setdefault(k, v)
+    by_key, by_lema = {}, {}
+    for k, rec in raw.items():
+        by_key[_norm(k)] = rec
+        for e in rec["data"]["entri"]:
+            by_lema.setdefault(_norm(e["nama"]), rec)
+    assert len(ws) == len(raw)
+    for k in set(by_key) | set(by_lema) | {"tidakada"}:
+        assert ws.get(k) == by_key.get(k, by_lema.get(k)), k
+        assert ws.by_key(k) == by_key.get(k), k
+
+
+if __name__ == "__main__":
+    for test in (
+        test_parse_records_and_lemmas,
+        test_repeated_key_in_one_shard,
+        test_first_shard_wins,
+        test_normalized_collision_later_key_wins,
+        test_lemma_lookup_order,
+        test_matches_dict_merge,
+    ):
+        try:
+            test()
+            print(f"{test.__name__}: OK")
+        except AssertionError as e:
+            print(f"{test.__name__}: FAIL:", e)
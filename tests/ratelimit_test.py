@@ -0,0 +1,91 @@
+import os
+import sys
+import sqlite3
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "flask-app"))
+
+from api.ratelimit import MemoryBucketStore, SQLiteBucketStore, RateLimiter
+
+
+def _drain(store, key, rate, capacity, now):
+    n = 0
+    while store.take(key, rate, capacity, now)[0]:
+        n += 1
+    return n
+
+
+def _check_refill(store):
+    # 5 tokens, refilled at 1 token per 2 seconds
+    assert _drain(store, "a", 0.5, 5, 100.0) == 5
+    ok, retry = store.take("a", 0.5, 5, 100.0)
+    assert not ok and abs(retry - 2.0) < 1e-9
+    # half a token after 1s is not enough; one token after 2s is
+    assert not store.take("a", 0.5, 5, 101.0)[0]
+    assert store.take("a", 0.5, 5, 102.0)[0]
+    assert not store.take("a", 0.5, 5, 102.0)[0]
+    # the bucket never refills past its capacity
+    assert _drain(store, "a", 0.5, 5, 1000.0) == 5
+    # keys are independent
+    assert store.take("b", 0.5, 5, 1000.0)[0]
+
+
+def test_memory_refill():
+    _check_refill(MemoryBucketStore())
+
+
+def test_sqlite_refill_and_sweep():
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "rl.db")
+        _check_refill(SQLiteBucketStore(path))
+        # a second store on the same file (another worker) sees the same buckets
+        other = SQLiteBucketStore(path)
+        assert not other.take("a", 0.5, 5, 1000.0)[0]
+        assert other.sweep(1000.0) == 0 and other.sweep(1000.5) == 2 and len(other) == 0
+
+
+def test_memory_sweep():
+    store = MemoryBucketStore()
+    store.take("old", 1.0, 5, 10.0)
+    store.take("new", 1.0, 5, 20.0)
+    assert store.sweep(15.0) == 1 and len(store) == 1
+    # a swept key starts again with a full bucket
+    assert _drain(store, "old", 1.0, 5, 20.0) == 5
+
+
+def test_limiter_sweeps_idle_keys():
+    store = MemoryBucketStore()
+    rl = RateLimiter("t", max_requests=2, window=1, store=store, sweep_interval=0)
+    store.take("t:idle", rl.rate, rl.capacity, 0.0)
+    assert rl.allow("x")[0]
+    assert len(store) == 1  # "t:idle" was full again, so it was dropped
+
+
+class _BrokenStore:
+    def take(self, key, rate, capacity, now):
+        raise sqlite3.OperationalError("database is locked")
+
+    def sweep(self, idle_before):
+        raise sqlite3.OperationalError("database is locked")
+
+
+def test_store_error_falls_back_to_memory():
+    rl = RateLimiter("t", max_requests=3, window=60, store=_BrokenStore(), sweep_interval=0)
+    assert [rl.allow("x")[0] for _ in range(4)] == [True, True, True, False]
+    assert rl.store_errors == 4 and rl.stats()["store_errors"] == 4
+    assert rl.allowed == 3 and rl.limited == 1
+
+
+if __name__ == "__main__":
+    for test in (
+        test_memory_refill,
+        test_sqlite_refill_and_sweep,
+        test_memory_sweep,
+        test_limiter_sweeps_idle_keys,
+        test_store_error_falls_back_to_memory,
+    ):
+        try:
+            test()
+            print(f"{test.__name__}: OK")
+        except AssertionError as e:
+            print(f"{test.__name__}: FAIL:", e)
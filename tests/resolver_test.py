@@ -0,0 +1,126 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "flask-app"))
+
+from api.resolver import ResolverChain, Miss, Unavailable
+
+
+def _chain(*sources):
+    chain = ResolverChain("t")
+    for i, (name, fn) in enumerate(sources):
+        chain.register(name, fn, priority=i)
+    return chain
+
+
+def _raise(ex):
+    def lookup(key, timeout=None):
+        raise ex
+    return lookup
+
+
+def _none(key, timeout=None):
+    return None
+
+
+def test_definite_miss_reports_no_failures():
+    chain = _chain(("a", _none), ("b", _none))
+    failed = []
+    assert chain.resolve("x", failed=failed) == (None, None)
+    assert failed == []
+
+
+def test_failed_sources_are_reported():
+    chain = _chain(("err", _raise(ValueError("boom"))), ("slow", _raise(TimeoutError())),
+                   ("off", _raise(Unavailable())), ("ok", _none))
+    failed = []
+    assert chain.resolve("x", failed=failed) == (None, None)
+    assert failed == ["err", "slow", "off"]
+    st = chain.stats()["sources"]
+    assert (st["err"]["errors"], st["slow"]["timeouts"], st["off"]["skipped"], st["ok"]["misses"]) == (1, 1, 1, 1)
+
+
+def test_hit_and_authoritative_miss_stop_the_chain():
+    chain = _chain(("off", _raise(Unavailable())), ("hit", lambda key, timeout=None: key.upper()), ("never", _none))
+    failed = []
+    assert chain.resolve("x", failed=failed) == ("hit", "X")
+    assert failed == ["off"] and chain.stats()["sources"]["never"]["calls"] == 0
+    chain = _chain(("miss", _raise(Miss(["y"]))), ("never", _none))
+    try:
+        chain.resolve("x")
+        assert False, "Miss not raised"
+    except Miss as miss:
+        assert miss.saran == ["y"]
+
+
+def test_priority_order_and_configure():
+    calls = []
+
+    def src(name, result=None):
+        def lookup(key, timeout=None):
+            calls.append((name, timeout))
+            return result
+        return lookup
+
+    chain = ResolverChain("t")
+    chain.register("b", src("b"), priority=20)
+    chain.register("a", src("a", "A"), priority=10, timeout=0.5)
+    chain.register("c", src("c", "C"), priority=20)  # ties keep registration order
+    assert chain.order() == ["a", "b", "c"]
+    assert chain.resolve("x") == ("a", "A") and calls == [("a", 0.5)]
+    assert chain.resolve("x", exclude=("a",)) == ("c", "C")
+    chain.configure("a", enabled=False)
+    chain.configure("c", priority=0, timeout=2.0)
+    assert chain.order() == ["c", "b"] and not chain.enabled("a") and not chain.enabled("tidakada")
+    calls.clear()
+    assert chain.resolve("x") == ("c", "C") and calls == [("c", 2.0)]
+
+
+def test_errors_reported_and_slow_calls_counted():
+    errors = []
+    chain = ResolverChain("t", on_error=lambda name, args, ex: errors.append((name, args, str(ex))))
+    chain.register("err", _raise(ValueError("boom")), priority=0)
+    chain.register("ok", lambda key, timeout=None: key, priority=1, timeout=0.01)
+    assert chain.resolve("x") == ("ok", "x")
+    assert errors == [("err", ("x",), "boom")]
+    chain.record("ok", "hits", 0.5)  # a lookup made outside resolve(), over its timeout
+    st = chain.stats()
+    assert st["order"] == ["err", "ok"]
+    assert (st["sources"]["ok"]["calls"], st["sources"]["ok"]["hits"], st["sources"]["ok"]["slow"]) == (2, 2, 1)
+    chain.record("tidakada", "hits")  # unknown names are ignored
+
+
+def test_kbbi_modes():
+    import api.kbbi as K
+
+    saved = (K.KBBI_ONLINE_AVAILABLE, K._KBBI_RESOLVER_MODE)
+    try:
+        K.KBBI_ONLINE_AVAILABLE = True
+        order = K._kbbi_configure_resolver("online-first", disabled=())
+        assert order[0] == "kbbi-online"
+        order = K._kbbi_configure_resolver("offline-first", disabled=())
+        assert order[-1] == "kbbi-online" and order.index("kbbi-worddb") < order.index("kbbi-offline")
+        assert "kbbi-online" not in K._kbbi_configure_resolver("local-only", disabled=())
+        order = K._kbbi_configure_resolver("bogus", disabled=("kbbi-morph",))
+        assert K._KBBI_RESOLVER_MODE == "offline-first" and "kbbi-morph" not in order
+        K.KBBI_ONLINE_AVAILABLE = False
+        assert "kbbi-online" not in K._kbbi_configure_resolver("online-first", disabled=())
+    finally:
+        K.KBBI_ONLINE_AVAILABLE = saved[0]
+        K._kbbi_configure_resolver(saved[1])
+
+
+if __name__ == "__main__":
+    for test in (
+        test_definite_miss_reports_no_failures,
+        test_failed_sources_are_reported,
+        test_hit_and_authoritative_miss_stop_the_chain,
+        test_priority_order_and_configure,
+        test_errors_reported_and_slow_calls_counted,
+        test_kbbi_modes,
+    ):
+        try:
+            test()
+            print(f"{test.__name__}: OK")
+        except AssertionError as e:
+            print(f"{test.__name__}: FAIL:", e)